@@ -6,33 +6,60 @@ Handles HTTP requests, rate limiting, retries, and error handling.
 import requests
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import random
 
 from config import DEFAULT_HEADERS
+from rate_limiter import AdaptiveRateLimiter, get_shared_rate_limiter
+from response_cache import ResponseCache, create_response_cache
 
 class APIClient:
     """
     Robust API client with rate limiting, retries, and error handling.
+    Safe to share between threads: counters and circuit breaker state are
+    guarded by a lock and all threads reuse one HTTP connection pool.
     """
     
-    def __init__(self, config: Dict[str, Any], logger: logging.Logger):
+    def __init__(self, config: Dict[str, Any], logger: logging.Logger,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 response_cache: Optional[ResponseCache] = None):
         """
         Initialize API client with configuration and logger.
         
         Args:
             config: Configuration dictionary
             logger: Logger instance
+            rate_limiter: Rate limiter to use (defaults to the shared one for the API host)
+            response_cache: Response cache to use (defaults to the one described by config['cache'])
         """
         self.config = config
         self.logger = logger
+        self.max_workers = max(1, config['search']['max_concurrent_requests'])
         self.session = requests.Session()
         self.session.headers.update(DEFAULT_HEADERS)
+        # Pool sized for concurrent use from fetch_many / caller thread pools
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.max_workers,
+            pool_maxsize=self.max_workers
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
-        # Rate limiting
+        # Guards statistics, circuit breaker and last_request_time
+        self._lock = threading.RLock()
+        
+        # Rate limiting (shared adaptive token bucket)
         self.last_request_time = 0
         self.rate_limit = config['api']['rate_limit']
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter(config)
+        
+        # Optional on-disk response cache; in replay mode the API is never called
+        self._owns_response_cache = response_cache is None
+        self.response_cache = response_cache or create_response_cache(config, logger)
+        self.replay = bool(self.response_cache and self.response_cache.replay)
         
         # Retry configuration
         self.max_retries = config['api']['max_retries']
@@ -53,18 +80,11 @@ class APIClient:
         
     def _wait_for_rate_limit(self):
         """
-        Implement rate limiting by waiting between requests.
+        Wait for a token from the shared rate limiter.
         """
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        if time_since_last_request < self.rate_limit:
-            wait_time = self.rate_limit - time_since_last_request
-            # Add small random jitter to avoid thundering herd
-            wait_time += random.uniform(0, 0.2)
-            time.sleep(wait_time)
-        
-        self.last_request_time = time.time()
+        self.rate_limiter.acquire()
+        with self._lock:
+            self.last_request_time = time.time()
     
     def _is_circuit_breaker_open(self) -> bool:
         """
@@ -73,29 +93,31 @@ class APIClient:
         Returns:
             True if circuit breaker is open
         """
-        if self.consecutive_failures < self.max_consecutive_failures:
-            return False
-        
-        if self.circuit_breaker_reset_time is None:
-            self.circuit_breaker_reset_time = datetime.now() + timedelta(seconds=self.circuit_breaker_timeout)
-            self.logger.warning(f"Circuit breaker opened due to {self.consecutive_failures} consecutive failures")
+        with self._lock:
+            if self.consecutive_failures < self.max_consecutive_failures:
+                return False
+            
+            if self.circuit_breaker_reset_time is None:
+                self.circuit_breaker_reset_time = datetime.now() + timedelta(seconds=self.circuit_breaker_timeout)
+                self.logger.warning(f"Circuit breaker opened due to {self.consecutive_failures} consecutive failures")
+                return True
+            
+            if datetime.now() >= self.circuit_breaker_reset_time:
+                self.logger.info("Circuit breaker reset time reached, attempting to close")
+                self.consecutive_failures = 0
+                self.circuit_breaker_reset_time = None
+                return False
+            
             return True
-        
-        if datetime.now() >= self.circuit_breaker_reset_time:
-            self.logger.info("Circuit breaker reset time reached, attempting to close")
-            self.consecutive_failures = 0
-            self.circuit_breaker_reset_time = None
-            return False
-        
-        return True
     
     def _handle_request_success(self):
         """
         Handle successful request for circuit breaker and statistics.
         """
-        self.consecutive_failures = 0
-        self.circuit_breaker_reset_time = None
-        self.successful_requests += 1
+        with self._lock:
+            self.consecutive_failures = 0
+            self.circuit_breaker_reset_time = None
+            self.successful_requests += 1
     
     def _handle_request_failure(self, error: Exception):
         """
@@ -104,13 +126,15 @@ class APIClient:
         Args:
             error: Exception that occurred
         """
-        self.consecutive_failures += 1
-        self.failed_requests += 1
-        
-        if self.consecutive_failures >= self.max_consecutive_failures:
-            self.logger.error(f"Circuit breaker triggered after {self.consecutive_failures} failures")
+        with self._lock:
+            self.consecutive_failures += 1
+            self.failed_requests += 1
+            
+            if self.consecutive_failures >= self.max_consecutive_failures:
+                self.logger.error(f"Circuit breaker triggered after {self.consecutive_failures} failures")
     
-    def search_products(self, search_term: str, offset: int = 0, limit: int = 50) -> Optional[Dict[str, Any]]:
+    def search_products(self, search_term: str, offset: int = 0, limit: int = 50,
+                        location: Optional[Tuple[float, float]] = None) -> Optional[Dict[str, Any]]:
         """
         Search for products using the API.
         
@@ -118,6 +142,7 @@ class APIClient:
             search_term: Term to search for
             offset: Pagination offset
             limit: Number of results per page
+            location: (lat, lng) to search from (defaults to config['location'])
             
         Returns:
             API response data or None if failed
@@ -126,10 +151,11 @@ class APIClient:
             self.logger.warning("Circuit breaker is open, skipping request")
             return None
         
+        lat, lng = location or (self.config['location']['lat'], self.config['location']['lng'])
         params = {
             'string': search_term,
-            'lat': self.config['location']['lat'],
-            'lng': self.config['location']['lng'],
+            'lat': lat,
+            'lng': lng,
             'limit': limit,
             'offset': offset
         }
@@ -158,6 +184,34 @@ class APIClient:
         
         return self._make_request(self.config['api']['product_detail_url'], params)
     
+    def fetch_many(self, product_ids: List[str], sucursales: str,
+                   max_workers: Optional[int] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get product details for many products using a pool of worker threads.
+        
+        All workers share this client's connection pool, rate limiter and
+        circuit breaker, so the combined request rate stays within budget.
+        
+        Args:
+            product_ids: Product EANs/IDs to fetch
+            sucursales: Comma-separated list of store IDs
+            max_workers: Number of worker threads (defaults to search.max_concurrent_requests)
+            
+        Returns:
+            Dictionary mapping each product ID (in input order) to its response data or None
+        """
+        if not product_ids:
+            return {}
+        
+        workers = min(max_workers or self.max_workers, len(product_ids))
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api-client') as executor:
+            responses = executor.map(
+                lambda product_id: self.get_product_details(product_id, sucursales),
+                product_ids
+            )
+            return dict(zip(product_ids, responses))
+    
     def _make_request(self, url: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Make HTTP request with retries and error handling.
@@ -169,7 +223,16 @@ class APIClient:
         Returns:
             Response data or None if failed
         """
-        self.total_requests += 1
+        if self.response_cache:
+            cached = self.response_cache.get(url, params)
+            if cached is not None:
+                return cached
+            if self.replay:
+                self.logger.debug(f"Replay mode: no cached response for params: {params}")
+                return None
+        
+        with self._lock:
+            self.total_requests += 1
         
         for attempt in range(self.max_retries + 1):
             try:
@@ -187,20 +250,27 @@ class APIClient:
                 if response.status_code == 200:
                     data = response.json()
                     self._handle_request_success()
+                    self.rate_limiter.on_success()
+                    if self.response_cache:
+                        self.response_cache.put(url, params, data)
                     return data
                 
                 elif response.status_code == 429:  # Rate limited
-                    self.rate_limited_requests += 1
+                    with self._lock:
+                        self.rate_limited_requests += 1
                     retry_after = int(response.headers.get('Retry-After', 60))
-                    self.logger.warning(f"Rate limited, waiting {retry_after} seconds")
-                    time.sleep(retry_after)
+                    # The limiter slows down and pauses every caller sharing it
+                    self.rate_limiter.on_throttle(retry_after)
+                    self.logger.warning(f"Rate limited (Retry-After {retry_after}s), "
+                                        f"rate lowered to {self.rate_limiter.rate:.2f} req/s")
                     continue
                 
                 elif response.status_code in [500, 502, 503, 504]:  # Server errors
+                    # The limiter's pause is the backoff; no extra sleep here
+                    self.rate_limiter.on_throttle()
                     if attempt < self.max_retries:
-                        wait_time = (self.retry_backoff ** attempt) + random.uniform(0, 1)
-                        self.logger.warning(f"Server error {response.status_code}, retrying in {wait_time:.1f}s (attempt {attempt + 1}/{self.max_retries + 1})")
-                        time.sleep(wait_time)
+                        self.logger.warning(f"Server error {response.status_code}, retrying "
+                                            f"(attempt {attempt + 1}/{self.max_retries + 1})")
                         continue
                     else:
                         self.logger.error(f"Server error {response.status_code} after {self.max_retries} retries")
@@ -262,6 +332,10 @@ class APIClient:
         Returns:
             True if connection is working
         """
+        if self.replay:
+            self.logger.info("Replay mode: skipping API connection test")
+            return True
+        
         self.logger.info("Testing API connection...")
         
         try:
@@ -286,29 +360,33 @@ class APIClient:
         Returns:
             Statistics dictionary
         """
-        success_rate = (self.successful_requests / self.total_requests * 100) if self.total_requests > 0 else 0
-        
-        return {
-            'total_requests': self.total_requests,
-            'successful_requests': self.successful_requests,
-            'failed_requests': self.failed_requests,
-            'rate_limited_requests': self.rate_limited_requests,
-            'success_rate': round(success_rate, 2),
-            'consecutive_failures': self.consecutive_failures,
-            'circuit_breaker_open': self._is_circuit_breaker_open(),
-            'rate_limit': self.rate_limit
-        }
+        with self._lock:
+            success_rate = (self.successful_requests / self.total_requests * 100) if self.total_requests > 0 else 0
+            
+            return {
+                'total_requests': self.total_requests,
+                'successful_requests': self.successful_requests,
+                'failed_requests': self.failed_requests,
+                'rate_limited_requests': self.rate_limited_requests,
+                'success_rate': round(success_rate, 2),
+                'consecutive_failures': self.consecutive_failures,
+                'circuit_breaker_open': self._is_circuit_breaker_open(),
+                'rate_limit': round(1.0 / self.rate_limiter.rate, 3),
+                'rate_limiter': self.rate_limiter.get_statistics(),
+                'cache': self.response_cache.get_statistics() if self.response_cache else None
+            }
     
     def reset_statistics(self):
         """
         Reset API client statistics.
         """
-        self.total_requests = 0
-        self.successful_requests = 0
-        self.failed_requests = 0
-        self.rate_limited_requests = 0
-        self.consecutive_failures = 0
-        self.circuit_breaker_reset_time = None
+        with self._lock:
+            self.total_requests = 0
+            self.successful_requests = 0
+            self.failed_requests = 0
+            self.rate_limited_requests = 0
+            self.consecutive_failures = 0
+            self.circuit_breaker_reset_time = None
         
         self.logger.info("API client statistics reset")
     
@@ -321,6 +399,7 @@ class APIClient:
         """
         old_rate_limit = self.rate_limit
         self.rate_limit = max(0.1, min(10.0, new_rate_limit))  # Clamp between 0.1 and 10 seconds
+        self.rate_limiter.set_rate(1.0 / self.rate_limit)
         
         self.logger.info(f"Rate limit adjusted from {old_rate_limit}s to {self.rate_limit}s")
     
@@ -331,6 +410,9 @@ class APIClient:
         if self.session:
             self.session.close()
             self.logger.info("API client session closed")
+        if self.response_cache and self._owns_response_cache:
+            self.response_cache.close()
+            self.response_cache = None
     
     def __enter__(self):
         """
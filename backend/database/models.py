@@ -1,7 +1,7 @@
 """
 Modelos SQLAlchemy para las tablas de CheSuper
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Numeric, BigInteger
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Numeric, BigInteger, PrimaryKeyConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .connection import Base
@@ -59,3 +59,86 @@ class Precio(Base):
     
     def __repr__(self):
         return f"<Precio(id={self.id}, producto_id={self.producto_id}, precio_lista={self.precio_lista})>"
+
+class PrecioActual(Base):
+    """
+    Modelo para la tabla precios_actuales: último precio por producto y bandera.
+    Se actualiza con upsert en cada ingesta y es la tabla que lee la API.
+    """
+    __tablename__ = "precios_actuales"
+    
+    producto_id = Column(BigInteger, primary_key=True)  # EAN directo, sin FK
+    bandera = Column(String(100), primary_key=True)
+    sucursal = Column(String(200))
+    precio_lista = Column(Numeric(10, 2))
+    precio_promo_a = Column(Numeric(10, 2))
+    super_razon_social = Column(String(200))
+    fecha_actualizacion = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # Última vez visto
+    fecha_cambio = Column(DateTime(timezone=True), server_default=func.now())  # Último cambio de precio
+    activo = Column(Boolean, default=True)
+    
+    def __repr__(self):
+        return f"<PrecioActual(producto_id={self.producto_id}, bandera='{self.bandera}', precio_lista={self.precio_lista})>"
+
+class PrecioHistorial(Base):
+    """
+    Modelo para la tabla precios_historial: historial append-only de cambios de precio,
+    particionado por rango mensual de fecha_actualizacion (ver migrate_price_tables.py).
+    """
+    __tablename__ = "precios_historial"
+    __table_args__ = (
+        PrimaryKeyConstraint('id', 'fecha_actualizacion'),  # La clave de partición debe estar en la PK
+        {'postgresql_partition_by': 'RANGE (fecha_actualizacion)'}
+    )
+    
+    id = Column(BigInteger, autoincrement=True)
+    producto_id = Column(BigInteger, nullable=False, index=True)
+    sucursal = Column(String(200))
+    precio_lista = Column(Numeric(10, 2))
+    precio_promo_a = Column(Numeric(10, 2))
+    bandera = Column(String(100))
+    super_razon_social = Column(String(200))
+    fecha_actualizacion = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<PrecioHistorial(id={self.id}, producto_id={self.producto_id}, precio_lista={self.precio_lista})>"
+
+class LeasePrecios(Base):
+    """
+    Modelo para la tabla leases_precios: reparto de rangos de EAN entre workers
+    del scraper de precios (ver refresh_leases.py). Un shard en proceso cuyo
+    lease vence sin heartbeat vuelve a estar disponible para otro worker.
+    """
+    __tablename__ = "leases_precios"
+    
+    run_id = Column(String(50), primary_key=True)
+    shard_id = Column(Integer, primary_key=True)
+    ean_desde = Column(String(20))  # Inclusivo; NULL = sin límite inferior
+    ean_hasta = Column(String(20))  # Exclusivo; NULL = sin límite superior
+    estado = Column(String(20), nullable=False, default='pendiente', index=True)  # pendiente, en_proceso, completado
+    worker_id = Column(String(100))
+    lease_expira = Column(DateTime(timezone=True))
+    heartbeat = Column(DateTime(timezone=True))
+    procesados = Column(Integer, default=0)
+    intentos = Column(Integer, default=0)
+    fecha_inicio = Column(DateTime(timezone=True))
+    fecha_fin = Column(DateTime(timezone=True))
+    
+    def __repr__(self):
+        return f"<LeasePrecios(run_id='{self.run_id}', shard_id={self.shard_id}, estado='{self.estado}')>"
+
+class DemandaProducto(Base):
+    """
+    Modelo para la tabla demanda_productos: cuántas veces aparece cada producto
+    en los carritos comparados (/api/comparar). La usa el planificador de
+    actualización de precios (ver refresh_scheduler.py).
+    """
+    __tablename__ = "demanda_productos"
+    
+    producto_id = Column(BigInteger, primary_key=True)  # EAN directo, sin FK
+    consultas = Column(Integer, nullable=False, default=0)
+    primera_consulta = Column(DateTime(timezone=True), server_default=func.now())
+    ultima_consulta = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    
+    def __repr__(self):
+        return f"<DemandaProducto(producto_id={self.producto_id}, consultas={self.consultas})>"
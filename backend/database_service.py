@@ -9,8 +9,9 @@ from contextlib import contextmanager
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_, String
 from sqlalchemy.exc import SQLAlchemyError
-from .database.connection import SessionLocal
-from .database.models import Producto, Precio
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from .database.connection import SessionLocal, engine
+from .database.models import Producto, PrecioActual, DemandaProducto
 
 class DatabaseService:
     """
@@ -88,7 +89,7 @@ class DatabaseService:
         try:
             with self.get_session() as session:
                 # Query all precios
-                precios = session.query(Precio).filter(Precio.activo == True).all()
+                precios = session.query(PrecioActual).filter(PrecioActual.activo == True).all()
                 
                 # Convert to DataFrame to maintain compatibility
                 precios_data = []
@@ -273,11 +274,11 @@ class DatabaseService:
                     Producto.nombre,
                     Producto.marca,
                     Producto.categoria.label('Categoria'),
-                    func.string_agg(Precio.bandera, ',').label('banderas_disponibles')
+                    func.string_agg(PrecioActual.bandera, ',').label('banderas_disponibles')
                 ).join(
-                    Precio, Producto.ean == Precio.producto_id.cast(String)
+                    PrecioActual, Producto.ean == PrecioActual.producto_id.cast(String)
                 ).filter(
-                    Precio.activo == True
+                    PrecioActual.activo == True
                 ).group_by(
                     Producto.ean, Producto.nombre, Producto.marca, Producto.categoria
                 )
@@ -285,7 +286,7 @@ class DatabaseService:
                 # Apply min_supermercados filter
                 if min_supermercados > 1:
                     base_query = base_query.having(
-                        func.count(func.distinct(Precio.bandera)) >= min_supermercados
+                        func.count(func.distinct(PrecioActual.bandera)) >= min_supermercados
                     )
                 
                 # Apply category filter
@@ -383,10 +384,10 @@ class DatabaseService:
                     return pd.DataFrame()
                 
                 # Query precios for specific EANs
-                precios = session.query(Precio).filter(
+                precios = session.query(PrecioActual).filter(
                     and_(
-                        Precio.producto_id.in_(ean_integers),
-                        Precio.activo == True
+                        PrecioActual.producto_id.in_(ean_integers),
+                        PrecioActual.activo == True
                     )
                 ).all()
                 
@@ -406,6 +407,45 @@ class DatabaseService:
             print(f"Error getting precios for comparison: {e}")
             return pd.DataFrame()
     
+    def ensure_demand_table(self):
+        """
+        Create the demanda_productos table if it does not exist yet.
+        """
+        DemandaProducto.__table__.create(bind=engine, checkfirst=True)
+    
+    def record_cart_demand(self, eans: List[str]):
+        """
+        Count one lookup for every distinct EAN of a compared cart.
+        Feeds the price refresh scheduler; errors are logged and ignored.
+        
+        Args:
+            eans: EAN codes in the cart
+        """
+        ean_integers = set()
+        for ean in eans:
+            try:
+                ean_integers.add(int(ean))
+            except ValueError:
+                continue
+        
+        if not ean_integers:
+            return
+        
+        try:
+            with self.get_session() as session:
+                statement = pg_insert(DemandaProducto).values(
+                    [{'producto_id': ean, 'consultas': 1} for ean in sorted(ean_integers)]
+                )
+                session.execute(statement.on_conflict_do_update(
+                    index_elements=[DemandaProducto.producto_id],
+                    set_={
+                        'consultas': DemandaProducto.consultas + 1,
+                        'ultima_consulta': func.now()
+                    }
+                ))
+        except Exception as e:
+            print(f"Error recording cart demand: {e}")
+    
     def get_producto_info(self, ean: str) -> Dict[str, Any]:
         """
         Get producto information by EAN.
@@ -2,7 +2,7 @@
 
 import pandas as pd
 import math
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List
@@ -21,6 +21,8 @@ def load_data():
             print(f"✅ Conexión exitosa! Encontradas {len(categorias)} categorías")
         else:
             print("⚠️ Conexión establecida pero sin datos de categorías")
+        # Tabla de demanda por producto (la alimenta /api/comparar)
+        db_service.ensure_demand_table()
         print("¡Base de datos lista para usar!")
     except Exception as e:
         print(f"❌ ERROR CRÍTICO! No se pudo conectar a la base de datos: {e}")
@@ -75,10 +77,12 @@ def get_productos(q: str = None, categoria: str = None, min_supermercados: int =
         raise HTTPException(status_code=500, detail=f"Error obteniendo productos: {str(e)}")
 
 @app.post("/api/comparar", summary="Compara un carrito y devuelve los totales y detalles de precios")
-def comparar_carrito(request: ComparisonRequest):
+def comparar_carrito(request: ComparisonRequest, background_tasks: BackgroundTasks):
     try:
         # Get precios for the requested EANs
         eans_list = [item.ean for item in request.items]
+        # Demanda por producto para priorizar la actualización de precios (después de responder)
+        background_tasks.add_task(db_service.record_cart_demand, eans_list)
         precios_df = db_service.get_precios_for_comparison(eans_list)
         
         if precios_df.empty:
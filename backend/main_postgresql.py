@@ -8,11 +8,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, String
 
 # Importar modelos y conexión de base de datos
 from database.connection import get_db
-from database.models import Producto, Supermercado, Precio
+from database.models import Producto, Supermercado, PrecioActual
 
 # --- INICIALIZACIÓN ---
 app = FastAPI(title="API de Che Súper! - PostgreSQL")
@@ -103,11 +103,12 @@ def get_productos(
         # Subconsulta para contar supermercados por producto
         if min_supermercados > 1:
             subquery = db.query(
-                Precio.producto_id,
-                func.count(func.distinct(Precio.supermercado_id)).label('num_supermercados')
-            ).group_by(Precio.producto_id).subquery()
+                PrecioActual.producto_id,
+                func.count(func.distinct(PrecioActual.bandera)).label('num_supermercados')
+            ).filter(PrecioActual.activo == True).group_by(PrecioActual.producto_id).subquery()
             
-            query = query.join(subquery, Producto.id == subquery.c.producto_id).filter(
+            # producto_id es el EAN
+            query = query.join(subquery, Producto.ean == subquery.c.producto_id.cast(String)).filter(
                 subquery.c.num_supermercados >= min_supermercados
             )
         
@@ -124,8 +125,11 @@ def get_productos(
         productos_con_supermercados = []
         for producto in productos:
             supermercados_disponibles = db.query(Supermercado.nombre).join(
-                Precio, Supermercado.id == Precio.supermercado_id
-            ).filter(Precio.producto_id == producto.id).distinct().all()
+                PrecioActual, Supermercado.codigo == PrecioActual.bandera
+            ).filter(
+                PrecioActual.producto_id.cast(String) == producto.ean,
+                PrecioActual.activo == True
+            ).distinct().all()
             
             banderas_disponibles = [super[0] for super in supermercados_disponibles]
             
@@ -175,17 +179,17 @@ def comparar_carrito(request: ComparisonRequest, db: Session = Depends(get_db)):
                     continue
                 
                 # Buscar precios del producto en este supermercado
-                precio_query = db.query(Precio).filter(
+                precio_query = db.query(PrecioActual).filter(
                     and_(
-                        Precio.producto_id == producto.id,
-                        Precio.supermercado_id == supermercado.id,
-                        Precio.activo == True
+                        PrecioActual.producto_id.cast(String) == producto.ean,
+                        PrecioActual.bandera == supermercado.codigo,
+                        PrecioActual.activo == True
                     )
                 )
                 
                 # Obtener el mejor precio (mínimo)
-                precio_lista = precio_query.filter(Precio.precio_lista.isnot(None)).order_by(Precio.precio_lista).first()
-                precio_promo = precio_query.filter(Precio.precio_promo_a.isnot(None)).order_by(Precio.precio_promo_a).first()
+                precio_lista = precio_query.filter(PrecioActual.precio_lista.isnot(None)).order_by(PrecioActual.precio_lista).first()
+                precio_promo = precio_query.filter(PrecioActual.precio_promo_a.isnot(None)).order_by(PrecioActual.precio_promo_a).first()
                 
                 if not precio_lista:
                     continue
@@ -260,16 +264,16 @@ def optimizar_carrito(request: ComparisonRequest, db: Session = Depends(get_db))
             supermercados = db.query(Supermercado).filter(Supermercado.activo == True).all()
             
             for supermercado in supermercados:
-                precio_query = db.query(Precio).filter(
+                precio_query = db.query(PrecioActual).filter(
                     and_(
-                        Precio.producto_id == producto.id,
-                        Precio.supermercado_id == supermercado.id,
-                        Precio.activo == True
+                        PrecioActual.producto_id.cast(String) == producto.ean,
+                        PrecioActual.bandera == supermercado.codigo,
+                        PrecioActual.activo == True
                     )
                 )
                 
-                precio_lista = precio_query.filter(Precio.precio_lista.isnot(None)).order_by(Precio.precio_lista).first()
-                precio_promo = precio_query.filter(Precio.precio_promo_a.isnot(None)).order_by(Precio.precio_promo_a).first()
+                precio_lista = precio_query.filter(PrecioActual.precio_lista.isnot(None)).order_by(PrecioActual.precio_lista).first()
+                precio_promo = precio_query.filter(PrecioActual.precio_promo_a.isnot(None)).order_by(PrecioActual.precio_promo_a).first()
                 
                 if precio_lista:
                     precios_por_super[supermercado.nombre] = {
@@ -380,7 +384,7 @@ def get_stats(db: Session = Depends(get_db)):
     try:
         total_productos = db.query(Producto).count()
         total_supermercados = db.query(Supermercado).filter(Supermercado.activo == True).count()
-        total_precios = db.query(Precio).filter(Precio.activo == True).count()
+        total_precios = db.query(PrecioActual).filter(PrecioActual.activo == True).count()
         
         return {
             "total_productos": total_productos,
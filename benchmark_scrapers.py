@@ -0,0 +1,267 @@
+"""
+End-to-end throughput benchmark for the scrapers against the local mock API.
+Reports requests/s, products/s and p50/p99 latency per scraper.
+"""
+
+import sys
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+import requests
+
+from config import get_config
+from utils import setup_logging, format_number
+from mock_api_server import MockPreciosClarosAPI, MockPreciosClarosServer
+
+DEFAULT_SCRAPERS = ['api_client', 'unified', 'precios']
+BENCHMARK_TERMS = ['leche', 'aceite', 'arroz', 'galletitas', 'shampoo', 'cerveza', 'yerba', 'fideos']
+
+class LatencyRecorder:
+    """
+    Collects response latencies from one or more requests sessions.
+    """
+
+    def __init__(self):
+        """
+        Initialize the recorder.
+        """
+        self._lock = threading.Lock()
+        self.samples: List[float] = []
+
+    def attach(self, session: requests.Session):
+        """
+        Record the latency of every response received by a session.
+
+        Args:
+            session: Session to instrument
+        """
+        session.hooks['response'].append(self._record)
+
+    def _record(self, response: requests.Response, *args, **kwargs):
+        """
+        Response hook: store the time until the response headers arrived.
+
+        Args:
+            response: Received response
+        """
+        with self._lock:
+            self.samples.append(response.elapsed.total_seconds())
+
+    def percentile(self, p: float) -> float:
+        """
+        Latency percentile (nearest rank).
+
+        Args:
+            p: Percentile between 0 and 100
+
+        Returns:
+            Latency in seconds (0.0 without samples)
+        """
+        with self._lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        rank = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered))) - 1))
+        return ordered[rank]
+
+def _point_config_at(config: Dict[str, Any], server: MockPreciosClarosServer,
+                     max_rate: float, concurrency: int):
+    """
+    Redirect the shared configuration to the mock server.
+
+    get_config() returns the module-level dictionary, so every scraper built
+    afterwards picks up these values.
+
+    Args:
+        config: Configuration dictionary to modify in place
+        server: Running mock server
+        max_rate: Requests/second ceiling for the adaptive rate limiter
+        concurrency: Value for search.max_concurrent_requests
+    """
+    config['api']['products_url'] = server.products_url
+    config['api']['product_detail_url'] = server.product_detail_url
+    config['api']['rate_limit'] = 1.0 / max_rate
+    config['api']['rate_limiter'] = dict(config['api'].get('rate_limiter', {}),
+                                         max_rate=max_rate, burst=float(concurrency))
+    config['search']['max_concurrent_requests'] = concurrency
+
+def _run_api_client(config: Dict[str, Any], logger, recorder: LatencyRecorder, eans: List[str], **kwargs):
+    """
+    Fetch product details for `eans` with APIClient.fetch_many.
+    """
+    from api_client import APIClient
+    from scraper_precios_optimizado import ARRAY_SUCURSALES_ROSARIO
+
+    with APIClient(config, logger) as client:
+        recorder.attach(client.session)
+        client.fetch_many(eans, ARRAY_SUCURSALES_ROSARIO)
+
+def _run_unified(config: Dict[str, Any], logger, recorder: LatencyRecorder, terms: List[str], **kwargs):
+    """
+    Run the unified scraper's paginated search loop for `terms` (writes products to the database).
+    """
+    from unified_scraper import UnifiedProductScraper
+
+    scraper = UnifiedProductScraper()
+    recorder.attach(scraper.api_client.session)
+    scraper.is_running = True
+    try:
+        scraper._scrape_products(terms)
+    finally:
+        scraper.is_running = False
+        scraper.api_client.close()
+        scraper.search_strategy.close()
+
+def _run_precios(config: Dict[str, Any], logger, recorder: LatencyRecorder, limit: int,
+                 usar_async: bool = False, usar_pipeline: bool = False, **kwargs):
+    """
+    Run the price scraper for `limit` products (writes prices to the database).
+    """
+    from scraper_precios_optimizado import OptimizedPriceScraper
+
+    scraper = OptimizedPriceScraper()
+    recorder.attach(scraper.session)
+    scraper.ejecutar_scraping_completo(limite_productos=limit, forzar_actualizacion=True,
+                                       usar_async=usar_async, usar_pipeline=usar_pipeline)
+
+BENCHMARKS = {
+    'api_client': _run_api_client,
+    'unified': _run_unified,
+    'precios': _run_precios
+}
+
+def run_benchmark(name: str, api: MockPreciosClarosAPI, config: Dict[str, Any], logger,
+                  **kwargs) -> Optional[Dict[str, Any]]:
+    """
+    Run one scraper against the mock server and measure its throughput.
+
+    Args:
+        name: Key in BENCHMARKS
+        api: Mock API behind the running server (source of request/product counts)
+        config: Configuration dictionary already pointed at the mock server
+        logger: Logger instance
+        **kwargs: Workload parameters (eans, terms, limit, usar_async, usar_pipeline)
+
+    Returns:
+        Result dictionary, or None if the scraper could not run
+    """
+    recorder = LatencyRecorder()
+    before = api.get_statistics()
+    start = time.perf_counter()
+
+    try:
+        BENCHMARKS[name](config, logger, recorder, **kwargs)
+    except Exception as e:
+        logger.error(f"Benchmark '{name}' failed: {e}")
+        return None
+
+    elapsed = time.perf_counter() - start
+    after = api.get_statistics()
+    total_requests = after['total_requests'] - before['total_requests']
+    products = after['products_served'] - before['products_served']
+    throttled = sum(
+        count - before['status_counts'].get(status, 0)
+        for status, count in after['status_counts'].items() if status in (429, 503)
+    )
+
+    return {
+        'scraper': name,
+        'elapsed': elapsed,
+        'requests': total_requests,
+        'products': products,
+        'throttled': throttled,
+        'requests_per_second': total_requests / elapsed if elapsed else 0.0,
+        'products_per_second': products / elapsed if elapsed else 0.0,
+        'p50_latency': recorder.percentile(50),
+        'p99_latency': recorder.percentile(99)
+    }
+
+def print_results(results: List[Dict[str, Any]]):
+    """
+    Print benchmark results as a table.
+
+    Args:
+        results: Result dictionaries from run_benchmark
+    """
+    print("\n" + "=" * 86)
+    print(f"{'Scraper':<12}{'Tiempo':>9}{'Requests':>10}{'req/s':>9}{'Productos':>11}"
+          f"{'prod/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'429/5xx':>9}")
+    print("-" * 86)
+    for r in results:
+        print(f"{r['scraper']:<12}{r['elapsed']:>8.1f}s{r['requests']:>10}{r['requests_per_second']:>9.1f}"
+              f"{r['products']:>11}{r['products_per_second']:>9.1f}{r['p50_latency'] * 1000:>9.1f}"
+              f"{r['p99_latency'] * 1000:>9.1f}{r['throttled']:>9}")
+    print("=" * 86)
+
+def main():
+    """
+    Command line entry point.
+    """
+    opciones = {}
+    usar_async = False
+    usar_pipeline = False
+    for argumento in sys.argv[1:]:
+        if argumento == '--async':
+            usar_async = True
+        elif argumento == '--pipeline':
+            usar_pipeline = True
+        elif argumento.startswith('--') and '=' in argumento:
+            nombre, valor = argumento[2:].split('=', 1)
+            opciones[nombre] = valor
+        else:
+            print("Opciones disponibles:")
+            print("  --scrapers=a,b   : Scrapers a medir (api_client, unified, precios; default todos)")
+            print("  --products=N     : Productos para api_client y precios (default 200)")
+            print("  --terms=N        : Términos de búsqueda para unified (default 3)")
+            print("  --concurrency=N  : search.max_concurrent_requests (default 8)")
+            print("  --max-rate=R     : Techo del rate limiter en req/s (default 200)")
+            print("  --latency=S      : Latencia media del mock en segundos (default 0.05)")
+            print("  --jitter=S       : Desvío estándar de la latencia del mock")
+            print("  --error-429=F    : Fracción de respuestas 429")
+            print("  --error-5xx=F    : Fracción de respuestas 503")
+            print("  --async          : Usar el modo async del scraper de precios")
+            print("  --pipeline       : Usar el modo pipeline del scraper de precios")
+            print("Nota: unified y precios escriben en la base configurada en DATABASE_URL.")
+            return 1
+
+    scrapers = opciones.get('scrapers', ','.join(DEFAULT_SCRAPERS)).split(',')
+    unknown = [name for name in scrapers if name not in BENCHMARKS]
+    if unknown:
+        print(f"❌ Scrapers desconocidos: {', '.join(unknown)}")
+        return 1
+
+    config = get_config()
+    logger = setup_logging({'level': 'WARNING'})
+
+    api = MockPreciosClarosAPI(
+        latency=float(opciones.get('latency', 0.05)),
+        jitter=float(opciones.get('jitter', 0.0)),
+        error_429_rate=float(opciones.get('error-429', 0.0)),
+        error_5xx_rate=float(opciones.get('error-5xx', 0.0)),
+        seed=42
+    )
+    products = int(opciones.get('products', 200))
+    terms = BENCHMARK_TERMS[:int(opciones.get('terms', 3))]
+    eans = [product['ean'] for product in api.products[:products]]
+
+    results = []
+    with MockPreciosClarosServer(api) as server:
+        _point_config_at(config, server, float(opciones.get('max-rate', 200)), int(opciones.get('concurrency', 8)))
+        print(f"🧪 Mock API en {server.base_url} ({format_number(len(api.products))} productos)")
+
+        for name in scrapers:
+            print(f"\n⏱️  Midiendo {name}...")
+            result = run_benchmark(name, api, config, logger, eans=eans, terms=terms,
+                                   limit=products, usar_async=usar_async, usar_pipeline=usar_pipeline)
+            if result:
+                results.append(result)
+            else:
+                print(f"⚠️  {name} no pudo ejecutarse (ver log)")
+
+    if results:
+        print_results(results)
+    return 0 if results else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
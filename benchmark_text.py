@@ -0,0 +1,149 @@
+"""
+Microbenchmark for the text normalization helpers in utils.
+Compares the NFKD reference implementation with the fast, cached and batch variants
+over the product names and brands in productos.csv.
+"""
+
+import re
+import sys
+import time
+import unicodedata
+from typing import Callable, Dict, List, Any
+
+import pandas as pd
+
+from utils import (
+    normalize_text, normalize_text_cached, normalize_texts, normalize_series,
+    clean_product_name, clean_product_names, format_number
+)
+
+DEFAULT_FILE = 'productos.csv'
+
+def reference_normalize_text(text: str) -> str:
+    """
+    Previous normalize_text: full NFKD decomposition for every string.
+    """
+    if not isinstance(text, str) or not text:
+        return ""
+    nfkd_form = unicodedata.normalize('NFKD', text)
+    text_without_accents = ''.join([c for c in nfkd_form if not unicodedata.combining(c)])
+    return re.sub(r'\s+', ' ', text_without_accents.lower().strip())
+
+def reference_clean_product_name(name: str) -> str:
+    """
+    Previous clean_product_name: three regex passes per name.
+    """
+    if not name:
+        return ""
+    cleaned = re.sub(r'[^\w\s\-\.\,\(\)\%]', ' ', name.strip())
+    cleaned = re.sub(r'\s+', ' ', cleaned)
+    return ' '.join(word.capitalize() for word in cleaned.split())
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """
+    Best wall time of several runs.
+
+    Args:
+        func: Function to time
+        repeat: Number of runs
+
+    Returns:
+        Seconds taken by the fastest run
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmarks(names: List[str], brands: List[str], repeat: int) -> List[Dict[str, Any]]:
+    """
+    Time every variant and check it matches the reference output.
+
+    Args:
+        names: Product names
+        brands: Product brands (one per product, heavily repeated)
+        repeat: Runs per variant
+
+    Returns:
+        List of result dictionaries
+    """
+    brand_series = pd.Series(brands)
+    expected_names = [reference_normalize_text(name) for name in names]
+    expected_brands = [reference_normalize_text(brand) for brand in brands]
+    expected_clean = [reference_clean_product_name(name) for name in names]
+
+    cases = [
+        ('normalize nombres', 'referencia', lambda: [reference_normalize_text(n) for n in names], None),
+        ('normalize nombres', 'normalize_text', lambda: [normalize_text(n) for n in names], expected_names),
+        ('normalize nombres', 'normalize_texts', lambda: normalize_texts(names), expected_names),
+        ('normalize marcas', 'referencia', lambda: [reference_normalize_text(b) for b in brands], None),
+        ('normalize marcas', 'normalize_text', lambda: [normalize_text(b) for b in brands], expected_brands),
+        ('normalize marcas', 'cached', lambda: [normalize_text_cached(b) for b in brands], expected_brands),
+        ('normalize marcas', 'normalize_series', lambda: normalize_series(brand_series).tolist(), expected_brands),
+        ('clean nombres', 'referencia', lambda: [reference_clean_product_name(n) for n in names], None),
+        ('clean nombres', 'clean_product_name', lambda: [clean_product_name(n) for n in names], expected_clean),
+        ('clean nombres', 'clean_product_names', lambda: clean_product_names(names), expected_clean),
+    ]
+
+    results = []
+    baseline = {}
+    for group, variant, func, expected in cases:
+        if expected is not None and func() != expected:
+            print(f"❌ {group} / {variant} no coincide con la referencia")
+            continue
+        elapsed = measure(func, repeat)
+        if variant == 'referencia':
+            baseline[group] = elapsed
+        results.append({
+            'group': group,
+            'variant': variant,
+            'elapsed': elapsed,
+            'per_item_us': elapsed / max(len(names), 1) * 1e6,
+            'speedup': baseline[group] / elapsed if elapsed else 0.0
+        })
+    return results
+
+def print_results(results: List[Dict[str, Any]]):
+    """
+    Print the benchmark table.
+
+    Args:
+        results: Results from run_benchmarks
+    """
+    print("\n" + "=" * 70)
+    print(f"{'Caso':<20}{'Variante':<22}{'Tiempo':>10}{'us/item':>9}{'Speedup':>9}")
+    print("-" * 70)
+    for r in results:
+        print(f"{r['group']:<20}{r['variant']:<22}{r['elapsed'] * 1000:>8.1f}ms"
+              f"{r['per_item_us']:>9.2f}{r['speedup']:>8.1f}x")
+    print("=" * 70)
+
+def main():
+    """
+    Command line entry point.
+    """
+    opciones = {}
+    for argumento in sys.argv[1:]:
+        if argumento.startswith('--') and '=' in argumento:
+            nombre, valor = argumento[2:].split('=', 1)
+            opciones[nombre] = valor
+        else:
+            print("Opciones disponibles:")
+            print(f"  --file=PATH      : CSV con columnas nombre y marca (default {DEFAULT_FILE})")
+            print("  --repeat=N       : Repeticiones por variante, se toma la mejor (default 5)")
+            print("  --scale=N        : Repetir los productos N veces (default 1)")
+            return 1
+
+    df = pd.read_csv(opciones.get('file', DEFAULT_FILE), dtype=str, keep_default_na=False)
+    scale = int(opciones.get('scale', 1))
+    names = df['nombre'].tolist() * scale
+    brands = df['marca'].tolist() * scale
+    print(f"🧪 {format_number(len(names))} productos, {format_number(len(set(brands)))} marcas distintas")
+
+    print_results(run_benchmarks(names, brands, int(opciones.get('repeat', 5))))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
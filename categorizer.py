@@ -0,0 +1,198 @@
+"""
+Product categorizer for the scraper system.
+Word-level Aho-Corasick matcher compiled once from PRODUCT_CATEGORIES.
+"""
+
+import re
+import threading
+from collections import deque
+from typing import Dict, List, Iterable, Optional, Tuple
+
+from config import get_category_keywords
+from utils import normalize_text
+
+DEFAULT_CATEGORY = "Otros"
+
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Plural endings accepted after a keyword word ('galletitas', 'huevos', 'panes')
+PLURAL_SUFFIXES = ('es', 's')
+
+# Keyword words at least this long are stems: they also match longer words
+# that start with them ('yogur' -> 'yogurt', 'yogurisimo'). Shorter words
+# must match whole, so 'pan' does not match 'panal' nor 'papa' 'papel'.
+MIN_STEM_LENGTH = 5
+
+class ProductCategorizer:
+    """
+    Assigns a category to product names in a single pass over their words.
+
+    Keywords are compiled into an Aho-Corasick automaton whose alphabet is
+    words, not characters, so a keyword only matches whole words: 'te' no
+    longer matches 'aceite' and 'pan' no longer matches 'panal'. A name word
+    also matches a keyword word plus a plural ending, and a name word that
+    starts with a keyword word of MIN_STEM_LENGTH or more letters.
+
+    When several keywords match, the category listed first in
+    PRODUCT_CATEGORIES wins, so 'Jugo De Naranja' is a drink and not a
+    fruit. Within a category the most specific (longest) keyword wins.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]], default: str = DEFAULT_CATEGORY):
+        """
+        Compile the matcher.
+
+        Args:
+            categories: Category name -> keywords, in priority order
+            default: Category for names that match no keyword
+        """
+        self.default = default
+        self.categories = list(categories)
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Best (priority, category) ending at each state, including fail-link suffixes
+        self._best: List[Optional[Tuple[Tuple[int, int], str]]] = [None]
+        self._vocabulary = set()
+        self._canonical_cache: Dict[str, Optional[str]] = {}
+
+        for category_index, (category, keywords) in enumerate(categories.items()):
+            for keyword in keywords:
+                words = WORD_PATTERN.findall(normalize_text(keyword))
+                if words:
+                    self._add(words, (-category_index, len(' '.join(words))), category)
+
+        self._build_fail_links()
+
+    def _add(self, words: List[str], priority: Tuple[int, int], category: str):
+        """
+        Add a keyword to the trie.
+
+        Args:
+            words: Normalized keyword words
+            priority: Sort key, higher wins
+            category: Category of the keyword
+        """
+        state = 0
+        for word in words:
+            self._vocabulary.add(word)
+            next_state = self._goto[state].get(word)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+                self._goto[state][word] = next_state
+            state = next_state
+
+        current = self._best[state]
+        if current is None or priority > current[0]:
+            self._best[state] = (priority, category)
+
+    def _build_fail_links(self):
+        """
+        Compute fail links breadth-first and fold each state's fail output into its own.
+        """
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(word, 0)
+
+                inherited = self._best[self._fail[next_state]]
+                if inherited is not None and (self._best[next_state] is None or inherited[0] > self._best[next_state][0]):
+                    self._best[next_state] = inherited
+                queue.append(next_state)
+
+    def _canonical(self, word: str) -> Optional[str]:
+        """
+        Keyword word a name word stands for.
+
+        Args:
+            word: Normalized name word
+
+        Returns:
+            Vocabulary word, or None if the word is not part of any keyword
+        """
+        if word in self._vocabulary:
+            return word
+        cached = self._canonical_cache.get(word, False)
+        if cached is not False:
+            return cached
+
+        canonical = None
+        for suffix in PLURAL_SUFFIXES:
+            if word.endswith(suffix) and word[:-len(suffix)] in self._vocabulary:
+                canonical = word[:-len(suffix)]
+                break
+        else:
+            # Longest stem the word starts with
+            for length in range(len(word) - 1, MIN_STEM_LENGTH - 1, -1):
+                if word[:length] in self._vocabulary:
+                    canonical = word[:length]
+                    break
+
+        self._canonical_cache[word] = canonical
+        return canonical
+
+    def categorize(self, product_name: str) -> str:
+        """
+        Categorize one product name.
+
+        Args:
+            product_name: Product name
+
+        Returns:
+            Category name
+        """
+        if not product_name:
+            return self.default
+
+        goto, fail, best_at = self._goto, self._fail, self._best
+        state = 0
+        best = None
+        for word in WORD_PATTERN.findall(normalize_text(product_name)):
+            word = self._canonical(word)
+            if word is None:
+                state = 0
+                continue
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            match = best_at[state]
+            if match is not None and (best is None or match[0] > best[0]):
+                best = match
+
+        return best[1] if best else self.default
+
+    def categorize_many(self, product_names: Iterable[str]) -> List[str]:
+        """
+        Categorize a batch of product names.
+
+        Args:
+            product_names: Product names
+
+        Returns:
+            Categories, in the same order
+        """
+        categorize = self.categorize
+        return [categorize(name) for name in product_names]
+
+_shared_categorizer: Optional[ProductCategorizer] = None
+_shared_categorizer_lock = threading.Lock()
+
+def get_categorizer() -> ProductCategorizer:
+    """
+    Get the categorizer compiled from PRODUCT_CATEGORIES, shared by every manager.
+
+    Returns:
+        ProductCategorizer instance
+    """
+    global _shared_categorizer
+    with _shared_categorizer_lock:
+        if _shared_categorizer is None:
+            _shared_categorizer = ProductCategorizer(get_category_keywords())
+        return _shared_categorizer
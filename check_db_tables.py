@@ -6,7 +6,7 @@ Simple script to check database tables content.
 def check_tables():
     try:
         from backend.database.connection import SessionLocal
-        from backend.database.models import Producto, Supermercado, Precio
+        from backend.database.models import Producto, Supermercado, PrecioActual, PrecioHistorial
         
         print("🔍 CHECKING DATABASE TABLES")
         print("=" * 50)
@@ -24,14 +24,17 @@ def check_tables():
             for s in supermercados:
                 print(f"  - ID: {s.id}, Código: '{s.codigo}', Nombre: {s.nombre}")
             
-            # Check precios
-            precios_count = session.query(Precio).count()
-            print(f"\n💰 PRECIOS: {precios_count} total")
+            # Check precios (último precio por producto y bandera, más el historial de cambios)
+            precios_count = session.query(PrecioActual).count()
+            print(f"\n💰 PRECIOS ACTUALES: {precios_count} total")
             
             if precios_count > 0:
-                precios = session.query(Precio).limit(3).all()
+                precios = session.query(PrecioActual).limit(3).all()
                 for p in precios:
-                    print(f"  - ID: {p.id}, Producto: {p.producto_id}, Super: {p.supermercado_id}, Precio: ${p.precio_lista}")
+                    print(f"  - Producto: {p.producto_id}, Bandera: {p.bandera}, Precio: ${p.precio_lista}")
+            
+            historial_count = session.query(PrecioHistorial).count()
+            print(f"\n📈 PRECIOS HISTORIAL: {historial_count} registros")
         
         print("\n" + "=" * 50)
         
@@ -6,23 +6,48 @@ Centralizes all settings for better maintainability and flexibility.
 import os
 from typing import Dict, List, Any
 
+# Base URL of the Precios Claros API (point it at mock_api_server.py for offline runs)
+API_BASE_URL = os.getenv('PRECIOS_CLAROS_API_URL', 'https://d3e6htiiul5ek9.cloudfront.net/prod').rstrip('/')
+
 # === ROSARIO CONFIGURATION ===
 ROSARIO_CONFIG = {
     'location': {
         'name': 'Rosario',
         'lat': -32.9478,
-        'lng': -60.6305
+        'lng': -60.6305,
+        'tiles': {
+            'enabled': False,  # geo-tiled discovery (--tiles)
+            # (lat, lng) outline of the area to cover: Rosario and its edges
+            'polygon': [
+                (-32.870, -60.700), (-32.895, -60.660), (-32.935, -60.630), (-32.975, -60.620),
+                (-33.030, -60.630), (-33.035, -60.700), (-33.000, -60.780), (-32.920, -60.790)
+            ],
+            'spacing_km': 3.0,  # distance between grid points
+            'yield_decay': 0.9,  # weight of a tile's older searches in its yield
+            'prior_requests': 2.0,  # weight of the prior given to untried tiles
+            'min_new_per_request': 0.5,  # a tile below this recent yield is dropped
+            'min_requests': 5  # requests before a tile can be dropped
+        }
     },
     'files': {
         'products': 'base_de_productos_rosario.xlsx',
-        'prices': 'precios_obtenidos_rosario.xlsx'
+        'prices': 'precios_obtenidos_rosario.xlsx',
+        'prices_backup_dir': 'precios_backup'  # append-only CSV part files
     },
     'api': {
-        'products_url': 'https://d3e6htiiul5ek9.cloudfront.net/prod/productos',
-        'product_detail_url': 'https://d3e6htiiul5ek9.cloudfront.net/prod/producto',
+        'products_url': f'{API_BASE_URL}/productos',
+        'product_detail_url': f'{API_BASE_URL}/producto',
         'image_base_url': 'https://imagenes.preciosclaros.gob.ar/productos',
         'timeout': 15,
-        'rate_limit': 1.2,  # seconds between requests
+        'rate_limit': 1.2,  # initial seconds between requests (adapted at runtime)
+        'rate_limiter': {
+            'min_rate': 0.2,  # requests/second floor after repeated throttling
+            'max_rate': 5.0,  # requests/second ceiling while responses are healthy
+            'burst': 1.0,  # requests that may be sent back to back
+            'increase_step': 0.02,  # requests/second added per healthy response
+            'decrease_factor': 0.5,  # rate multiplier on 429/5xx
+            'max_pause': 60.0  # cap on a shared Retry-After pause (seconds)
+        },
         'max_retries': 3,
         'retry_backoff': 2.0,  # exponential backoff multiplier
         'page_limit': 50
@@ -33,7 +58,64 @@ ROSARIO_CONFIG = {
         'use_brands': True,
         'use_fallback_combinations': True,  # Enable for maximum coverage
         'batch_save_size': 50,  # Save more frequently for safety
-        'max_concurrent_requests': 3
+        'known_index': True,  # keep stored EANs in memory and skip products that would not change
+        'term_policy': 'thompson',  # next term: 'thompson' or 'ucb' (learned yield) or 'heuristic' (fixed order)
+        'term_stats_path': 'term_stats.sqlite',  # new products per request by term, kept across runs
+        'term_stats_decay': 0.7,  # weight of past runs, applied once per new run
+        'term_prior_requests': 2.0,  # requests' worth of confidence in the heuristic for untested terms
+        'ucb_exploration': 1.0,
+        'min_page_novelty': 0.02,  # stop a term when its last pages bring fewer new EANs than this share
+        'novelty_window_pages': 2,
+        'run_stop_new_per_request': 0.05,  # stop the run when recent requests average fewer new products
+        'run_stop_window': 200,  # requests in that moving average
+        'run_stop_min_requests': 500,
+        'catalog_terms': {
+            'enabled': True,  # mine brands, sizes and rare name words from productos (replaces fallback pairs)
+            'min_df': 3,  # products a term must match in the stored catalog
+            'max_df': 2000,  # broader terms are left to the keyword lists
+            'max_terms': 1500,
+            'min_new_per_request': 1.0  # stop the greedy cover below this marginal yield
+        },
+        'max_concurrent_requests': 3,
+        'parallel_terms': 2,  # terms searched at once by the unified scraper
+        'page_prefetch': 3  # pages of a term requested ahead once its total is known
+    },
+    'prices': {
+        'staleness_hours': 20,  # EANs priced more recently than this are skipped (unless --force)
+        'bulk_method': 'insert',  # 'insert' (multi-row INSERT) or 'copy' (COPY FROM STDIN)
+        'change_detection': True,  # insert only prices that moved; bump fecha_actualizacion otherwise
+        'pipeline': {
+            'parse_workers': 2,  # threads parsing API responses (--pipeline)
+            'write_workers': 2,  # batches written to the database concurrently
+            'queue_size': 100  # responses waiting per stage before fetching blocks
+        },
+        'sharding': {
+            'shards': 32,  # EAN ranges per refresh run (--worker)
+            'lease_seconds': 300,  # a shard without heartbeat for this long can be taken over
+            'heartbeat_seconds': 60
+        },
+        'scheduler': {
+            'daily_budget': 8000,  # product requests per day in --scheduled mode
+            'history_days': 90,  # precios_historial window used to estimate change rates
+            'prior_changes_per_day': 0.1,  # assumed rate for products with little history
+            'prior_days': 14,  # weight of the prior, in days of observation
+            'demand_weight': 1.0  # extra priority per log(1 + carts that included the product)
+        }
+    },
+    'journal': {
+        'enabled': True,  # resume interrupted runs from a local SQLite journal (--fresh to restart)
+        'path': 'scrape_journal.sqlite'
+    },
+    'cache': {
+        'enabled': False,  # on-disk API response cache (--cache / --replay)
+        'replay': False,  # serve only from the cache, never hit the API
+        'dir': 'api_cache',
+        'max_size_mb': 500,  # compressed size before LRU eviction
+        'default_ttl': 3600,  # seconds
+        'ttl': {
+            'productos': 6 * 3600,  # search pages change slowly
+            'producto': 3600  # prices move during the day
+        }
     }
 }
 
@@ -0,0 +1,117 @@
+"""
+Coverage estimation module for the product scraper system.
+Estimates catalog size from overlapping search results and tracks the recent discovery rate.
+"""
+
+from collections import deque
+from typing import Dict, Any, Iterable, Optional
+
+from utils import ean_key
+
+class CoverageEstimator:
+    """
+    Running capture-recapture estimate of the catalog reachable by search.
+
+    Every search page is a sample. Using the Schnabel estimator, a page of C
+    products, R of them already seen earlier in the run, when M distinct
+    products had been seen before the page, gives N = sum(C * M) / sum(R).
+    Search pages are not random samples (popular products come back far
+    more often), so the estimate is a lower bound and is best read as a
+    trend.
+
+    It also keeps the number of products new to the database per request
+    over the last `window` requests, which is the signal used to stop a run
+    that no longer discovers anything.
+    """
+
+    def __init__(self, window: int = 200):
+        """
+        Initialize the estimator.
+
+        Args:
+            window: Requests in the moving discovery rate
+        """
+        self.window = max(1, window)
+
+        self._seen = set()
+        self._recent_new = deque(maxlen=self.window)
+        self._sum_catch_marked = 0.0
+        self._sum_recaptures = 0
+
+        self.requests = 0
+        self.new_products = 0
+
+    def record_page(self, eans: Iterable[str], new_products: int):
+        """
+        Record the result of one search request.
+
+        Args:
+            eans: EANs returned by the page (empty for an empty page)
+            new_products: Products on the page that were new to the database
+        """
+        keys = {ean_key(str(ean)) for ean in eans if ean}
+        marked = len(self._seen)
+        recaptures = sum(1 for key in keys if key in self._seen)
+
+        self._sum_catch_marked += len(keys) * marked
+        self._sum_recaptures += recaptures
+        self._seen.update(keys)
+
+        self.requests += 1
+        self.new_products += new_products
+        self._recent_new.append(new_products)
+
+    def estimated_catalog_size(self) -> Optional[float]:
+        """
+        Schnabel estimate of the number of distinct products.
+
+        Returns:
+            Estimated size, or None before the first recapture
+        """
+        if self._sum_recaptures == 0:
+            return None
+        return max(self._sum_catch_marked / self._sum_recaptures, float(len(self._seen)))
+
+    def recent_new_per_request(self) -> float:
+        """
+        New products per request over the moving window.
+
+        Returns:
+            Average of the last `window` requests
+        """
+        if not self._recent_new:
+            return 0.0
+        return sum(self._recent_new) / len(self._recent_new)
+
+    def should_stop(self, min_new_per_request: float, min_requests: int) -> bool:
+        """
+        Check whether discovery has dried up.
+
+        Args:
+            min_new_per_request: Discovery rate below which the run stops
+            min_requests: Requests to make before the rule applies
+
+        Returns:
+            True if the recent discovery rate is below the threshold
+        """
+        if self.requests < max(min_requests, self.window):
+            return False
+        return self.recent_new_per_request() < min_new_per_request
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get coverage statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        estimate = self.estimated_catalog_size()
+        return {
+            'requests': self.requests,
+            'new_products': self.new_products,
+            'distinct_seen': len(self._seen),
+            'recaptures': self._sum_recaptures,
+            'estimated_catalog_size': int(estimate) if estimate else None,
+            'coverage_pct': round(len(self._seen) / estimate * 100, 1) if estimate else None,
+            'recent_new_per_request': round(self.recent_new_per_request(), 3)
+        }
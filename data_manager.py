@@ -14,7 +14,7 @@ from utils import (
     construct_image_url, calculate_data_completeness,
     merge_product_data, format_number, get_timestamp
 )
-from config import get_category_keywords
+from categorizer import get_categorizer
 from database_manager import DatabaseManager
 
 class DataManager:
@@ -33,7 +33,7 @@ class DataManager:
         self.config = config
         self.logger = logger
         self.products_file = config['files']['products']
-        self.category_keywords = get_category_keywords()
+        self.categorizer = get_categorizer()
         
         # Initialize database manager
         self.db_manager = DatabaseManager(config, logger)
@@ -56,10 +56,14 @@ class DataManager:
                 self.logger.error("Cannot connect to database")
                 return 0
             
-            # Skip counting for now to avoid blocking - just mark as loaded
             self.products_loaded = True
             self.last_save_count = 0
             
+            # Index of stored EANs: products that would not change never reach the database
+            if self.config['search'].get('known_index', False):
+                return self.db_manager.load_known_index()
+            
+            # Skip counting for now to avoid blocking
             self.logger.info("Database connection established - ready to process products")
             return 0  # Return 0 to avoid the slow count query
             
@@ -85,6 +89,21 @@ class DataManager:
             self.logger.error(f"Error adding product to database: {e}")
             return False
     
+    def add_products(self, products: List[Dict[str, Any]],
+                     inserted_eans: Optional[List[str]] = None) -> Tuple[int, int]:
+        """
+        Add or update a page of products with one database round trip.
+        
+        Args:
+            products: Product information dictionaries
+            inserted_eans: If given, the EANs of the added products are appended to it
+            
+        Returns:
+            Tuple of (added, updated) counts
+        """
+        inserted, updated, _ = self.db_manager.bulk_upsert_products(products, inserted_eans)
+        return inserted, updated
+    
     def _get_image_url(self, product_data: Dict[str, Any], ean: str) -> str:
         """
         Get or construct image URL for product.
@@ -115,16 +134,7 @@ class DataManager:
         Returns:
             Category name
         """
-        if not product_name:
-            return "Otros"
-        
-        normalized_name = normalize_text(product_name)
-        
-        for category, keywords in self.category_keywords.items():
-            if any(keyword in normalized_name for keyword in keywords):
-                return category
-        
-        return "Otros"
+        return self.categorizer.categorize(product_name)
     
     def get_product_count(self) -> int:
         """
@@ -4,16 +4,19 @@ Handles all database interactions for the product scraper system.
 """
 
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterable
 from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, or_, case, cast, update, Float, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from backend.database.connection import SessionLocal, engine, test_connection
 from backend.database.models import Producto
+from known_products import KnownProductIndex
+from categorizer import get_categorizer
 from utils import (
-    normalize_text, clean_product_name, validate_ean, 
+    normalize_text, clean_product_name, clean_ean, validate_ean, 
     calculate_data_completeness, merge_product_data, 
     format_number, get_timestamp
 )
@@ -35,11 +38,18 @@ class DatabaseManager:
         self.logger = logger
         self.connection_tested = False
         
+        # Keyword matcher shared with DataManager
+        self.categorizer = get_categorizer()
+        
+        # EANs already stored, to skip products that would not change (see load_known_index)
+        self.known_index: Optional[KnownProductIndex] = None
+        
         # Statistics tracking
         self.stats = {
             'products_inserted': 0,
             'products_updated': 0,
             'products_skipped': 0,
+            'products_unchanged': 0,
             'database_errors': 0,
             'last_operation_time': None
         }
@@ -102,6 +112,46 @@ class DatabaseManager:
             if session:
                 session.close()
     
+    def load_known_index(self) -> int:
+        """
+        Load every stored EAN with its completeness score and name length
+        into a KnownProductIndex, streaming the table in chunks.
+        
+        Returns:
+            Number of products indexed
+        """
+        def parse_score(value: Optional[str]) -> float:
+            try:
+                return float(value) if value else 0.0
+            except (TypeError, ValueError):
+                return 0.0
+        
+        index = KnownProductIndex(self.logger)
+        try:
+            with self.get_session() as session:
+                rows = session.query(
+                    Producto.ean, Producto.completeness_score, func.coalesce(func.length(Producto.nombre), 0)
+                ).yield_per(10000)
+                index.load((ean, parse_score(score), name_length) for ean, score, name_length in rows)
+        except Exception as e:
+            self.logger.error(f"Error loading known product index, filtering disabled: {e}")
+            self.known_index = None
+            return 0
+        
+        self.known_index = index
+        return len(index)
+    
+    def iter_product_names(self) -> Iterable[Tuple[str, str]]:
+        """
+        Stream the name and brand of every stored product.
+        
+        Yields:
+            Tuples of (nombre, marca)
+        """
+        with self.get_session() as session:
+            for nombre, marca in session.query(Producto.nombre, Producto.marca).yield_per(10000):
+                yield nombre, marca
+    
     def product_exists(self, ean: str) -> bool:
         """
         Check if a product exists in the database by EAN.
@@ -160,158 +210,132 @@ class DatabaseManager:
         Returns:
             True if product was added/updated successfully
         """
+        inserted, updated, _ = self.bulk_upsert_products([product_data])
+        return inserted + updated > 0
+    
+    def _prepare_product(self, product_data: Dict[str, Any], categoria: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Clean an API product into a productos row.
+        
+        Args:
+            product_data: Product information dictionary
+            categoria: Category already computed for the product (None = categorize now)
+            
+        Returns:
+            Row dictionary, or None if the EAN is invalid
+        """
         raw_ean = str(product_data.get('id', product_data.get('ean', '')))
         
         # Clean EAN by removing hyphens and other separators
-        cleaned_ean = raw_ean.replace('-', '').replace('_', '').replace(' ', '')
+        cleaned_ean = clean_ean(raw_ean)
         
         if not validate_ean(cleaned_ean):
-            self.stats['products_skipped'] += 1
-            return False
+            return None
         
-        # Clean and prepare product data
         cleaned_product = {
             'ean': cleaned_ean,
             'nombre': clean_product_name(str(product_data.get('nombre', ''))),
             'marca': str(product_data.get('marca', '')),
-            'categoria': self._categorize_product(str(product_data.get('nombre', ''))),
-            'completeness_score': 0.0  # Will be calculated below
+            'categoria': categoria or self._categorize_product(str(product_data.get('nombre', ''))),
         }
-        
-        # Calculate completeness score
         cleaned_product['completeness_score'] = calculate_data_completeness(cleaned_product)
-        
-        session = None
-        try:
-            session = self.get_session()
-            
-            # Try to insert first (most common case for new products)
-            try:
-                new_product = Producto(
-                    ean=cleaned_product['ean'],
-                    nombre=cleaned_product['nombre'],
-                    marca=cleaned_product['marca'],
-                    categoria=cleaned_product['categoria'],
-                    completeness_score=str(round(cleaned_product['completeness_score'], 3)),
-                    image_url=None
-                )
-                
-                session.add(new_product)
-                session.commit()
-                
-                self.stats['products_inserted'] += 1
-                return True
-                
-            except IntegrityError:
-                # Product already exists, try to update
-                session.rollback()
-                
-                existing_product = session.query(Producto).filter(Producto.ean == cleaned_ean).first()
-                if existing_product:
-                    return self._update_existing_product(session, existing_product, cleaned_product)
-                else:
-                    self.stats['products_skipped'] += 1
-                    return False
-                    
-        except Exception as e:
-            if session:
-                session.rollback()
-            self.logger.error(f"Error adding/updating product (EAN: {cleaned_ean}): {e}")
-            self.stats['database_errors'] += 1
-            return False
-        finally:
-            if session:
-                session.close()
+        return cleaned_product
     
-    def _update_existing_product(self, session: Session, existing_product: Producto, new_data: Dict[str, Any]) -> bool:
+    def bulk_upsert_products(self, products: List[Dict[str, Any]],
+                             inserted_eans: Optional[List[str]] = None) -> Tuple[int, int, int]:
         """
-        Update an existing product with new data.
+        Insert or improve a page of products with a single statement.
+        
+        Uses INSERT ... ON CONFLICT (ean) DO UPDATE, where the update only
+        happens if it raises the completeness score or brings a longer (more
+        descriptive) name, and merges like merge_product_data: empty fields are
+        filled, existing ones kept. RETURNING reports which rows were inserted
+        (xmax = 0) and which were updated; skipped rows are not returned.
+        Known products the index says would not improve are counted in
+        products_unchanged, not products_skipped.
         
         Args:
-            session: Database session
-            existing_product: Existing product model
-            new_data: New product data
+            products: Product dictionaries as returned by the API
+            inserted_eans: If given, the EANs of the inserted rows are appended to it
             
         Returns:
-            True if updated successfully
+            Tuple of (inserted, updated, skipped) counts
         """
+        rows: Dict[str, Dict[str, Any]] = {}
+        invalid = 0
+        unchanged = 0
+        categories = self.categorizer.categorize_many(str(product.get('nombre', '')) for product in products)
+        for product_data, categoria in zip(products, categories):
+            row = self._prepare_product(product_data, categoria)
+            if row is None:
+                invalid += 1
+                continue
+            # Known products that would not improve are filtered in memory
+            if self.known_index is not None and not self.known_index.needs_write(
+                    row['ean'], row['completeness_score'], len(row['nombre'])):
+                unchanged += 1
+                continue
+            # One row per EAN: ON CONFLICT cannot touch the same row twice
+            previous = rows.get(row['ean'])
+            if previous is None or (row['completeness_score'], len(row['nombre'])) > \
+                    (previous['completeness_score'], len(previous['nombre'])):
+                rows[row['ean']] = row
+        
+        self.stats['products_unchanged'] += unchanged
+        if not rows:
+            self.stats['products_skipped'] += invalid
+            return 0, 0, len(products)
+        
+        values = [
+            dict(row, completeness_score=str(round(row['completeness_score'], 3)), image_url=None)
+            for _, row in sorted(rows.items())
+        ]
+        
+        statement = pg_insert(Producto).values(values)
+        excluded = statement.excluded
+        current_score = func.coalesce(cast(func.nullif(Producto.completeness_score, ''), Float), 0.0)
+        new_score = cast(excluded.completeness_score, Float)
+        longer_name = func.length(excluded.nombre) > func.length(func.coalesce(Producto.nombre, ''))
+        
+        statement = statement.on_conflict_do_update(
+            index_elements=[Producto.ean],
+            set_={
+                'nombre': case((longer_name, excluded.nombre), else_=Producto.nombre),
+                'marca': func.coalesce(func.nullif(Producto.marca, ''), excluded.marca),
+                'categoria': func.coalesce(func.nullif(Producto.categoria, ''), excluded.categoria),
+                'completeness_score': case((new_score > current_score, excluded.completeness_score),
+                                           else_=Producto.completeness_score),
+                'updated_at': func.now()
+            },
+            where=or_(new_score > current_score, longer_name)
+        ).returning(Producto.ean, literal_column('xmax = 0'),
+                    Producto.completeness_score, func.length(Producto.nombre))
+        
         try:
-            # Convert existing product to dict for comparison
-            existing_data = {
-                'ean': existing_product.ean,
-                'nombre': existing_product.nombre,
-                'marca': existing_product.marca,
-                'categoria': existing_product.categoria,
-                'completeness_score': float(existing_product.completeness_score) if existing_product.completeness_score else 0.0
-            }
-            
-            # Merge data (prioritize more complete data)
-            merged_data = merge_product_data(existing_data, new_data)
-            
-            # Check if update is needed
-            if (merged_data['completeness_score'] > existing_data['completeness_score'] or
-                merged_data != existing_data):
-                
-                # Update fields
-                existing_product.nombre = merged_data['nombre']
-                existing_product.marca = merged_data['marca']
-                existing_product.categoria = merged_data['categoria']
-                existing_product.completeness_score = str(round(merged_data['completeness_score'], 3))
-                existing_product.updated_at = func.now()
-                
+            with self.get_session() as session:
+                results = session.execute(statement).all()
                 session.commit()
-                self.stats['products_updated'] += 1
-                self.logger.debug(f"Updated product: {existing_product.ean}")
-                return True
-            else:
-                self.stats['products_skipped'] += 1
-                return False
-                
         except Exception as e:
-            session.rollback()
-            self.logger.error(f"Error updating product: {e}")
+            self.logger.error(f"Error in bulk product upsert ({len(values)} products): {e}")
             self.stats['database_errors'] += 1
-            return False
-    
-    def _insert_new_product(self, session: Session, product_data: Dict[str, Any]) -> bool:
-        """
-        Insert a new product into the database.
+            return 0, 0, len(products)
         
-        Args:
-            session: Database session
-            product_data: Product data dictionary
-            
-        Returns:
-            True if inserted successfully
-        """
-        try:
-            new_product = Producto(
-                ean=product_data['ean'],
-                nombre=product_data['nombre'],
-                marca=product_data['marca'],
-                categoria=product_data['categoria'],
-                completeness_score=str(round(product_data['completeness_score'], 3)),
-                image_url=None  # Will be handled later if needed
-            )
-            
-            session.add(new_product)
-            session.commit()
-            
-            self.stats['products_inserted'] += 1
-            self.logger.debug(f"Inserted new product: {product_data['ean']}")
-            return True
-            
-        except IntegrityError as e:
-            session.rollback()
-            # This might happen if another process inserted the same EAN
-            self.logger.warning(f"Integrity error inserting product (EAN: {product_data['ean']}): {e}")
-            self.stats['products_skipped'] += 1
-            return False
-        except Exception as e:
-            session.rollback()
-            self.logger.error(f"Error inserting product: {e}")
-            self.stats['database_errors'] += 1
-            return False
+        if self.known_index is not None:
+            for ean, _, score, name_length in results:
+                self.known_index.update(ean, float(score or 0.0), name_length or 0)
+        
+        inserted = sum(1 for _, was_inserted, _, _ in results if was_inserted)
+        if inserted_eans is not None:
+            inserted_eans.extend(ean for ean, was_inserted, _, _ in results if was_inserted)
+        updated = len(results) - inserted
+        skipped = len(products) - inserted - updated
+        
+        self.stats['products_inserted'] += inserted
+        self.stats['products_updated'] += updated
+        self.stats['products_skipped'] += skipped - unchanged
+        self.stats['last_operation_time'] = get_timestamp()
+        
+        return inserted, updated, skipped
     
     def _categorize_product(self, product_name: str) -> str:
         """
@@ -323,20 +347,37 @@ class DatabaseManager:
         Returns:
             Category name
         """
-        if not product_name:
-            return "Otros"
-        
-        # Import here to avoid circular imports
-        from config import get_category_keywords
-        category_keywords = get_category_keywords()
-        
-        normalized_name = normalize_text(product_name)
-        
-        for category, keywords in category_keywords.items():
-            if any(keyword in normalized_name for keyword in keywords):
-                return category
+        return self.categorizer.categorize(product_name)
+    
+    def recategorize_products(self) -> int:
+        """
+        Recompute the category of every stored product and save the ones that changed.
+        Useful after editing PRODUCT_CATEGORIES.
         
-        return "Otros"
+        Returns:
+            Number of products whose category changed
+        """
+        try:
+            with self.get_session() as session:
+                products = session.query(Producto.id, Producto.nombre, Producto.categoria).all()
+                categories = self.categorizer.categorize_many(nombre or '' for _, nombre, _ in products)
+                
+                changes = [
+                    {'id': product_id, 'categoria': categoria}
+                    for (product_id, _, current), categoria in zip(products, categories)
+                    if categoria != current
+                ]
+                if changes:
+                    # Bulk UPDATE by primary key (executemany)
+                    session.execute(update(Producto), changes)
+                    session.commit()
+                
+                self.logger.info(f"Recategorized {format_number(len(products))} products: "
+                                 f"{format_number(len(changes))} changed category")
+                return len(changes)
+        except Exception as e:
+            self.logger.error(f"Error recategorizing products: {e}")
+            return 0
     
     def get_product_count(self) -> int:
         """
@@ -505,98 +546,10 @@ class DatabaseManager:
         if not products:
             return 0, 0, 0
         
-        inserted = 0
-        updated = 0
-        skipped = 0
-        
-        try:
-            with self.get_session() as session:
-                for product_data in products:
-                    result = self._process_single_product_in_session(session, product_data)
-                    if result == 'inserted':
-                        inserted += 1
-                    elif result == 'updated':
-                        updated += 1
-                    else:
-                        skipped += 1
-                
-                session.commit()
-                self.logger.info(f"Batch save completed: {inserted} inserted, {updated} updated, {skipped} skipped")
-                
-        except Exception as e:
-            self.logger.error(f"Error in batch save: {e}")
-            
+        inserted, updated, skipped = self.bulk_upsert_products(products)
+        self.logger.info(f"Batch save completed: {inserted} inserted, {updated} updated, {skipped} skipped")
         return inserted, updated, skipped
     
-    def _process_single_product_in_session(self, session: Session, product_data: Dict[str, Any]) -> str:
-        """
-        Process a single product within an existing session.
-        
-        Args:
-            session: Database session
-            product_data: Product data dictionary
-            
-        Returns:
-            'inserted', 'updated', or 'skipped'
-        """
-        raw_ean = str(product_data.get('id', product_data.get('ean', '')))
-        cleaned_ean = raw_ean.replace('-', '').replace('_', '').replace(' ', '')
-        
-        if not validate_ean(cleaned_ean):
-            return 'skipped'
-        
-        # Clean and prepare product data
-        cleaned_product = {
-            'ean': cleaned_ean,
-            'nombre': clean_product_name(str(product_data.get('nombre', ''))),
-            'marca': str(product_data.get('marca', '')),
-            'categoria': self._categorize_product(str(product_data.get('nombre', ''))),
-            'completeness_score': 0.0
-        }
-        
-        cleaned_product['completeness_score'] = calculate_data_completeness(cleaned_product)
-        
-        # Check if product exists
-        existing_product = session.query(Producto).filter(Producto.ean == cleaned_ean).first()
-        
-        if existing_product:
-            # Update logic
-            existing_data = {
-                'ean': existing_product.ean,
-                'nombre': existing_product.nombre,
-                'marca': existing_product.marca,
-                'categoria': existing_product.categoria,
-                'completeness_score': float(existing_product.completeness_score) if existing_product.completeness_score else 0.0
-            }
-            
-            merged_data = merge_product_data(existing_data, cleaned_product)
-            
-            if (merged_data['completeness_score'] > existing_data['completeness_score'] or
-                merged_data != existing_data):
-                
-                existing_product.nombre = merged_data['nombre']
-                existing_product.marca = merged_data['marca']
-                existing_product.categoria = merged_data['categoria']
-                existing_product.completeness_score = str(round(merged_data['completeness_score'], 3))
-                existing_product.updated_at = func.now()
-                
-                return 'updated'
-            else:
-                return 'skipped'
-        else:
-            # Insert new product
-            new_product = Producto(
-                ean=cleaned_product['ean'],
-                nombre=cleaned_product['nombre'],
-                marca=cleaned_product['marca'],
-                categoria=cleaned_product['categoria'],
-                completeness_score=str(round(cleaned_product['completeness_score'], 3)),
-                image_url=None
-            )
-            
-            session.add(new_product)
-            return 'inserted'
-    
     def get_database_stats(self) -> Dict[str, Any]:
         """
         Get current database operation statistics.
@@ -614,6 +567,7 @@ class DatabaseManager:
             'products_inserted': 0,
             'products_updated': 0,
             'products_skipped': 0,
+            'products_unchanged': 0,
             'database_errors': 0,
             'last_operation_time': None
         }
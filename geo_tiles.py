@@ -0,0 +1,257 @@
+"""
+Geo-tiled discovery module for the product scraper system.
+Covers a polygon with a grid of search locations and schedules them by marginal new-product yield.
+"""
+
+import logging
+import math
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+from utils import ean_key
+
+# Kilometres per degree of latitude (and of longitude at the equator)
+KM_PER_DEGREE = 111.32
+
+def point_in_polygon(lat: float, lng: float, polygon: List[Tuple[float, float]]) -> bool:
+    """
+    Check whether a point lies inside a polygon (ray casting).
+
+    Args:
+        lat: Point latitude
+        lng: Point longitude
+        polygon: (lat, lng) vertices, in order
+
+    Returns:
+        True if the point is inside
+    """
+    inside = False
+    previous_lat, previous_lng = polygon[-1]
+    for vertex_lat, vertex_lng in polygon:
+        if (vertex_lat > lat) != (previous_lat > lat):
+            crossing_lng = vertex_lng + (lat - vertex_lat) * (previous_lng - vertex_lng) / (previous_lat - vertex_lat)
+            if lng < crossing_lng:
+                inside = not inside
+        previous_lat, previous_lng = vertex_lat, vertex_lng
+    return inside
+
+def build_tile_grid(polygon: List[Tuple[float, float]], spacing_km: float) -> List[Tuple[float, float]]:
+    """
+    Grid of points `spacing_km` apart that fall inside a polygon.
+
+    Args:
+        polygon: (lat, lng) vertices, in order
+        spacing_km: Distance between neighbouring points
+
+    Returns:
+        List of (lat, lng) points, north to south and west to east
+    """
+    lats = [lat for lat, _ in polygon]
+    lngs = [lng for _, lng in polygon]
+    mid_lat = (min(lats) + max(lats)) / 2
+    lat_step = spacing_km / KM_PER_DEGREE
+    lng_step = spacing_km / (KM_PER_DEGREE * math.cos(math.radians(mid_lat)))
+
+    points = []
+    lat = max(lats) - lat_step / 2
+    while lat > min(lats):
+        lng = min(lngs) + lng_step / 2
+        while lng < max(lngs):
+            if point_in_polygon(lat, lng, polygon):
+                points.append((round(lat, 5), round(lng, 5)))
+            lng += lng_step
+        lat -= lat_step
+    return points
+
+class GeoTile:
+    """
+    One search location and its discovery record.
+    """
+
+    def __init__(self, tile_id: int, lat: float, lng: float):
+        """
+        Initialize a tile.
+
+        Args:
+            tile_id: Position in the grid (0 is the configured location)
+            lat: Latitude sent to the API
+            lng: Longitude sent to the API
+        """
+        self.tile_id = tile_id
+        self.lat = lat
+        self.lng = lng
+        self.next_term_index = 0
+
+        # Discounted totals: recent searches weigh more than early ones
+        self.requests = 0.0
+        self.new_products = 0.0
+
+        self.searches = 0
+        self.total_requests = 0
+        self.total_new_products = 0
+        self.busy = False
+        self.exhausted = False
+
+    @property
+    def location(self) -> Tuple[float, float]:
+        return self.lat, self.lng
+
+class GeoTileScheduler:
+    """
+    Hands out (tile, term) searches, favouring the tiles that still bring
+    products new to the database.
+
+    Every tile walks the same term list in order. The next search goes to
+    the idle tile with the highest expected new products per request: a
+    Gamma posterior mean whose prior is the best tile's current yield, so
+    untried tiles get their turn early and tiles whose stores only repeat
+    what the others found fall behind. A tile is dropped once its yield
+    stays below `min_new_per_request`.
+
+    EANs returned by any tile are remembered, so a product seen at one
+    location is not written again when another tile returns it.
+    """
+
+    def __init__(self, config: Dict[str, Any], logger: logging.Logger, terms: List[str]):
+        """
+        Build the tile grid described by config['location']['tiles'].
+
+        Args:
+            config: Configuration dictionary
+            logger: Logger instance
+            terms: Search terms every tile goes through, in order
+        """
+        settings = config['location'].get('tiles', {})
+        self.logger = logger
+        self.terms = terms
+        self.decay = settings.get('yield_decay', 0.9)
+        self.prior_requests = settings.get('prior_requests', 2.0)
+        self.min_new_per_request = settings.get('min_new_per_request', 0.5)
+        self.min_requests = settings.get('min_requests', 5)
+
+        points = [(config['location']['lat'], config['location']['lng'])]
+        polygon = settings.get('polygon')
+        if polygon:
+            points.extend(build_tile_grid(polygon, settings.get('spacing_km', 3.0)))
+        self.tiles = [GeoTile(tile_id, lat, lng) for tile_id, (lat, lng) in enumerate(points)]
+
+        self._seen: Set[Any] = set()
+        self.duplicates_skipped = 0
+
+        self.logger.info(f"Geo tiles: {len(self.tiles)} search locations, {len(terms)} terms each")
+
+    @staticmethod
+    def search_key(term: str, tile: GeoTile) -> str:
+        """
+        Journal key of a term searched at a tile.
+
+        Args:
+            term: Search term
+            tile: Tile searched
+
+        Returns:
+            Key such as 'leche @ -32.94780,-60.63050'
+        """
+        return f"{term} @ {tile.lat:.5f},{tile.lng:.5f}"
+
+    def _expected_yield(self, tile: GeoTile, prior_yield: float) -> float:
+        """
+        Posterior mean of a tile's new products per request.
+
+        Args:
+            tile: Tile to score
+            prior_yield: Yield assumed before the tile has history
+
+        Returns:
+            Expected new products per request
+        """
+        return (tile.new_products + self.prior_requests * prior_yield) / (tile.requests + self.prior_requests)
+
+    def next_search(self, completed: Iterable[str] = ()) -> Optional[Tuple[GeoTile, str]]:
+        """
+        Pick the next tile to search and its next term.
+
+        Args:
+            completed: Search keys finished in an interrupted run (skipped)
+
+        Returns:
+            Tuple of (tile, term), or None if every idle tile is done
+        """
+        completed = completed if isinstance(completed, (set, frozenset)) else set(completed)
+        tried = [tile for tile in self.tiles if tile.requests > 0]
+        prior_yield = max((tile.new_products / tile.requests for tile in tried), default=1.0)
+
+        candidates = [tile for tile in self.tiles if not tile.busy and not tile.exhausted]
+        for tile in sorted(candidates, key=lambda tile: self._expected_yield(tile, prior_yield), reverse=True):
+            while tile.next_term_index < len(self.terms):
+                term = self.terms[tile.next_term_index]
+                tile.next_term_index += 1
+                if self.search_key(term, tile) not in completed:
+                    tile.busy = True
+                    tile.searches += 1
+                    return tile, term
+            tile.exhausted = True
+        return None
+
+    def filter_unseen(self, eans: List[str]) -> List[bool]:
+        """
+        Mark which EANs of a page no tile has returned before, and remember them.
+
+        Args:
+            eans: EANs on the page
+
+        Returns:
+            One flag per EAN, True the first time the EAN is seen
+        """
+        flags = []
+        for ean in eans:
+            key = ean_key(ean)
+            if key in self._seen:
+                flags.append(False)
+                self.duplicates_skipped += 1
+            else:
+                self._seen.add(key)
+                flags.append(True)
+        return flags
+
+    def record(self, tile: GeoTile, requests: int, new_products: int):
+        """
+        Record a finished search at a tile.
+
+        Args:
+            tile: Tile searched
+            requests: Page requests made
+            new_products: Products new to the database
+        """
+        tile.busy = False
+        tile.requests = tile.requests * self.decay + requests
+        tile.new_products = tile.new_products * self.decay + new_products
+        tile.total_requests += requests
+        tile.total_new_products += new_products
+
+        if tile.total_requests >= self.min_requests and \
+                tile.new_products / max(tile.requests, 1e-9) < self.min_new_per_request:
+            tile.exhausted = True
+            self.logger.info(f"Geo tile {tile.tile_id} ({tile.lat:.4f}, {tile.lng:.4f}) exhausted after "
+                             f"{tile.searches} terms: {tile.total_new_products} new products "
+                             f"in {tile.total_requests} requests")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get tile statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        requests = sum(tile.total_requests for tile in self.tiles)
+        new_products = sum(tile.total_new_products for tile in self.tiles)
+        best = sorted(self.tiles, key=lambda tile: tile.total_new_products, reverse=True)[:5]
+        return {
+            'tiles': len(self.tiles),
+            'tiles_exhausted': sum(1 for tile in self.tiles if tile.exhausted),
+            'requests': requests,
+            'new_products': new_products,
+            'new_per_request': round(new_products / requests, 3) if requests else 0.0,
+            'duplicates_skipped': self.duplicates_skipped,
+            'best_tiles': [(tile.tile_id, tile.location, tile.total_new_products, tile.total_requests)
+                           for tile in best]
+        }
@@ -0,0 +1,229 @@
+"""
+Known product index for the product scraper system.
+Compact in-memory index of stored EANs, used to skip products that would not change the database.
+"""
+
+import logging
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+from utils import ean_key
+
+# Scores are stored as thousandths, as written to productos.completeness_score
+SCORE_SCALE = 1000
+
+# Rows buffered as Python objects while loading, before conversion to arrays
+LOAD_CHUNK_SIZE = 65536
+
+class KnownProductIndex:
+    """
+    EANs already in the productos table with their completeness score and
+    name length, the two values the bulk upsert compares before updating.
+
+    Numeric EANs live in sorted numpy arrays (8 + 2 + 2 bytes per product,
+    about 12 MB for a million products) searched with binary search. Products
+    added during the run go to a small dictionary that is merged into the
+    arrays once it reaches `merge_threshold`. EANs that do not fit an int64
+    round trip (letters, leading zeros) are kept in a separate dictionary.
+    """
+
+    def __init__(self, logger: logging.Logger, merge_threshold: int = 50000):
+        """
+        Initialize an empty index.
+
+        Args:
+            logger: Logger instance
+            merge_threshold: Pending entries that trigger a merge into the arrays
+        """
+        self.logger = logger
+        self.merge_threshold = merge_threshold
+
+        self._eans = np.empty(0, dtype=np.int64)
+        self._scores = np.empty(0, dtype=np.int16)
+        self._name_lengths = np.empty(0, dtype=np.uint16)
+        self._pending: Dict[int, Tuple[int, int]] = {}
+        self._other: Dict[str, Tuple[int, int]] = {}
+
+        # Statistics
+        self.lookups = 0
+        self.filtered = 0
+        self.merges = 0
+
+    @staticmethod
+    def _encode(score: float, name_length: int) -> Tuple[int, int]:
+        """
+        Compact form of a product's score and name length.
+
+        Args:
+            score: Completeness score between 0.0 and 1.0
+            name_length: Length of the stored name
+
+        Returns:
+            Tuple of (score in thousandths, capped name length)
+        """
+        return int(round(score * SCORE_SCALE)), min(name_length, np.iinfo(np.uint16).max)
+
+    def load(self, rows: Iterable[Tuple[str, float, int]]) -> int:
+        """
+        Build the index from (ean, completeness_score, name_length) rows.
+
+        Args:
+            rows: Rows from the productos table
+
+        Returns:
+            Number of products indexed
+        """
+        chunks = []
+        eans, scores, lengths = [], [], []
+        self._pending.clear()
+        self._other.clear()
+
+        def flush():
+            # Convert buffered rows so peak memory stays close to the final arrays
+            chunks.append((np.array(eans, dtype=np.int64), np.array(scores, dtype=np.int16),
+                           np.array(lengths, dtype=np.uint16)))
+            eans.clear()
+            scores.clear()
+            lengths.clear()
+
+        for ean, score, name_length in rows:
+            key = ean_key(ean)
+            encoded_score, encoded_length = self._encode(score, name_length)
+            if isinstance(key, str):
+                self._other[ean] = (encoded_score, encoded_length)
+                continue
+            eans.append(key)
+            scores.append(encoded_score)
+            lengths.append(encoded_length)
+            if len(eans) >= LOAD_CHUNK_SIZE:
+                flush()
+        flush()
+
+        all_eans = np.concatenate([chunk[0] for chunk in chunks])
+        order = np.argsort(all_eans, kind='stable')
+        self._eans = all_eans[order]
+        self._scores = np.concatenate([chunk[1] for chunk in chunks])[order]
+        self._name_lengths = np.concatenate([chunk[2] for chunk in chunks])[order]
+
+        self.logger.info(f"Known product index: {len(self)} products "
+                         f"({self.memory_bytes() / (1024 * 1024):.1f} MB)")
+        return len(self)
+
+    def _lookup(self, ean: str) -> Optional[Tuple[int, int]]:
+        """
+        Stored score and name length of an EAN.
+
+        Args:
+            ean: EAN code
+
+        Returns:
+            Encoded (score, name length), or None if the EAN is unknown
+        """
+        key = ean_key(ean)
+        if isinstance(key, str):
+            return self._other.get(ean)
+        if key in self._pending:
+            return self._pending[key]
+
+        position = int(np.searchsorted(self._eans, key))
+        if position < len(self._eans) and self._eans[position] == key:
+            return int(self._scores[position]), int(self._name_lengths[position])
+        return None
+
+    def needs_write(self, ean: str, score: float, name_length: int) -> bool:
+        """
+        Check whether a scraped product would insert or update a row.
+
+        Mirrors the upsert condition: unknown EAN, higher completeness score
+        or longer name.
+
+        Args:
+            ean: EAN code
+            score: Completeness score of the scraped product
+            name_length: Length of the scraped name
+
+        Returns:
+            True if the product must be sent to the database
+        """
+        self.lookups += 1
+        stored = self._lookup(ean)
+        if stored is None:
+            return True
+
+        encoded_score, encoded_length = self._encode(score, name_length)
+        if encoded_score > stored[0] or encoded_length > stored[1]:
+            return True
+
+        self.filtered += 1
+        return False
+
+    def update(self, ean: str, score: float, name_length: int):
+        """
+        Record the stored state of a product after a write.
+
+        Args:
+            ean: EAN code
+            score: Completeness score now stored
+            name_length: Length of the name now stored
+        """
+        key = ean_key(ean)
+        encoded = self._encode(score, name_length)
+        if isinstance(key, str):
+            self._other[ean] = encoded
+            return
+
+        position = int(np.searchsorted(self._eans, key))
+        if position < len(self._eans) and self._eans[position] == key:
+            self._scores[position], self._name_lengths[position] = encoded
+            return
+
+        self._pending[key] = encoded
+        if len(self._pending) >= self.merge_threshold:
+            self._merge()
+
+    def _merge(self):
+        """
+        Move pending entries into the sorted arrays.
+        """
+        keys = np.fromiter(self._pending.keys(), dtype=np.int64, count=len(self._pending))
+        values = np.array(list(self._pending.values()), dtype=np.int64).reshape(-1, 2)
+
+        eans = np.concatenate([self._eans, keys])
+        order = np.argsort(eans, kind='stable')
+        self._eans = eans[order]
+        self._scores = np.concatenate([self._scores, values[:, 0].astype(np.int16)])[order]
+        self._name_lengths = np.concatenate([self._name_lengths, values[:, 1].astype(np.uint16)])[order]
+
+        self._pending.clear()
+        self.merges += 1
+
+    def __len__(self) -> int:
+        return len(self._eans) + len(self._pending) + len(self._other)
+
+    def memory_bytes(self) -> int:
+        """
+        Approximate memory used by the index.
+
+        Returns:
+            Bytes used by the arrays plus a rough estimate for the dictionaries
+        """
+        arrays = self._eans.nbytes + self._scores.nbytes + self._name_lengths.nbytes
+        # ~100 bytes per dict entry (key, tuple and table slot)
+        return arrays + 100 * (len(self._pending) + len(self._other))
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        return {
+            'products': len(self),
+            'memory_mb': round(self.memory_bytes() / (1024 * 1024), 2),
+            'lookups': self.lookups,
+            'filtered': self.filtered,
+            'filter_rate': round(self.filtered / self.lookups * 100, 2) if self.lookups else 0.0,
+            'merges': self.merges
+        }
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Split the precios table into precios_actuales (latest price per producto_id and
+bandera) and precios_historial (append-only history partitioned by month).
+The legacy precios table is kept untouched.
+"""
+
+from datetime import datetime, timedelta
+
+def _month_start(value):
+    """Truncate a datetime to the first day of its month"""
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def migrate_price_tables(months_ahead=2):
+    """Create the new price tables, their partitions and backfill them from precios"""
+
+    print("🔧 MIGRATING PRICE TABLES")
+    print("=" * 50)
+
+    try:
+        from backend.database.connection import engine
+        from sqlalchemy import text
+
+        with engine.connect() as connection:
+            # Start transaction
+            trans = connection.begin()
+
+            try:
+                print("1. Creating precios_historial (partitioned by month)...")
+                connection.execute(text("""
+                    CREATE TABLE IF NOT EXISTS precios_historial (
+                        id BIGSERIAL,
+                        producto_id BIGINT NOT NULL,
+                        sucursal VARCHAR(200),
+                        precio_lista NUMERIC(10, 2),
+                        precio_promo_a NUMERIC(10, 2),
+                        bandera VARCHAR(100),
+                        super_razon_social VARCHAR(200),
+                        fecha_actualizacion TIMESTAMPTZ NOT NULL DEFAULT now(),
+                        PRIMARY KEY (id, fecha_actualizacion)
+                    ) PARTITION BY RANGE (fecha_actualizacion);
+                """))
+                connection.execute(text("""
+                    CREATE INDEX IF NOT EXISTS ix_precios_historial_producto_id
+                    ON precios_historial (producto_id);
+                """))
+                connection.execute(text("""
+                    CREATE TABLE IF NOT EXISTS precios_historial_default
+                    PARTITION OF precios_historial DEFAULT;
+                """))
+
+                print("2. Creating precios_actuales...")
+                connection.execute(text("""
+                    CREATE TABLE IF NOT EXISTS precios_actuales (
+                        producto_id BIGINT NOT NULL,
+                        bandera VARCHAR(100) NOT NULL,
+                        sucursal VARCHAR(200),
+                        precio_lista NUMERIC(10, 2),
+                        precio_promo_a NUMERIC(10, 2),
+                        super_razon_social VARCHAR(200),
+                        fecha_actualizacion TIMESTAMPTZ DEFAULT now(),
+                        fecha_cambio TIMESTAMPTZ DEFAULT now(),
+                        activo BOOLEAN DEFAULT TRUE,
+                        PRIMARY KEY (producto_id, bandera)
+                    );
+                """))
+                connection.execute(text("""
+                    CREATE INDEX IF NOT EXISTS ix_precios_actuales_fecha_actualizacion
+                    ON precios_actuales (fecha_actualizacion);
+                """))
+
+                # Monthly partitions from the oldest legacy price up to a few months ahead
+                print("3. Creating monthly partitions...")
+                oldest = connection.execute(text("SELECT min(fecha_actualizacion) FROM precios")).scalar()
+                month = _month_start(oldest or datetime.now())
+                last_month = _month_start(datetime.now())
+                for _ in range(months_ahead):
+                    last_month = _month_start(last_month + timedelta(days=32))
+
+                partitions = 0
+                while month <= last_month:
+                    next_month = _month_start(month + timedelta(days=32))
+                    connection.execute(text(f"""
+                        CREATE TABLE IF NOT EXISTS precios_historial_{month.strftime('%Y_%m')}
+                        PARTITION OF precios_historial
+                        FOR VALUES FROM ('{month.strftime('%Y-%m-%d')}') TO ('{next_month.strftime('%Y-%m-%d')}');
+                    """))
+                    partitions += 1
+                    month = next_month
+                print(f"   {partitions} monthly partitions ready")
+
+                # Backfill history only once
+                print("4. Backfilling precios_historial from precios...")
+                history_rows = connection.execute(text("SELECT count(*) FROM precios_historial")).scalar()
+                if history_rows:
+                    print(f"   Skipped: precios_historial already has {history_rows} rows")
+                else:
+                    result = connection.execute(text("""
+                        INSERT INTO precios_historial
+                            (producto_id, sucursal, precio_lista, precio_promo_a, bandera,
+                             super_razon_social, fecha_actualizacion)
+                        SELECT producto_id, sucursal, precio_lista, precio_promo_a, bandera,
+                               super_razon_social, COALESCE(fecha_actualizacion, now())
+                        FROM precios
+                        WHERE producto_id IS NOT NULL;
+                    """))
+                    print(f"   {result.rowcount} rows copied")
+
+                # Latest row per producto_id and bandera
+                print("5. Backfilling precios_actuales from precios...")
+                result = connection.execute(text("""
+                    INSERT INTO precios_actuales
+                        (producto_id, bandera, sucursal, precio_lista, precio_promo_a,
+                         super_razon_social, fecha_actualizacion, fecha_cambio, activo)
+                    SELECT DISTINCT ON (producto_id, bandera)
+                           producto_id, bandera, sucursal, precio_lista, precio_promo_a,
+                           super_razon_social, fecha_actualizacion, fecha_actualizacion, activo
+                    FROM precios
+                    WHERE producto_id IS NOT NULL AND bandera IS NOT NULL
+                    ORDER BY producto_id, bandera, fecha_actualizacion DESC NULLS LAST, id DESC
+                    ON CONFLICT (producto_id, bandera) DO NOTHING;
+                """))
+                print(f"   {result.rowcount} current prices inserted")
+
+                # Commit changes
+                trans.commit()
+                print("✅ Price tables migrated successfully!")
+                return True
+
+            except Exception as e:
+                trans.rollback()
+                print(f"❌ Error migrating price tables: {e}")
+                return False
+
+    except Exception as e:
+        print(f"❌ Database connection error: {e}")
+        return False
+
+def main():
+    print("PRICE TABLES MIGRATION")
+    print("=" * 60)
+
+    if migrate_price_tables():
+        print("\n✅ SUCCESS! precios_actuales and precios_historial are ready.")
+        print("The legacy precios table was kept and is no longer written by the scraper.")
+        return 0
+    else:
+        print("\n❌ FAILED! Price tables migration failed.")
+        return 1
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
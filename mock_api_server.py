@@ -0,0 +1,450 @@
+"""
+Local stand-in for the Precios Claros API used for benchmarks and offline runs.
+Serves /prod/productos and /prod/producto from productos.csv with configurable
+latency, 429/5xx injection and pagination.
+"""
+
+import csv
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse, parse_qs
+
+from utils import normalize_text, normalize_text_cached, format_number
+
+PRODUCTOS_FILE = 'productos.csv'
+SUPERMERCADOS_FILE = 'supermercados.csv'
+DEFAULT_PORT = 8765
+
+class MockPreciosClarosAPI:
+    """
+    Builds Precios Claros-shaped responses from the local product catalog.
+
+    Prices and store availability are derived from a hash of the EAN and the
+    store id, so every run sees the same catalog and the same prices.
+    """
+
+    def __init__(self, productos_file: str = PRODUCTOS_FILE, supermercados_file: str = SUPERMERCADOS_FILE,
+                 latency: float = 0.05, jitter: float = 0.0, error_429_rate: float = 0.0,
+                 error_5xx_rate: float = 0.0, retry_after: int = 1, availability: float = 0.7,
+                 seed: Optional[int] = None):
+        """
+        Initialize the mock API.
+
+        Args:
+            productos_file: CSV with ean, nombre, marca and categoria columns
+            supermercados_file: CSV with the supermarket names used as banderas
+            latency: Mean seconds added to every response
+            jitter: Standard deviation of the added latency
+            error_429_rate: Fraction of requests answered with 429 and Retry-After
+            error_5xx_rate: Fraction of requests answered with 503
+            retry_after: Retry-After seconds sent with 429 responses
+            availability: Fraction of stores that carry a given product
+            seed: Seed for latency and error injection
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_429_rate = error_429_rate
+        self.error_5xx_rate = error_5xx_rate
+        self.retry_after = retry_after
+        self.availability = availability
+        self._random = random.Random(seed)
+
+        self.products: List[Dict[str, str]] = []
+        self.products_by_ean: Dict[str, Dict[str, str]] = {}
+        self._search_index: List[str] = []
+        self._search_cache: Dict[str, List[int]] = {}
+        self._load_catalog(productos_file)
+        self.banderas = self._load_banderas(supermercados_file)
+
+        # Statistics
+        self._lock = threading.Lock()
+        self.total_requests = 0
+        self.status_counts: Dict[int, int] = {}
+        self.products_served = 0
+
+    def _load_catalog(self, productos_file: str):
+        """
+        Load the product catalog and its normalized search index.
+
+        Args:
+            productos_file: CSV with the product catalog
+        """
+        with open(productos_file, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                ean = (row.get('ean') or '').strip()
+                if not ean or ean in self.products_by_ean:
+                    continue
+                product = {
+                    'ean': ean,
+                    'nombre': (row.get('nombre') or '').strip(),
+                    'marca': (row.get('marca') or '').strip()
+                }
+                self.products.append(product)
+                self.products_by_ean[ean] = product
+                self._search_index.append(normalize_text(f"{product['nombre']} {product['marca']}"))
+
+    @staticmethod
+    def _load_banderas(supermercados_file: str) -> List[str]:
+        """
+        Load supermarket names used as banderas.
+
+        Args:
+            supermercados_file: CSV with a nombre column
+
+        Returns:
+            List of bandera names
+        """
+        try:
+            with open(supermercados_file, newline='', encoding='utf-8') as f:
+                banderas = [row['nombre'].strip() for row in csv.DictReader(f) if row.get('nombre')]
+        except (OSError, KeyError):
+            banderas = []
+        return banderas or ['Carrefour', 'Coto', 'Dia', 'Jumbo', 'La Anonima']
+
+    def simulate_upstream(self) -> Optional[int]:
+        """
+        Sleep for the configured latency and decide whether to inject an error.
+
+        Returns:
+            Error status code to answer with, or None for a normal response
+        """
+        with self._lock:
+            delay = max(0.0, self._random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+            roll = self._random.random()
+        if delay:
+            time.sleep(delay)
+
+        if roll < self.error_429_rate:
+            return 429
+        if roll < self.error_429_rate + self.error_5xx_rate:
+            return 503
+        return None
+
+    def record(self, status: int, products: int = 0):
+        """
+        Count a served response.
+
+        Args:
+            status: HTTP status code
+            products: Products included in the response
+        """
+        with self._lock:
+            self.total_requests += 1
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            self.products_served += products
+
+    def _price_for(self, ean: str, store_id: str) -> float:
+        """
+        Deterministic list price of a product at a store.
+
+        Args:
+            ean: Product EAN
+            store_id: Store identifier
+
+        Returns:
+            Price rounded to cents
+        """
+        base = 100 + zlib.crc32(ean.encode()) % 9900
+        variation = (zlib.crc32(f"{ean}|{store_id}".encode()) % 2001 - 1000) / 10000  # +/-10%
+        return round(base * (1 + variation), 2)
+
+    def _carries(self, ean: str, store_id: str) -> bool:
+        """
+        Whether a store carries a product.
+
+        Args:
+            ean: Product EAN
+            store_id: Store identifier
+
+        Returns:
+            True if the store has a price for the product
+        """
+        return zlib.crc32(f"stock|{ean}|{store_id}".encode()) % 1000 < self.availability * 1000
+
+    def search(self, term: str, offset: int = 0, limit: int = 50) -> Dict[str, Any]:
+        """
+        Build a /prod/productos response.
+
+        Args:
+            term: Search string
+            offset: Pagination offset
+            limit: Page size
+
+        Returns:
+            Response body
+        """
+        key = normalize_text_cached(term)
+        with self._lock:
+            matches = self._search_cache.get(key)
+        if matches is None:
+            matches = [i for i, text in enumerate(self._search_index) if key and key in text]
+            with self._lock:
+                self._search_cache[key] = matches
+
+        page = [self.products[i] for i in matches[offset:offset + limit]]
+        productos = []
+        for product in page:
+            precio = self._price_for(product['ean'], '')
+            productos.append({
+                'id': product['ean'],
+                'nombre': product['nombre'],
+                'marca': product['marca'],
+                'presentacion': '1.0 un',
+                'precioMin': round(precio * 0.9, 2),
+                'precioMax': round(precio * 1.1, 2),
+                'cantSucursalesDisponible': len(self.banderas)
+            })
+
+        return {
+            'status': 200,
+            'total': len(matches),
+            'totalPagina': len(productos),
+            'productos': productos
+        }
+
+    def product_detail(self, ean: str, sucursales: str) -> Dict[str, Any]:
+        """
+        Build a /prod/producto response.
+
+        Args:
+            ean: Product EAN
+            sucursales: Comma-separated store ids (comercio-bandera-sucursal)
+
+        Returns:
+            Response body
+        """
+        product = self.products_by_ean.get(ean)
+        if product is None:
+            return {'status': 200, 'total': 0, 'producto': {}, 'sucursales': []}
+
+        sucursales_data = []
+        for store_id in filter(None, (s.strip() for s in sucursales.split(','))):
+            comercio_id = store_id.split('-')[0]
+            bandera = self.banderas[zlib.crc32(comercio_id.encode()) % len(self.banderas)]
+            precios_producto = {}
+            if self._carries(ean, store_id):
+                precio = self._price_for(ean, store_id)
+                precios_producto = {'precioLista': precio}
+                if zlib.crc32(f"promo|{ean}|{store_id}".encode()) % 5 == 0:
+                    precios_producto['promo1'] = {'precio': round(precio * 0.85, 2)}
+            sucursales_data.append({
+                'id': store_id,
+                'comercioId': comercio_id,
+                'banderaDescripcion': bandera,
+                'comercioRazonSocial': f"{bandera} S.A.",
+                'sucursalNombre': f"Sucursal {store_id}",
+                'preciosProducto': precios_producto
+            })
+
+        return {
+            'status': 200,
+            'total': len(sucursales_data),
+            'producto': {'id': product['ean'], 'nombre': product['nombre'], 'marca': product['marca']},
+            'sucursales': sucursales_data
+        }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get mock server statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._lock:
+            return {
+                'total_requests': self.total_requests,
+                'status_counts': dict(self.status_counts),
+                'products_served': self.products_served
+            }
+
+class _MockRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler that dispatches to the server's MockPreciosClarosAPI.
+    """
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real CloudFront endpoint
+
+    def do_GET(self):
+        """
+        Serve /prod/productos and /prod/producto.
+        """
+        api = self.server.api
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if url.path not in ('/prod/productos', '/prod/producto'):
+            api.record(404)
+            self._send_json(404, {'status': 404, 'message': 'Not found'})
+            return
+
+        error_status = api.simulate_upstream()
+        if error_status == 429:
+            api.record(429)
+            self._send_json(429, {'status': 429, 'message': 'Too Many Requests'},
+                            {'Retry-After': str(api.retry_after)})
+            return
+        if error_status:
+            api.record(error_status)
+            self._send_json(error_status, {'status': error_status, 'message': 'Service Unavailable'})
+            return
+
+        try:
+            if url.path == '/prod/productos':
+                body = api.search(
+                    params.get('string', ''),
+                    offset=int(params.get('offset', 0)),
+                    limit=int(params.get('limit', 50))
+                )
+                products = len(body['productos'])
+            else:
+                body = api.product_detail(params.get('id_producto', ''), params.get('array_sucursales', ''))
+                products = 1 if any(s['preciosProducto'] for s in body['sucursales']) else 0
+        except ValueError:
+            api.record(400)
+            self._send_json(400, {'status': 400, 'message': 'Bad request'})
+            return
+
+        api.record(200, products)
+        self._send_json(200, body)
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        """
+        Write a JSON response.
+
+        Args:
+            status: HTTP status code
+            body: Response body
+            headers: Extra response headers
+        """
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        """
+        Silence per-request access logs.
+        """
+        pass
+
+class MockPreciosClarosServer:
+    """
+    Runs a MockPreciosClarosAPI over HTTP in a background thread.
+    """
+
+    def __init__(self, api: MockPreciosClarosAPI, host: str = '127.0.0.1', port: int = 0):
+        """
+        Initialize the server.
+
+        Args:
+            api: Mock API that builds the responses
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        self.api = api
+        self._server = ThreadingHTTPServer((host, port), _MockRequestHandler)
+        self._server.daemon_threads = True
+        self._server.api = api
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def products_url(self) -> str:
+        """URL to use as config['api']['products_url']."""
+        return f"{self.base_url}/prod/productos"
+
+    @property
+    def product_detail_url(self) -> str:
+        """URL to use as config['api']['product_detail_url']."""
+        return f"{self.base_url}/prod/producto"
+
+    def start(self):
+        """
+        Start serving in a daemon thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-precios-claros', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop serving and release the port.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        """
+        Context manager entry.
+        """
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Context manager exit.
+        """
+        self.stop()
+
+def main():
+    """
+    Run the mock server until interrupted.
+    """
+    opciones = {}
+    for argumento in sys.argv[1:]:
+        if argumento.startswith('--') and '=' in argumento:
+            nombre, valor = argumento[2:].split('=', 1)
+            opciones[nombre] = valor
+        else:
+            print("Opciones disponibles:")
+            print("  --port=N        : Puerto (default 8765)")
+            print("  --latency=S     : Latencia media por request en segundos (default 0.05)")
+            print("  --jitter=S      : Desvío estándar de la latencia")
+            print("  --error-429=F   : Fracción de requests respondidos con 429")
+            print("  --error-5xx=F   : Fracción de requests respondidos con 503")
+            print("  --retry-after=S : Retry-After enviado con los 429 (default 1)")
+            return 1
+
+    api = MockPreciosClarosAPI(
+        latency=float(opciones.get('latency', 0.05)),
+        jitter=float(opciones.get('jitter', 0.0)),
+        error_429_rate=float(opciones.get('error-429', 0.0)),
+        error_5xx_rate=float(opciones.get('error-5xx', 0.0)),
+        retry_after=int(opciones.get('retry-after', 1))
+    )
+    server = MockPreciosClarosServer(api, port=int(opciones.get('port', DEFAULT_PORT)))
+
+    print(f"🧪 Mock Precios Claros con {format_number(len(api.products))} productos")
+    print(f"   products_url:       {server.products_url}")
+    print(f"   product_detail_url: {server.product_detail_url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        stats = api.get_statistics()
+        print(f"\n📊 {format_number(stats['total_requests'])} requests servidos: {stats['status_counts']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Pipeline module for the scraper system.
+Thread-pool stages connected by bounded queues, with per-stage statistics.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+# Marks the end of the input for one worker
+_STOP = object()
+
+class PipelineStage:
+    """
+    A pool of worker threads consuming a bounded input queue.
+
+    Each item is passed to `func`; results other than None are handed to
+    `output` (typically the next stage's `put`). A full queue blocks `put`,
+    so a slow stage throttles the stages feeding it.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], logger: logging.Logger,
+                 workers: int = 1, queue_size: int = 100, output: Optional[Callable[[Any], None]] = None):
+        """
+        Initialize the stage and start its workers.
+
+        Args:
+            name: Stage name used in logs and statistics
+            func: Function applied to every item
+            logger: Logger instance
+            workers: Number of worker threads
+            queue_size: Items that may wait before `put` blocks
+            output: Callable receiving each non-None result
+        """
+        self.name = name
+        self.func = func
+        self.logger = logger
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.output = output
+
+        self._queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._stopping = False
+
+        # Statistics
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.max_queue_depth = 0
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i + 1}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def put(self, item: Any):
+        """
+        Queue an item, blocking while the queue is full.
+
+        Args:
+            item: Item to process
+        """
+        self._queue.put(item)
+        depth = self._queue.qsize()
+        with self._lock:
+            if depth > self.max_queue_depth:
+                self.max_queue_depth = depth
+
+    def _run(self):
+        """
+        Worker loop: process items until the stop marker arrives.
+        """
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if self._cancelled.is_set():
+                continue
+
+            start = time.monotonic()
+            try:
+                result = self.func(item)
+                if result is not None and self.output is not None:
+                    self.output(result)
+                with self._lock:
+                    self.processed += 1
+            except Exception as e:
+                self.logger.error(f"Pipeline stage '{self.name}' failed on {item!r}: {e}")
+                with self._lock:
+                    self.errors += 1
+            finally:
+                with self._lock:
+                    self.busy_time += time.monotonic() - start
+
+    def close(self):
+        """
+        Wait until every queued item has been processed and stop the workers.
+        Safe to call again (e.g. from a `finally` after a failed close): the
+        stop markers are only queued once.
+        """
+        with self._lock:
+            send_stop, self._stopping = not self._stopping, True
+        if send_stop:
+            for _ in self._threads:
+                self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self.finished_at = time.monotonic()
+
+    def cancel(self):
+        """
+        Drop the items still queued and stop the workers.
+        Items already being processed are finished.
+        """
+        self._cancelled.set()
+        self.close()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get stage statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._lock:
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+            return {
+                'name': self.name,
+                'workers': self.workers,
+                'processed': self.processed,
+                'errors': self.errors,
+                'items_per_second': round(self.processed / elapsed, 2) if elapsed > 0 else 0.0,
+                'utilization': round(self.busy_time / (elapsed * self.workers) * 100, 1) if elapsed > 0 else 0.0,
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'queue_size': self.queue_size
+            }
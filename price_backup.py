@@ -0,0 +1,238 @@
+"""
+Price backup module for the price scraper.
+Append-only CSV part files partitioned by date and run, plus offline compaction.
+"""
+
+import os
+import sys
+import glob
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+import pandas as pd
+
+from config import get_config
+from utils import setup_logging, format_number
+
+BACKUP_COLUMNS = [
+    'ean', 'fecha_actualizacion', 'bandera', 'sucursal',
+    'precio_lista', 'precio_promo_a', 'supermercado'
+]
+
+class PriceBackupSink:
+    """
+    Append-only backup of scraped prices.
+
+    Rows are buffered in memory and written as immutable part files:
+    `<base_dir>/fecha=YYYY-MM-DD/run=<run_id>/part-NNNNN.csv`.
+    A part is written once and never rewritten; use `compact_backups`
+    to merge parts later. Safe to share between threads.
+    """
+
+    def __init__(self, base_dir: str, logger: logging.Logger,
+                 run_id: Optional[str] = None, rows_per_part: int = 5000):
+        """
+        Initialize the backup sink.
+
+        Args:
+            base_dir: Root directory for part files
+            logger: Logger instance
+            run_id: Identifier for this run (defaults to the start timestamp)
+            rows_per_part: Rows buffered before a part file is written
+        """
+        self.base_dir = base_dir
+        self.logger = logger
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.rows_per_part = max(1, rows_per_part)
+
+        self._rows: List[Dict[str, Any]] = []
+        self._part_number = 0
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.parts_written = 0
+        self.rows_written = 0
+
+    def append(self, prices: List[Dict[str, Any]]):
+        """
+        Add prices to the backup, writing a part file when the buffer is full.
+
+        Args:
+            prices: Price dictionaries as produced by the scraper
+        """
+        if not prices:
+            return
+
+        with self._lock:
+            self._rows.extend(prices)
+            full = len(self._rows) >= self.rows_per_part
+        if full:
+            self.flush()
+
+    def flush(self):
+        """
+        Write buffered rows as a new part file.
+        """
+        # Take the rows and a part number under the lock; the file is written outside it
+        with self._lock:
+            if not self._rows:
+                return
+            rows, self._rows = self._rows, []
+            self._part_number += 1
+            part_number = self._part_number
+
+        partition_dir = os.path.join(
+            self.base_dir,
+            f"fecha={datetime.now().strftime('%Y-%m-%d')}",
+            f"run={self.run_id}"
+        )
+        part_path = os.path.join(partition_dir, f"part-{part_number:05d}.csv")
+        temp_path = part_path + ".tmp"
+
+        try:
+            os.makedirs(partition_dir, exist_ok=True)
+            df = pd.DataFrame(rows).reindex(columns=BACKUP_COLUMNS)
+            df.to_csv(temp_path, index=False, encoding='utf-8')
+            # Publish atomically so readers never see a half-written part
+            os.replace(temp_path, part_path)
+
+            with self._lock:
+                self.parts_written += 1
+                self.rows_written += len(rows)
+            self.logger.debug(f"Backup part written: {part_path} ({len(rows)} rows)")
+
+        except Exception as e:
+            self.logger.error(f"Error writing backup part {part_path}: {e}")
+
+    def close(self):
+        """
+        Write any remaining rows.
+        """
+        self.flush()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get backup sink statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        return {
+            'run_id': self.run_id,
+            'parts_written': self.parts_written,
+            'rows_written': self.rows_written,
+            'rows_buffered': len(self._rows)
+        }
+
+    def __enter__(self):
+        """
+        Context manager entry.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Context manager exit.
+        """
+        self.close()
+
+def compact_backups(base_dir: str, logger: logging.Logger, fecha: Optional[str] = None) -> int:
+    """
+    Merge the part files of each date partition into a single compacted file.
+
+    Duplicate rows are dropped and the parts are removed once the compacted
+    file is in place. Existing compacted files are merged in as well.
+
+    Args:
+        base_dir: Root directory for part files
+        logger: Logger instance
+        fecha: Only compact this date (YYYY-MM-DD); None compacts every date
+
+    Returns:
+        Number of part files compacted
+    """
+    pattern = f"fecha={fecha}" if fecha else "fecha=*"
+    compacted_parts = 0
+
+    for partition_dir in sorted(glob.glob(os.path.join(base_dir, pattern))):
+        parts = sorted(glob.glob(os.path.join(partition_dir, "run=*", "part-*.csv")))
+        if not parts:
+            continue
+
+        compacted_path = os.path.join(partition_dir, "compacted.csv")
+        sources = parts + ([compacted_path] if os.path.exists(compacted_path) else [])
+
+        df = pd.concat(
+            (pd.read_csv(path, dtype={'ean': str}) for path in sources),
+            ignore_index=True
+        )
+        df.drop_duplicates(inplace=True)
+        df.sort_values(['ean', 'bandera'], inplace=True)
+
+        temp_path = compacted_path + ".tmp"
+        df.to_csv(temp_path, index=False, encoding='utf-8')
+        os.replace(temp_path, compacted_path)
+
+        for path in parts:
+            os.remove(path)
+        for run_dir in glob.glob(os.path.join(partition_dir, "run=*")):
+            if not os.listdir(run_dir):
+                os.rmdir(run_dir)
+
+        compacted_parts += len(parts)
+        logger.info(f"Compacted {len(parts)} parts into {compacted_path} ({format_number(len(df))} rows)")
+
+    return compacted_parts
+
+def export_latest_to_excel(base_dir: str, excel_file: str, logger: logging.Logger) -> int:
+    """
+    Export the latest price per EAN and bandera from all backups to Excel.
+
+    Args:
+        base_dir: Root directory for part files
+        excel_file: Output Excel filename
+        logger: Logger instance
+
+    Returns:
+        Number of rows exported
+    """
+    paths = sorted(glob.glob(os.path.join(base_dir, "fecha=*", "compacted.csv")))
+    paths += sorted(glob.glob(os.path.join(base_dir, "fecha=*", "run=*", "part-*.csv")))
+    if not paths:
+        logger.warning(f"No backup files found in {base_dir}")
+        return 0
+
+    df = pd.concat((pd.read_csv(path, dtype={'ean': str}) for path in paths), ignore_index=True)
+    df.sort_values('fecha_actualizacion', inplace=True)
+    df = df.drop_duplicates(subset=['ean', 'bandera'], keep='last')
+    df.sort_values(['ean', 'bandera'], inplace=True)
+
+    df.to_excel(excel_file, index=False, engine='openpyxl')
+    logger.info(f"Exported {format_number(len(df))} latest prices to {excel_file}")
+    return len(df)
+
+def main():
+    """
+    Command line entry point for backup maintenance.
+    """
+    config = get_config()
+    logger = setup_logging({'level': 'INFO'})
+    base_dir = config['files']['prices_backup_dir']
+
+    args = sys.argv[1:]
+    if not args or args[0] not in ("--compact", "--excel"):
+        print("Opciones disponibles:")
+        print("  --compact [YYYY-MM-DD] : Compactar los part files (todas las fechas o una)")
+        print("  --excel                : Exportar el último precio por EAN/bandera al Excel de precios")
+        return 1
+
+    if args[0] == "--compact":
+        compact_backups(base_dir, logger, fecha=args[1] if len(args) > 1 else None)
+    else:
+        export_latest_to_excel(base_dir, config['files']['prices'], logger)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
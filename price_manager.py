@@ -3,20 +3,35 @@ Price manager module for Supabase operations.
 Handles all price-related database interactions for the scraper system.
 """
 
+import csv
+import io
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple, Callable
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, insert, case, tuple_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from backend.database.connection import SessionLocal, engine, test_connection
-from backend.database.models import Producto, Supermercado, Precio
+from backend.database.models import Producto, Supermercado, PrecioActual, PrecioHistorial, DemandaProducto
 from utils import format_number, get_timestamp
 
+# Columns written to precios_historial / precios_actuales on ingest
+PRICE_COLUMNS = ['producto_id', 'sucursal', 'precio_lista', 'precio_promo_a', 'bandera', 'super_razon_social']
+
+# NULL marker for COPY FROM STDIN, distinct from the empty string
+COPY_NULL = '\\N'
+
 class PriceManager:
     """
     Manages all price-related database operations for Supabase.
+    
+    Every ingested price is appended to the partitioned `precios_historial`
+    table and upserted into `precios_actuales` (one row per producto_id and
+    bandera), which is the table the API reads.
     """
     
     def __init__(self, config: Dict[str, Any], logger: logging.Logger):
@@ -35,16 +50,23 @@ class PriceManager:
         self.ean_to_producto_id = {}  # Cache EAN -> producto_id mappings
         self.bandera_to_supermercado_id = {}  # Cache bandera -> supermercado_id mappings
         
+        # Last known price per (producto_id, bandera) for change detection
+        # (None = disabled; see load_price_snapshot)
+        self.price_snapshot: Optional[Dict[Tuple[int, str], Tuple[Optional[float], Optional[float]]]] = None
+        
         # Statistics tracking
         self.stats = {
             'precios_insertados': 0,
             'precios_actualizados': 0,
             'precios_omitidos': 0,
+            'precios_sin_cambios': 0,
             'errores_base_datos': 0,
             'productos_no_encontrados': 0,
             'supermercados_no_encontrados': 0,
             'ultima_operacion': None
         }
+        # batch_save_prices may run on several writer threads
+        self._stats_lock = threading.Lock()
     
     def test_database_connection(self) -> bool:
         """
@@ -107,6 +129,74 @@ class PriceManager:
         except Exception as e:
             self.logger.error(f"Error loading supermercado cache: {e}")
     
+    def load_price_snapshot(self) -> int:
+        """
+        Load the current price per (producto_id, bandera) into memory and
+        enable change detection in batch_save_prices.
+        
+        Returns:
+            Number of prices in the snapshot
+        """
+        try:
+            with self.get_session() as session:
+                results = session.query(
+                    PrecioActual.producto_id, PrecioActual.bandera,
+                    PrecioActual.precio_lista, PrecioActual.precio_promo_a
+                ).filter(PrecioActual.activo == True).all()
+                
+                self.price_snapshot = {
+                    (producto_id, bandera): (
+                        self._normalize_price(precio_lista),
+                        self._normalize_price(precio_promo_a)
+                    )
+                    for producto_id, bandera, precio_lista, precio_promo_a in results
+                }
+                self.logger.info(f"Loaded {format_number(len(self.price_snapshot))} last known prices for change detection")
+                return len(self.price_snapshot)
+        except Exception as e:
+            self.logger.error(f"Error loading price snapshot, change detection disabled: {e}")
+            self.price_snapshot = None
+            return 0
+    
+    @staticmethod
+    def _normalize_price(value: Any) -> Optional[float]:
+        """
+        Round a price the way the database stores it (Numeric(10, 2)).
+        
+        Args:
+            value: Price as float, Decimal or None
+            
+        Returns:
+            Price rounded to cents, or None
+        """
+        if value is None:
+            return None
+        return round(float(value), 2)
+    
+    def _split_unchanged(self, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]:
+        """
+        Separate rows whose price moved from rows equal to the last known price.
+        
+        Args:
+            rows: Prepared price rows
+            
+        Returns:
+            Tuple of (rows to write, (producto_id, bandera) keys to mark as seen)
+        """
+        changed = []
+        unchanged_keys = []
+        
+        for row in rows:
+            key = (row['producto_id'], row['bandera'])
+            current = (self._normalize_price(row['precio_lista']), self._normalize_price(row['precio_promo_a']))
+            
+            if self.price_snapshot.get(key) == current:
+                unchanged_keys.append(key)
+            else:
+                changed.append(row)
+        
+        return changed, unchanged_keys
+    
     def get_producto_id_by_ean(self, ean: str) -> Optional[int]:
         """
         Get producto_id by EAN, using cache for performance.
@@ -165,113 +255,70 @@ class PriceManager:
             self.logger.error(f"Error getting supermercado_id for bandera {bandera}: {e}")
             return None
     
-    def add_or_update_price(self, price_data: Dict[str, Any]) -> bool:
+    def _prepare_price_record(self, price_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
-        Add a price in the database using EAN directly as producto_id.
+        Convert a scraper price dictionary into a price row (see PRICE_COLUMNS).
         
         Args:
             price_data: Price information dictionary from scraper
             
         Returns:
-            True if price was added successfully
+            Row dictionary, or None if the price data is invalid
         """
+        # Extract data from price_data
+        ean = str(price_data.get('ean', ''))
+        bandera = (price_data.get('bandera') or '').strip()
+        
+        self.logger.debug(f"Processing price data: EAN={ean}, bandera={bandera}")
+        
+        if not ean or not bandera:
+            self.logger.warning(f"Missing EAN or bandera in price data: {price_data}")
+            return None
+        
+        # Use EAN directly as producto_id (no lookup needed)
         try:
-            # Extract data from price_data
-            ean = str(price_data.get('ean', ''))
-            bandera = price_data.get('bandera', '').strip()
-            
-            self.logger.debug(f"Processing price data: EAN={ean}, bandera={bandera}")
-            
-            if not ean or not bandera:
-                self.logger.warning(f"Missing EAN or bandera in price data: {price_data}")
-                self.stats['precios_omitidos'] += 1
-                return False
-            
-            # Use EAN directly as producto_id (no lookup needed)
-            try:
-                producto_id = int(ean)  # Convert EAN string to integer
-                self.logger.debug(f"Converted EAN {ean} to producto_id {producto_id}")
-            except ValueError as e:
-                self.logger.error(f"Invalid EAN format {ean}: {e}")
-                self.stats['precios_omitidos'] += 1
-                return False
-            
-            # Set supermercado_id to NULL as requested
-            supermercado_id = None
-            
-            # Prepare price data
-            precio_data = {
-                'producto_id': producto_id,
-                'supermercado_id': supermercado_id,
-                'sucursal': price_data.get('sucursal', ''),
-                'precio_lista': float(price_data.get('precio_lista', 0)),
-                'precio_promo_a': float(price_data.get('precio_promo_a')) if price_data.get('precio_promo_a') else None,
-                'precio_promo_b': None,  # Always NULL as requested
-                'bandera': bandera,
-                'super_razon_social': price_data.get('supermercado', ''),
-                'activo': True
-            }
-            
-            self.logger.debug(f"Prepared price data: {precio_data}")
-            
-            # Add price
-            result = self._add_or_update_price_record(precio_data)
-            self.logger.debug(f"Price insertion result: {result}")
-            return result
-            
-        except Exception as e:
-            self.logger.error(f"Error processing price data: {e}")
-            import traceback
-            traceback.print_exc()
-            self.stats['errores_base_datos'] += 1
-            return False
+            producto_id = int(ean)  # Convert EAN string to integer
+        except ValueError as e:
+            self.logger.error(f"Invalid EAN format {ean}: {e}")
+            return None
+        
+        return {
+            'producto_id': producto_id,
+            'sucursal': price_data.get('sucursal', ''),
+            'precio_lista': float(price_data.get('precio_lista', 0)),
+            'precio_promo_a': float(price_data.get('precio_promo_a')) if price_data.get('precio_promo_a') else None,
+            'bandera': bandera,
+            'super_razon_social': price_data.get('supermercado', '')
+        }
     
-    def _add_or_update_price_record(self, precio_data: Dict[str, Any]) -> bool:
+    def add_or_update_price(self, price_data: Dict[str, Any]) -> bool:
         """
-        Always insert a new price record in the database (no updates).
+        Save a single price using EAN directly as producto_id.
         
         Args:
-            precio_data: Processed price data
+            price_data: Price information dictionary from scraper
             
         Returns:
-            True if successful
+            True if price was saved (inserted, or confirmed unchanged)
         """
-        session = None
-        try:
-            session = self.get_session()
-            
-            # Always insert new price (no updates, always create new records)
-            new_price = Precio(
-                producto_id=precio_data['producto_id'],
-                supermercado_id=precio_data['supermercado_id'],
-                sucursal=precio_data['sucursal'],
-                precio_lista=precio_data['precio_lista'],
-                precio_promo_a=precio_data['precio_promo_a'],
-                precio_promo_b=precio_data['precio_promo_b'],
-                bandera=precio_data['bandera'],
-                super_razon_social=precio_data['super_razon_social'],
-                activo=precio_data['activo']
-            )
-            
-            session.add(new_price)
-            session.commit()
-            self.stats['precios_insertados'] += 1
-            self.logger.debug(f"Inserted new price for product_id {precio_data['producto_id']}, supermercado_id {precio_data['supermercado_id']}")
-            return True
-                
-        except Exception as e:
-            if session:
-                session.rollback()
-            self.logger.error(f"Error inserting price: {e}")
-            self.stats['errores_base_datos'] += 1
-            return False
-        finally:
-            if session:
-                session.close()
+        inserted, updated, skipped = self.batch_save_prices([price_data])
+        return skipped == 0
     
     def batch_save_prices(self, prices_list: List[Dict[str, Any]]) -> Tuple[int, int, int]:
         """
-        Save multiple prices in a single transaction for better performance.
+        Save multiple prices with a single bulk statement.
+        
+        Rows are written with one multi-row INSERT, or with COPY FROM STDIN when
+        config['prices']['bulk_method'] is 'copy'. The whole batch is one
+        transaction: if it fails nothing is written and every row counts as skipped.
+        
+        Rows are appended to precios_historial and upserted into precios_actuales
+        in the same transaction. When a price snapshot is loaded
+        (load_price_snapshot), only prices that differ from the last known value
+        are written; for unchanged prices the precios_actuales fecha_actualizacion
+        is bumped with one UPDATE. Those are returned as updated and counted in
+        precios_sin_cambios; precios_actualizados counts written rows that
+        replaced a different known price.
         
         Args:
             prices_list: List of price dictionaries
@@ -282,39 +329,299 @@ class PriceManager:
         if not prices_list:
             return 0, 0, 0
         
-        inserted = 0
-        updated = 0
+        rows = []
         skipped = 0
-        
         for price_data in prices_list:
-            result = self.add_or_update_price(price_data)
-            if result:
-                # Check if it was insert or update based on stats change
-                if self.stats['precios_insertados'] > inserted:
-                    inserted += 1
-                elif self.stats['precios_actualizados'] > updated:
-                    updated += 1
-            else:
+            try:
+                row = self._prepare_price_record(price_data)
+            except (TypeError, ValueError) as e:
+                self.logger.error(f"Invalid price data {price_data}: {e}")
+                row = None
+            
+            if row is None:
                 skipped += 1
+            else:
+                rows.append(row)
+        
+        unchanged_keys = []
+        if self.price_snapshot is not None:
+            rows, unchanged_keys = self._split_unchanged(rows)
+        
+        inserted = 0
+        updated = 0
+        moved = 0
+        if rows:
+            method = self.config.get('prices', {}).get('bulk_method', 'insert')
+            try:
+                if method == 'copy':
+                    self._copy_price_records(rows)
+                else:
+                    self._insert_price_records(rows)
+                inserted = len(rows)
+                
+                if self.price_snapshot is not None:
+                    moved = sum(1 for row in rows if (row['producto_id'], row['bandera']) in self.price_snapshot)
+                    for row in rows:
+                        self.price_snapshot[(row['producto_id'], row['bandera'])] = (
+                            self._normalize_price(row['precio_lista']),
+                            self._normalize_price(row['precio_promo_a'])
+                        )
+            except Exception as e:
+                self.logger.error(f"Error in bulk price save ({len(rows)} rows): {e}")
+                with self._stats_lock:
+                    self.stats['errores_base_datos'] += 1
+                skipped += len(rows)
+        
+        if unchanged_keys:
+            try:
+                self._touch_price_records(unchanged_keys)
+                updated = len(unchanged_keys)
+            except Exception as e:
+                self.logger.error(f"Error marking {len(unchanged_keys)} unchanged prices as seen: {e}")
+                with self._stats_lock:
+                    self.stats['errores_base_datos'] += 1
+                skipped += len(unchanged_keys)
         
-        self.logger.info(f"Batch save completed: {inserted} inserted, {updated} updated, {skipped} skipped")
+        with self._stats_lock:
+            self.stats['precios_insertados'] += inserted
+            self.stats['precios_actualizados'] += moved
+            self.stats['precios_sin_cambios'] += updated
+            self.stats['precios_omitidos'] += skipped
+            self.stats['ultima_operacion'] = get_timestamp()
+        
+        self.logger.info(f"Batch save completed: {inserted} inserted ({moved} changed), "
+                         f"{updated} unchanged, {skipped} skipped")
         return inserted, updated, skipped
     
+    def _touch_price_records(self, keys: List[Tuple[int, str]]):
+        """
+        Bump fecha_actualizacion of current prices that did not change.
+        
+        Args:
+            keys: (producto_id, bandera) pairs to mark as seen now
+        """
+        if not keys:
+            return
+        
+        with self.get_session() as session:
+            try:
+                session.query(PrecioActual).filter(
+                    tuple_(PrecioActual.producto_id, PrecioActual.bandera).in_(keys)
+                ).update({'fecha_actualizacion': func.now(), 'activo': True}, synchronize_session=False)
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+    
+    def _insert_price_records(self, rows: List[Dict[str, Any]]):
+        """
+        Append price rows to the history with one multi-row INSERT and
+        upsert the current prices, in a single transaction.
+        
+        Args:
+            rows: Prepared price rows
+        """
+        with self.get_session() as session:
+            try:
+                session.execute(insert(PrecioHistorial).values(rows))
+                session.execute(self._build_current_price_upsert(rows))
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+    
+    def _build_current_price_upsert(self, rows: List[Dict[str, Any]]):
+        """
+        Build the INSERT ... ON CONFLICT statement that refreshes precios_actuales.
+        
+        Args:
+            rows: Prepared price rows
+            
+        Returns:
+            Executable upsert statement
+        """
+        # A statement may not touch the same row twice: keep the last row per key
+        latest_rows = list({(row['producto_id'], row['bandera']): row for row in rows}.values())
+        # Same lock order in every transaction so concurrent writers cannot deadlock
+        latest_rows.sort(key=lambda row: (row['producto_id'], row['bandera']))
+        
+        stmt = pg_insert(PrecioActual).values(latest_rows)
+        price_changed = (
+            PrecioActual.precio_lista.is_distinct_from(stmt.excluded.precio_lista) |
+            PrecioActual.precio_promo_a.is_distinct_from(stmt.excluded.precio_promo_a)
+        )
+        
+        return stmt.on_conflict_do_update(
+            index_elements=[PrecioActual.producto_id, PrecioActual.bandera],
+            set_={
+                'sucursal': stmt.excluded.sucursal,
+                'precio_lista': stmt.excluded.precio_lista,
+                'precio_promo_a': stmt.excluded.precio_promo_a,
+                'super_razon_social': stmt.excluded.super_razon_social,
+                'fecha_actualizacion': func.now(),
+                'fecha_cambio': case((price_changed, func.now()), else_=PrecioActual.fecha_cambio),
+                'activo': True
+            }
+        )
+    
+    def _copy_price_records(self, rows: List[Dict[str, Any]]):
+        """
+        Stream price rows into the history with COPY FROM STDIN (PostgreSQL only)
+        and upsert the current prices, in a single transaction.
+        
+        Args:
+            rows: Prepared price rows
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # NULL is written as \N so empty sucursal/super_razon_social stay '' as with INSERT
+            # (CSV mode would otherwise read an unquoted empty field as NULL)
+            writer.writerow([COPY_NULL if row[column] is None else row[column] for column in PRICE_COLUMNS])
+        buffer.seek(0)
+        
+        with self.get_session() as session:
+            try:
+                # Use the session's DBAPI connection so COPY and upsert share the transaction
+                dbapi_connection = session.connection().connection
+                with dbapi_connection.cursor() as cursor:
+                    cursor.copy_expert(
+                        f"COPY precios_historial ({', '.join(PRICE_COLUMNS)}) FROM STDIN "
+                        f"WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                        buffer
+                    )
+                session.execute(self._build_current_price_upsert(rows))
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+    
+    def ensure_history_partitions(self, months_ahead: int = 2, start: Optional[datetime] = None) -> int:
+        """
+        Create the monthly partitions of precios_historial that do not exist yet.
+        
+        Rows outside every monthly partition land in precios_historial_default,
+        so a missing partition never makes an insert fail.
+        
+        Args:
+            months_ahead: Months after the current one to prepare
+            start: First month to create (defaults to the current month)
+            
+        Returns:
+            Number of partitions checked
+        """
+        month = (start or datetime.now()).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        last_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        for _ in range(months_ahead):
+            last_month = (last_month + timedelta(days=32)).replace(day=1)
+        
+        checked = 0
+        while month <= last_month:
+            next_month = (month + timedelta(days=32)).replace(day=1)
+            partition = f"precios_historial_{month.strftime('%Y_%m')}"
+            try:
+                with engine.begin() as connection:
+                    connection.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF precios_historial "
+                        f"FOR VALUES FROM ('{month.strftime('%Y-%m-%d')}') TO ('{next_month.strftime('%Y-%m-%d')}')"
+                    ))
+                checked += 1
+            except Exception as e:
+                # Typically rows for this month already sit in the default partition
+                self.logger.warning(f"Could not create partition {partition}: {e}")
+            month = next_month
+        
+        return checked
+    
     def get_price_count(self) -> int:
         """
-        Get total number of prices in database.
+        Get total number of current prices in database.
         
         Returns:
             Number of prices
         """
         try:
             with self.get_session() as session:
-                count = session.query(func.count(Precio.id)).scalar()
+                count = session.query(func.count()).select_from(PrecioActual).scalar()
                 return count or 0
         except Exception as e:
             self.logger.error(f"Error getting price count: {e}")
             return 0
     
+    def get_latest_price_dates(self) -> Dict[str, datetime]:
+        """
+        Get the most recent price update per product in a single query.
+        
+        Returns:
+            Dictionary mapping EAN -> latest fecha_actualizacion
+        """
+        try:
+            with self.get_session() as session:
+                results = session.query(
+                    PrecioActual.producto_id,
+                    func.max(PrecioActual.fecha_actualizacion)
+                ).group_by(PrecioActual.producto_id).all()
+                
+                return {str(producto_id): fecha for producto_id, fecha in results if fecha is not None}
+        except Exception as e:
+            self.logger.error(f"Error getting latest price dates: {e}")
+            return {}
+    
+    def get_price_change_history(self, days: int = 90) -> Dict[str, Tuple[int, datetime]]:
+        """
+        Count price changes per product over a recent window of precios_historial.
+        
+        A change is a history row whose list or promo price differs from the
+        previous row of the same product and bandera, so the count is right
+        whether or not change detection was on when the rows were written.
+        
+        Args:
+            days: Length of the window in days
+            
+        Returns:
+            Dictionary mapping EAN -> (changes, first observation in the window)
+        """
+        query = text("""
+            SELECT producto_id,
+                   SUM(CASE WHEN n > 1 AND (precio_lista IS DISTINCT FROM lista_anterior
+                                            OR precio_promo_a IS DISTINCT FROM promo_anterior)
+                            THEN 1 ELSE 0 END) AS cambios,
+                   MIN(fecha_actualizacion) AS desde
+            FROM (
+                SELECT producto_id, fecha_actualizacion, precio_lista, precio_promo_a,
+                       LAG(precio_lista) OVER w AS lista_anterior,
+                       LAG(precio_promo_a) OVER w AS promo_anterior,
+                       ROW_NUMBER() OVER w AS n
+                FROM precios_historial
+                WHERE fecha_actualizacion >= :desde
+                WINDOW w AS (PARTITION BY producto_id, bandera ORDER BY fecha_actualizacion)
+            ) AS ordenados
+            GROUP BY producto_id
+        """)
+        
+        try:
+            with self.get_session() as session:
+                results = session.execute(query, {'desde': datetime.now() - timedelta(days=days)}).all()
+                return {str(producto_id): (int(cambios), desde) for producto_id, cambios, desde in results}
+        except Exception as e:
+            self.logger.error(f"Error getting price change history: {e}")
+            return {}
+    
+    def get_demand_counts(self) -> Dict[str, int]:
+        """
+        Get how many compared carts included each product.
+        
+        Returns:
+            Dictionary mapping EAN -> cart lookups (empty if nothing was recorded yet)
+        """
+        try:
+            with self.get_session() as session:
+                results = session.query(DemandaProducto.producto_id, DemandaProducto.consultas).all()
+                return {str(producto_id): consultas for producto_id, consultas in results}
+        except Exception as e:
+            self.logger.warning(f"Product demand not available: {e}")
+            return {}
+    
     def get_prices_by_supermercado(self) -> Dict[str, int]:
         """
         Get price count by supermercado bandera.
@@ -325,9 +632,9 @@ class PriceManager:
         try:
             with self.get_session() as session:
                 results = session.query(
-                    Precio.bandera, 
-                    func.count(Precio.id)
-                ).group_by(Precio.bandera).all()
+                    PrecioActual.bandera, 
+                    func.count()
+                ).filter(PrecioActual.activo == True).group_by(PrecioActual.bandera).all()
                 
                 supermercado_counts = {}
                 for bandera, count in results:
@@ -348,33 +655,37 @@ class PriceManager:
         try:
             with self.get_session() as session:
                 # Basic counts
-                total_prices = session.query(func.count(Precio.id)).scalar() or 0
+                total_prices = session.query(func.count()).select_from(PrecioActual).scalar() or 0
                 
                 if total_prices == 0:
                     return {'total_prices': 0}
                 
                 # Active prices
-                active_prices = session.query(func.count(Precio.id)).filter(Precio.activo == True).scalar() or 0
+                active_prices = session.query(func.count()).select_from(PrecioActual).filter(PrecioActual.activo == True).scalar() or 0
+                
+                # Price changes kept in history
+                history_rows = session.query(func.count()).select_from(PrecioHistorial).scalar() or 0
                 
                 # Supermercado counts
                 supermercado_counts = self.get_prices_by_supermercado()
                 
                 # Price range statistics
                 price_stats = session.query(
-                    func.min(Precio.precio_lista),
-                    func.max(Precio.precio_lista),
-                    func.avg(Precio.precio_lista)
-                ).first()
+                    func.min(PrecioActual.precio_lista),
+                    func.max(PrecioActual.precio_lista),
+                    func.avg(PrecioActual.precio_lista)
+                ).filter(PrecioActual.activo == True).first()
                 
                 min_price, max_price, avg_price = price_stats if price_stats else (0, 0, 0)
                 
                 # Products with prices
-                products_with_prices = session.query(func.count(func.distinct(Precio.producto_id))).scalar() or 0
+                products_with_prices = session.query(func.count(func.distinct(PrecioActual.producto_id))).filter(PrecioActual.activo == True).scalar() or 0
                 
                 return {
                     'total_prices': total_prices,
                     'active_prices': active_prices,
                     'inactive_prices': total_prices - active_prices,
+                    'history_rows': history_rows,
                     'supermercados': supermercado_counts,
                     'products_with_prices': products_with_prices,
                     'min_price': float(min_price) if min_price else 0.0,
@@ -390,7 +701,8 @@ class PriceManager:
     
     def cleanup_old_prices(self, days_old: int = 30) -> int:
         """
-        Mark old prices as inactive.
+        Mark current prices not seen for a while as inactive.
+        History is never updated; old months can be dropped by partition.
         
         Args:
             days_old: Number of days to consider prices as old
@@ -402,10 +714,10 @@ class PriceManager:
             with self.get_session() as session:
                 cutoff_date = datetime.now() - timedelta(days=days_old)
                 
-                updated_count = session.query(Precio).filter(
+                updated_count = session.query(PrecioActual).filter(
                     and_(
-                        Precio.fecha_actualizacion < cutoff_date,
-                        Precio.activo == True
+                        PrecioActual.fecha_actualizacion < cutoff_date,
+                        PrecioActual.activo == True
                     )
                 ).update({'activo': False})
                 
@@ -437,8 +749,210 @@ class PriceManager:
             'precios_insertados': 0,
             'precios_actualizados': 0,
             'precios_omitidos': 0,
+            'precios_sin_cambios': 0,
             'errores_base_datos': 0,
             'productos_no_encontrados': 0,
             'supermercados_no_encontrados': 0,
             'ultima_operacion': None
         }
+
+class PriceWriteBuffer:
+    """
+    Write-behind buffer for scraped prices.
+    
+    Prices are accumulated in memory and written by background threads through
+    PriceManager.batch_save_prices whenever the buffer reaches `batch_size` rows or
+    its oldest row is `max_age` seconds old, so fetching and writing overlap.
+    `add` blocks when `max_pending` rows are waiting, which keeps memory bounded
+    if the database falls behind.
+    """
+    
+    def __init__(self, price_manager: PriceManager, logger: logging.Logger,
+                 batch_size: int = 50, max_age: float = 30.0, max_pending: Optional[int] = None,
+                 writers: int = 1, on_written: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        """
+        Initialize the buffer and start the writer threads.
+        
+        Args:
+            price_manager: PriceManager used to persist batches
+            logger: Logger instance
+            batch_size: Rows that trigger a flush
+            max_age: Seconds after which buffered rows are flushed regardless of size
+            max_pending: Rows that may wait before `add` blocks (default 10 batches)
+            writers: Batches written concurrently (one database connection each)
+            on_written: Called with each batch once it is stored (from a writer thread)
+        """
+        self.price_manager = price_manager
+        self.logger = logger
+        self.batch_size = max(1, batch_size)
+        self.max_age = max_age
+        self.max_pending = max_pending or self.batch_size * 10
+        self.on_written = on_written
+        
+        self._buffer: List[Dict[str, Any]] = []
+        self._oldest_time: Optional[float] = None
+        self._in_flight = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        
+        # Statistics (guarded by the condition's lock)
+        self.stats = {
+            'batches_written': 0,
+            'rows_inserted': 0,
+            'rows_skipped': 0,
+            'write_errors': 0
+        }
+        self._busy_time = 0.0
+        self._max_pending_seen = 0
+        self._started_at = time.monotonic()
+        
+        self._writers = [
+            threading.Thread(target=self._run, name=f'price-writer-{i + 1}', daemon=True)
+            for i in range(max(1, writers))
+        ]
+        for writer in self._writers:
+            writer.start()
+    
+    def add(self, prices: List[Dict[str, Any]]):
+        """
+        Queue prices for writing.
+        
+        Args:
+            prices: Price dictionaries as produced by the scraper
+        """
+        if not prices:
+            return
+        
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("PriceWriteBuffer is closed")
+            
+            # Backpressure: wait while the database is behind
+            while len(self._buffer) + self._in_flight >= self.max_pending and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                # Closed while waiting: the writers may already be gone
+                raise RuntimeError("PriceWriteBuffer is closed")
+            
+            if not self._buffer:
+                self._oldest_time = time.monotonic()
+            self._buffer.extend(prices)
+            self._max_pending_seen = max(self._max_pending_seen, len(self._buffer) + self._in_flight)
+            
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify_all()
+    
+    def pending(self) -> int:
+        """
+        Get the number of rows not yet written.
+        
+        Returns:
+            Buffered plus in-flight rows
+        """
+        with self._condition:
+            return len(self._buffer) + self._in_flight
+    
+    def _run(self):
+        """
+        Writer threads: flush on size, age or close.
+        """
+        while True:
+            with self._condition:
+                while True:
+                    if self._buffer and (self._closed or len(self._buffer) >= self.batch_size):
+                        break
+                    if self._buffer and time.monotonic() - self._oldest_time >= self.max_age:
+                        break
+                    if self._closed:
+                        return
+                    
+                    timeout = None
+                    if self._buffer:
+                        timeout = max(0.0, self.max_age - (time.monotonic() - self._oldest_time))
+                    self._condition.wait(timeout)
+                
+                batch = self._buffer
+                self._buffer = []
+                self._oldest_time = None
+                self._in_flight += len(batch)
+            
+            start = time.monotonic()
+            self._write(batch)
+            
+            with self._condition:
+                self._in_flight -= len(batch)
+                self._busy_time += time.monotonic() - start
+                self._condition.notify_all()
+    
+    def _write(self, batch: List[Dict[str, Any]]):
+        """
+        Persist one batch and update statistics.
+        
+        Args:
+            batch: Price dictionaries to write
+        """
+        try:
+            inserted, updated, skipped = self.price_manager.batch_save_prices(batch)
+            with self._condition:
+                self.stats['batches_written'] += 1
+                self.stats['rows_inserted'] += inserted
+                self.stats['rows_skipped'] += skipped
+            # A fully skipped batch means the database write failed
+            if self.on_written is not None and skipped < len(batch):
+                self.on_written(batch)
+        except Exception as e:
+            self.logger.error(f"Error writing price batch ({len(batch)} rows): {e}")
+            with self._condition:
+                self.stats['write_errors'] += 1
+                self.stats['rows_skipped'] += len(batch)
+    
+    def flush(self):
+        """
+        Block until every buffered row has been written.
+        """
+        with self._condition:
+            self._oldest_time = time.monotonic() - self.max_age
+            self._condition.notify_all()
+            while (self._buffer or self._in_flight) and any(w.is_alive() for w in self._writers):
+                self._condition.wait()
+    
+    def close(self):
+        """
+        Flush remaining rows and stop the writer threads.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for writer in self._writers:
+            writer.join()
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get write buffer statistics.
+        
+        Returns:
+            Statistics dictionary
+        """
+        with self._condition:
+            elapsed = time.monotonic() - self._started_at
+            return {
+                **self.stats,
+                'writers': len(self._writers),
+                'rows_per_second': round(self.stats['rows_inserted'] / elapsed, 2) if elapsed > 0 else 0.0,
+                'utilization': round(self._busy_time / (elapsed * len(self._writers)) * 100, 1) if elapsed > 0 else 0.0,
+                'pending': len(self._buffer) + self._in_flight,
+                'max_pending_seen': self._max_pending_seen,
+                'max_pending': self.max_pending
+            }
+    
+    def __enter__(self):
+        """
+        Context manager entry.
+        """
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Context manager exit: always flush what was buffered.
+        """
+        self.close()
@@ -27,8 +27,8 @@ def main():
         
         # Test simple de precios
         print("\n4. Probando precios (método simple)...")
-        from backend.database.models import Precio
-        precios_count = session.query(Precio).filter(Precio.activo == True).count()
+        from backend.database.models import PrecioActual
+        precios_count = session.query(PrecioActual).filter(PrecioActual.activo == True).count()
         print(f"✅ {precios_count} precios activos en base de datos")
         
         print("\n🎉 TESTS BÁSICOS EXITOSOS!")
@@ -0,0 +1,201 @@
+"""
+Rate limiter module for the product scraper system.
+Implements a shared, adaptive token bucket (AIMD) for the Precios Claros API.
+"""
+
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe token bucket whose refill rate adapts to upstream health.
+
+    The rate grows additively after every healthy response and is cut
+    multiplicatively on 429/5xx responses (AIMD), so callers converge on
+    the real capacity of the upstream instead of a fixed delay.
+    """
+
+    def __init__(self, initial_rate: float, min_rate: float = 0.2, max_rate: float = 5.0,
+                 burst: float = 1.0, increase_step: float = 0.02, decrease_factor: float = 0.5,
+                 max_pause: float = 60.0):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            initial_rate: Starting rate in requests per second
+            min_rate: Lower bound for the adaptive rate
+            max_rate: Upper bound for the adaptive rate
+            burst: Bucket capacity (requests that may be sent back to back)
+            increase_step: Requests/second added after each healthy response
+            decrease_factor: Multiplier applied to the rate on throttling
+            max_pause: Maximum seconds to pause all callers on a Retry-After
+        """
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = max(min_rate, min(max_rate, initial_rate))
+        self.burst = max(1.0, burst)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.max_pause = max_pause
+
+        self._lock = threading.Lock()
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+
+        # Statistics
+        self.total_acquired = 0
+        self.total_wait_time = 0.0
+        self.throttle_events = 0
+        self.rate_decreases = 0
+
+    def _refill(self, now: float):
+        """
+        Add the tokens accrued since the last refill. Caller must hold the lock.
+
+        Args:
+            now: Current monotonic time
+        """
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def _try_acquire(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            0.0 if a token was taken, otherwise seconds to wait before retrying
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+
+            self._refill(now)
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self.total_acquired += 1
+                return 0.0
+
+            return (1.0 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """
+        Block the calling thread until a request may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait_time = self._try_acquire()
+            if wait_time <= 0:
+                break
+            time.sleep(wait_time)
+            waited += wait_time
+
+        if waited:
+            with self._lock:
+                self.total_wait_time += waited
+        return waited
+
+    def on_success(self):
+        """
+        Additive increase after a healthy response.
+        """
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """
+        Multiplicative decrease after a 429/5xx response.
+
+        Several in-flight requests usually fail together; the rate is only cut
+        once per refill interval so one overload episode counts as one event.
+
+        Args:
+            retry_after: Seconds requested by the server via Retry-After, if any
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.throttle_events += 1
+
+            if now - self._last_decrease >= 1.0 / self.rate:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self._last_decrease = now
+                self.rate_decreases += 1
+
+            self._tokens = 0.0
+            self._last_refill = now
+
+            if retry_after:
+                pause = min(float(retry_after), self.max_pause)
+                self._paused_until = max(self._paused_until, now + pause)
+
+    def set_rate(self, rate: float):
+        """
+        Override the current rate (clamped to the configured bounds).
+
+        Args:
+            rate: New rate in requests per second
+        """
+        with self._lock:
+            self.rate = max(self.min_rate, min(self.max_rate, rate))
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get rate limiter statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._lock:
+            avg_wait = self.total_wait_time / self.total_acquired if self.total_acquired else 0.0
+            paused_for = max(0.0, self._paused_until - time.monotonic())
+
+            return {
+                'current_rate': round(self.rate, 3),
+                'min_rate': self.min_rate,
+                'max_rate': self.max_rate,
+                'total_acquired': self.total_acquired,
+                'total_wait_time': round(self.total_wait_time, 2),
+                'avg_wait_time': round(avg_wait, 3),
+                'throttle_events': self.throttle_events,
+                'rate_decreases': self.rate_decreases,
+                'paused_for': round(paused_for, 2)
+            }
+
+# Limiters shared by every client talking to the same host
+_shared_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_shared_limiters_lock = threading.Lock()
+
+def get_shared_rate_limiter(config: Dict[str, Any]) -> AdaptiveRateLimiter:
+    """
+    Get the process-wide rate limiter for the configured API host.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Shared AdaptiveRateLimiter instance
+    """
+    host = urlparse(config['api']['products_url']).netloc
+
+    with _shared_limiters_lock:
+        if host not in _shared_limiters:
+            settings = config['api'].get('rate_limiter', {})
+            _shared_limiters[host] = AdaptiveRateLimiter(
+                initial_rate=1.0 / config['api']['rate_limit'],
+                min_rate=settings.get('min_rate', 0.2),
+                max_rate=settings.get('max_rate', 5.0),
+                burst=settings.get('burst', 1.0),
+                increase_step=settings.get('increase_step', 0.02),
+                decrease_factor=settings.get('decrease_factor', 0.5),
+                max_pause=settings.get('max_pause', 60.0)
+            )
+        return _shared_limiters[host]
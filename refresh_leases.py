@@ -0,0 +1,285 @@
+"""
+Refresh lease module for the price scraper.
+Splits the EAN list into shards that several workers claim through a lease table.
+"""
+
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Callable
+
+from sqlalchemy import func, and_, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from backend.database.connection import SessionLocal, engine
+from backend.database.models import LeasePrecios
+
+class RefreshLeaseManager:
+    """
+    Coordinates a sharded price refresh between workers sharing one database.
+
+    Each run (run_id) splits the sorted EAN list into contiguous ranges. A
+    worker claims one pending range at a time with SELECT ... FOR UPDATE SKIP
+    LOCKED, keeps its lease alive with heartbeats and marks it completed at
+    the end. A range whose lease expires (crashed worker) can be claimed by
+    any other worker. Expiry uses the database clock, so workers on different
+    hosts agree on it.
+    """
+
+    def __init__(self, config: Dict[str, Any], logger: logging.Logger,
+                 run_id: Optional[str] = None, worker_id: Optional[str] = None):
+        """
+        Initialize the lease manager and create the lease table if needed.
+
+        Args:
+            config: Configuration dictionary
+            logger: Logger instance
+            run_id: Refresh run identifier shared by all workers (default: today's date)
+            worker_id: Identifier of this worker (default: host-pid)
+        """
+        settings = config['prices'].get('sharding', {})
+        self.logger = logger
+        self.run_id = run_id or datetime.now().strftime('%Y-%m-%d')
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.num_shards = max(1, settings.get('shards', 32))
+        self.lease_seconds = settings.get('lease_seconds', 300)
+        self.heartbeat_seconds = settings.get('heartbeat_seconds', 60)
+
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        self._heartbeat_stop = threading.Event()
+        self.lease_lost = threading.Event()
+
+        LeasePrecios.__table__.create(bind=engine, checkfirst=True)
+
+    def ensure_shards(self, eans: List[str]) -> int:
+        """
+        Create the shards of this run if no worker has done it yet.
+
+        The first and last ranges are open-ended so EANs added after the run
+        was split still belong to a shard. Creation runs under a transaction
+        advisory lock on the run, so workers starting together (possibly with
+        different EAN lists) cannot mix rows from two splits.
+
+        Args:
+            eans: Every EAN to refresh
+
+        Returns:
+            Number of shards in the run
+        """
+        with SessionLocal() as session:
+            # Held until commit/rollback: the count and the insert see the same state
+            session.query(func.pg_advisory_xact_lock(func.hashtext(f"leases_precios:{self.run_id}"))).scalar()
+            existing = session.query(func.count()).select_from(LeasePrecios).filter(
+                LeasePrecios.run_id == self.run_id
+            ).scalar()
+            if existing:
+                return existing
+
+            eans = sorted(set(eans))
+            num_shards = max(1, min(self.num_shards, len(eans)))
+            bounds = [eans[i * len(eans) // num_shards] for i in range(1, num_shards)]
+
+            rows = [
+                {
+                    'run_id': self.run_id,
+                    'shard_id': shard_id,
+                    'ean_desde': bounds[shard_id - 1] if shard_id > 0 else None,
+                    'ean_hasta': bounds[shard_id] if shard_id < num_shards - 1 else None,
+                    'estado': 'pendiente',
+                    'procesados': 0,
+                    'intentos': 0
+                }
+                for shard_id in range(num_shards)
+            ]
+            # (run_id, shard_id) is the key: a rerun of the same split is a no-op
+            session.execute(pg_insert(LeasePrecios).values(rows).on_conflict_do_nothing())
+            session.commit()
+
+            self.logger.info(f"Run {self.run_id}: {num_shards} shards created")
+            return num_shards
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Claim the next pending shard, or one whose lease expired.
+
+        Returns:
+            Shard dictionary (shard_id, ean_desde, ean_hasta, procesados, retomado),
+            or None when every shard is taken or completed
+        """
+        with SessionLocal() as session:
+            lease = session.query(LeasePrecios).filter(
+                LeasePrecios.run_id == self.run_id,
+                or_(
+                    LeasePrecios.estado == 'pendiente',
+                    and_(LeasePrecios.estado == 'en_proceso', LeasePrecios.lease_expira < func.now())
+                )
+            ).order_by(LeasePrecios.shard_id).with_for_update(skip_locked=True).first()
+
+            if lease is None:
+                return None
+
+            shard = {
+                'shard_id': lease.shard_id,
+                'ean_desde': lease.ean_desde,
+                'ean_hasta': lease.ean_hasta,
+                'procesados': lease.procesados or 0,
+                'retomado': lease.estado == 'en_proceso',
+                'worker_anterior': lease.worker_id
+            }
+
+            lease.estado = 'en_proceso'
+            lease.worker_id = self.worker_id
+            lease.lease_expira = func.now() + timedelta(seconds=self.lease_seconds)
+            lease.heartbeat = func.now()
+            lease.intentos = (lease.intentos or 0) + 1
+            if lease.fecha_inicio is None:
+                lease.fecha_inicio = func.now()
+            session.commit()
+
+        if shard['retomado']:
+            self.logger.warning(f"Shard {shard['shard_id']} taken over from expired worker {shard['worker_anterior']}")
+        return shard
+
+    @staticmethod
+    def in_shard(ean: str, shard: Dict[str, Any]) -> bool:
+        """
+        Check whether an EAN belongs to a shard's range.
+
+        Args:
+            ean: EAN to check
+            shard: Shard dictionary returned by claim
+
+        Returns:
+            True if the EAN is in [ean_desde, ean_hasta)
+        """
+        return ((shard['ean_desde'] is None or ean >= shard['ean_desde']) and
+                (shard['ean_hasta'] is None or ean < shard['ean_hasta']))
+
+    def _update_own_lease(self, shard_id: int, values: Dict[str, Any]) -> bool:
+        """
+        Update a shard only while this worker still holds its lease.
+
+        Args:
+            shard_id: Shard to update
+            values: Column values to set
+
+        Returns:
+            True if the lease was still ours
+        """
+        with SessionLocal() as session:
+            updated = session.query(LeasePrecios).filter(
+                LeasePrecios.run_id == self.run_id,
+                LeasePrecios.shard_id == shard_id,
+                LeasePrecios.worker_id == self.worker_id,
+                LeasePrecios.estado == 'en_proceso'
+            ).update(values, synchronize_session=False)
+            session.commit()
+            return updated > 0
+
+    def heartbeat(self, shard_id: int, procesados: int) -> bool:
+        """
+        Extend the lease of a shard and record progress.
+
+        Args:
+            shard_id: Shard held by this worker
+            procesados: EANs processed so far in this shard
+
+        Returns:
+            True if the lease is still held
+        """
+        return self._update_own_lease(shard_id, {
+            'lease_expira': func.now() + timedelta(seconds=self.lease_seconds),
+            'heartbeat': func.now(),
+            'procesados': procesados
+        })
+
+    def start_heartbeat(self, shard_id: int, progress: Callable[[], int]):
+        """
+        Send heartbeats for a shard from a background thread until stop_heartbeat.
+
+        Args:
+            shard_id: Shard held by this worker
+            progress: Returns the EANs processed so far in the shard
+        """
+        self.stop_heartbeat()
+        self._heartbeat_stop.clear()
+        self.lease_lost.clear()
+
+        def run():
+            while not self._heartbeat_stop.wait(self.heartbeat_seconds):
+                try:
+                    if not self.heartbeat(shard_id, progress()):
+                        self.logger.warning(f"Lease of shard {shard_id} lost (expired and taken by another worker)")
+                        self.lease_lost.set()
+                        return
+                except Exception as e:
+                    # A missed heartbeat is tolerated until the lease expires
+                    self.logger.error(f"Heartbeat failed for shard {shard_id}: {e}")
+
+        self._heartbeat_thread = threading.Thread(target=run, name=f'lease-heartbeat-{shard_id}', daemon=True)
+        self._heartbeat_thread.start()
+
+    def stop_heartbeat(self):
+        """
+        Stop the heartbeat thread, if any.
+        """
+        if self._heartbeat_thread:
+            self._heartbeat_stop.set()
+            self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+
+    def complete(self, shard_id: int, procesados: int) -> bool:
+        """
+        Mark a shard as completed.
+
+        Args:
+            shard_id: Shard held by this worker
+            procesados: EANs processed in the shard
+
+        Returns:
+            True if the lease was still ours
+        """
+        return self._update_own_lease(shard_id, {
+            'estado': 'completado',
+            'procesados': procesados,
+            'lease_expira': None,
+            'fecha_fin': func.now()
+        })
+
+    def release(self, shard_id: int, procesados: int) -> bool:
+        """
+        Give a shard back so another worker can continue it.
+
+        Args:
+            shard_id: Shard held by this worker
+            procesados: EANs processed in the shard
+
+        Returns:
+            True if the lease was still ours
+        """
+        return self._update_own_lease(shard_id, {
+            'estado': 'pendiente',
+            'worker_id': None,
+            'procesados': procesados,
+            'lease_expira': None
+        })
+
+    def get_run_status(self) -> Dict[str, Any]:
+        """
+        Summarize the shards of this run.
+
+        Returns:
+            Dictionary with shard counts by state and EANs processed
+        """
+        with SessionLocal() as session:
+            results = session.query(
+                LeasePrecios.estado, func.count(), func.coalesce(func.sum(LeasePrecios.procesados), 0)
+            ).filter(LeasePrecios.run_id == self.run_id).group_by(LeasePrecios.estado).all()
+
+        status = {'run_id': self.run_id, 'pendiente': 0, 'en_proceso': 0, 'completado': 0, 'procesados': 0}
+        for estado, count, procesados in results:
+            status[estado] = count
+            status['procesados'] += int(procesados)
+        return status
@@ -0,0 +1,228 @@
+"""
+Refresh scheduler module for the price scraper.
+Spends a daily request budget on the products most likely to show a stale price to users.
+"""
+
+import heapq
+import logging
+import math
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Tuple
+
+from price_manager import PriceManager
+from scrape_journal import ScrapeJournal
+
+# Budget fractions reported in the staleness reduction curve
+CURVE_FRACTIONS = (0.1, 0.25, 0.5, 0.75, 1.0)
+
+class RefreshScheduler:
+    """
+    Ranks products by the expected benefit of refreshing their price.
+
+    Price changes are modelled as a Poisson process per product: with change
+    rate r (changes/day, estimated from precios_historial and smoothed towards
+    a prior) and a price last seen d days ago, the stored price is stale with
+    probability 1 - exp(-r * d). Products never priced are stale for sure.
+    Each probability is weighted by demand, 1 + demand_weight * log(1 + cart
+    lookups), and the budget goes to the products with the highest weighted
+    staleness.
+    """
+
+    def __init__(self, config: Dict[str, Any], logger: logging.Logger, price_manager: PriceManager,
+                 journal: Optional[ScrapeJournal] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            config: Configuration dictionary
+            logger: Logger instance
+            price_manager: PriceManager used to read history, demand and last updates
+            journal: Journal used to count the requests already spent today
+        """
+        settings = config['prices'].get('scheduler', {})
+        self.logger = logger
+        self.price_manager = price_manager
+        self.journal = journal
+        self.daily_budget = settings.get('daily_budget', 8000)
+        self.history_days = settings.get('history_days', 90)
+        self.prior_rate = settings.get('prior_changes_per_day', 0.1)
+        self.prior_days = settings.get('prior_days', 14)
+        self.demand_weight = settings.get('demand_weight', 1.0)
+
+        self.change_history: Dict[str, Tuple[int, datetime]] = {}
+        self.demand: Dict[str, int] = {}
+        self.last_seen: Dict[str, datetime] = {}
+        self.statistics: Dict[str, Any] = {}
+
+    @staticmethod
+    def _key(ean: str) -> str:
+        """
+        Database key of an EAN (producto_id is numeric, so leading zeros are dropped).
+
+        Args:
+            ean: EAN code
+
+        Returns:
+            Key used by the price and demand tables
+        """
+        return str(int(ean)) if ean.isdigit() else ean
+
+    @staticmethod
+    def _as_aware(fecha: datetime) -> datetime:
+        """
+        Interpret naive datetimes as local time.
+
+        Args:
+            fecha: Datetime from the database
+
+        Returns:
+            Timezone-aware datetime
+        """
+        return fecha.astimezone() if fecha.tzinfo is None else fecha
+
+    def load_signals(self):
+        """
+        Load change history, cart demand and last update per product.
+        """
+        self.change_history = self.price_manager.get_price_change_history(self.history_days)
+        self.demand = self.price_manager.get_demand_counts()
+        self.last_seen = self.price_manager.get_latest_price_dates()
+        self.logger.info(f"Scheduler signals: {len(self.change_history)} products with history, "
+                         f"{len(self.demand)} with cart demand, {len(self.last_seen)} with prices")
+
+    def change_rate(self, key: str, now: datetime) -> float:
+        """
+        Estimated price changes per day of a product.
+
+        Observed changes are pooled with `prior_days` of changes at the prior
+        rate, so a product seen for a few days is not ranked on noise.
+
+        Args:
+            key: Product key
+            now: Current time
+
+        Returns:
+            Changes per day
+        """
+        history = self.change_history.get(key)
+        if history is None:
+            return self.prior_rate
+
+        changes, since = history
+        observed_days = max((now - self._as_aware(since)).total_seconds() / 86400, 1.0)
+        return (changes + self.prior_rate * self.prior_days) / (observed_days + self.prior_days)
+
+    def stale_probability(self, key: str, now: datetime) -> float:
+        """
+        Probability that the stored price of a product is out of date.
+
+        Args:
+            key: Product key
+            now: Current time
+
+        Returns:
+            Probability between 0 and 1
+        """
+        fecha = self.last_seen.get(key)
+        if fecha is None:
+            return 1.0
+        age_days = max((now - self._as_aware(fecha)).total_seconds() / 86400, 0.0)
+        return 1.0 - math.exp(-self.change_rate(key, now) * age_days)
+
+    def demand_factor(self, key: str) -> float:
+        """
+        Priority multiplier from cart demand.
+
+        Args:
+            key: Product key
+
+        Returns:
+            Weight >= 1
+        """
+        return 1.0 + self.demand_weight * math.log1p(self.demand.get(key, 0))
+
+    def remaining_budget(self, now: Optional[datetime] = None) -> int:
+        """
+        Requests left in today's budget.
+
+        Args:
+            now: Current time (default: now)
+
+        Returns:
+            Number of products that may still be refreshed today
+        """
+        if self.journal is None:
+            return self.daily_budget
+        now = now or datetime.now()
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        spent = self.journal.count_eans_since('precios', midnight.timestamp())
+        return max(0, self.daily_budget - spent)
+
+    def plan(self, eans: List[str], budget: Optional[int] = None, now: Optional[datetime] = None) -> List[str]:
+        """
+        Choose the products to refresh within the budget, best first.
+
+        Also fills `statistics` with the expected share of stale prices (demand
+        weighted) before and after the refresh, the same figure for refreshing
+        the oldest prices first, and the reduction at fractions of the budget.
+
+        Args:
+            eans: Candidate EANs
+            budget: Requests to spend (None = what is left of today's budget)
+            now: Current time (default: now)
+
+        Returns:
+            EANs to refresh, in descending order of benefit
+        """
+        now = now or datetime.now(timezone.utc)
+        if budget is None:
+            budget = self.remaining_budget()
+
+        scored = []
+        weight_total = 0.0
+        for ean in eans:
+            key = self._key(ean)
+            weight = self.demand_factor(key)
+            weight_total += weight
+            scored.append((weight * self.stale_probability(key, now), ean, key))
+
+        stale_total = sum(benefit for benefit, _, _ in scored)
+        by_benefit = sorted((benefit for benefit, _, _ in scored), reverse=True)
+        selected = [ean for _, ean, _ in heapq.nlargest(budget, scored, key=lambda item: item[0])]
+
+        # Oldest-first baseline: never priced, then by last update
+        epoch = datetime.min.replace(tzinfo=timezone.utc)
+        oldest_first = sorted(scored, key=lambda item: self._as_aware(self.last_seen[item[2]])
+                              if item[2] in self.last_seen else epoch)
+        baseline_gain = sum(benefit for benefit, _, _ in oldest_first[:budget])
+
+        def share(value: float) -> float:
+            return round(value / weight_total * 100, 2) if weight_total else 0.0
+
+        gain = sum(by_benefit[:budget])
+        self.statistics = {
+            'candidates': len(eans),
+            'daily_budget': self.daily_budget,
+            'budget': budget,
+            'selected': len(selected),
+            'expected_stale_before': share(stale_total),
+            'expected_stale_after': share(stale_total - gain),
+            'expected_stale_after_oldest_first': share(stale_total - baseline_gain),
+            'reduction_curve': [
+                {
+                    'budget': int(budget * fraction),
+                    'expected_stale_after': share(stale_total - sum(by_benefit[:int(budget * fraction)]))
+                }
+                for fraction in CURVE_FRACTIONS
+            ]
+        }
+        return selected
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get the statistics of the last plan.
+
+        Returns:
+            Statistics dictionary
+        """
+        return dict(self.statistics)
@@ -0,0 +1,258 @@
+"""
+Response cache module for the product scraper system.
+Disk-backed, compressed cache of API responses with per-endpoint TTL and LRU eviction.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Any, Optional
+from urllib.parse import urlencode, urlparse
+
+class ResponseCache:
+    """
+    Thread-safe on-disk cache of parsed JSON responses.
+
+    Entries are keyed by URL and normalized parameters, stored zlib-compressed
+    in a single SQLite file and evicted least-recently-used first once the
+    cache grows past its size limit.
+    """
+
+    def __init__(self, cache_dir: str, logger: logging.Logger, ttl_by_endpoint: Optional[Dict[str, float]] = None,
+                 default_ttl: float = 3600, max_size_mb: float = 500, replay: bool = False):
+        """
+        Initialize the response cache.
+
+        Args:
+            cache_dir: Directory holding the cache database
+            logger: Logger instance
+            ttl_by_endpoint: Seconds an entry stays fresh, by last URL path segment
+            default_ttl: TTL for endpoints not listed in ttl_by_endpoint
+            max_size_mb: Compressed size above which old entries are evicted
+            replay: Serve entries regardless of age (offline replay)
+        """
+        self.logger = logger
+        self.ttl_by_endpoint = ttl_by_endpoint or {}
+        self.default_ttl = default_ttl
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.replay = replay
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'responses.sqlite')
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._connection.execute("CREATE INDEX IF NOT EXISTS ix_responses_last_access ON responses (last_access)")
+        self._connection.commit()
+
+        self._size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build the cache key for a request.
+
+        Parameters are sorted, stripped and stringified, and comma-separated
+        lists (e.g. array_sucursales) are sorted, so equivalent requests share
+        one entry.
+
+        Args:
+            url: Request URL
+            params: Query parameters
+
+        Returns:
+            Hex digest identifying the request
+        """
+        normalized = []
+        for name, value in sorted((params or {}).items()):
+            value = str(value).strip()
+            if ',' in value:
+                value = ','.join(sorted(part.strip() for part in value.split(',')))
+            normalized.append((name, value))
+
+        return hashlib.sha256(f"{url}?{urlencode(normalized)}".encode('utf-8')).hexdigest()
+
+    def _ttl_for(self, url: str) -> float:
+        """
+        TTL of the endpoint a URL belongs to.
+
+        Args:
+            url: Request URL
+
+        Returns:
+            TTL in seconds
+        """
+        endpoint = urlparse(url).path.rstrip('/').rsplit('/', 1)[-1]
+        return self.ttl_by_endpoint.get(endpoint, self.default_ttl)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """
+        Look up a cached response.
+
+        Args:
+            url: Request URL
+            params: Query parameters
+
+        Returns:
+            Parsed response, or None on a miss or an expired entry
+        """
+        key = self.make_key(url, params)
+        now = time.time()
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            body, created_at = row
+            if not self.replay and now - created_at > self._ttl_for(url):
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            self._connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._connection.commit()
+            self.hits += 1
+
+        return json.loads(zlib.decompress(body).decode('utf-8'))
+
+    def put(self, url: str, params: Optional[Dict[str, Any]], data: Any):
+        """
+        Store a response, evicting least recently used entries if needed.
+
+        Args:
+            url: Request URL
+            params: Query parameters
+            data: Parsed JSON response
+        """
+        key = self.make_key(url, params)
+        body = zlib.compress(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        now = time.time()
+
+        with self._lock:
+            try:
+                previous = self._connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, url, body, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, url, body, len(body), now, now)
+                )
+                self._size += len(body) - (previous[0] if previous else 0)
+                self.writes += 1
+
+                if self._size > self.max_bytes:
+                    self._evict()
+
+                self._connection.commit()
+            except sqlite3.Error as e:
+                self._connection.rollback()
+                self.logger.error(f"Error writing response cache entry: {e}")
+
+    def _evict(self):
+        """
+        Drop least recently used entries until the cache is under 90% of its limit.
+        Caller must hold the lock.
+        """
+        target = int(self.max_bytes * 0.9)
+        rows = self._connection.execute("SELECT key, size FROM responses ORDER BY last_access")
+
+        evicted_keys = []
+        for key, size in rows:
+            if self._size <= target:
+                break
+            evicted_keys.append((key,))
+            self._size -= size
+
+        self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted_keys)
+        self.evictions += len(evicted_keys)
+        self.logger.debug(f"Response cache evicted {len(evicted_keys)} entries")
+
+    def clear(self):
+        """
+        Remove every cached response.
+        """
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+            self._size = 0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get response cache statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+
+            return {
+                'replay': self.replay,
+                'entries': entries,
+                'size_mb': round(self._size / (1024 * 1024), 2),
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0.0,
+                'writes': self.writes,
+                'evictions': self.evictions
+            }
+
+    def close(self):
+        """
+        Close the cache database.
+        """
+        with self._lock:
+            self._connection.close()
+
+def create_response_cache(config: Dict[str, Any], logger: logging.Logger) -> Optional[ResponseCache]:
+    """
+    Build the response cache described by config['cache'].
+
+    Args:
+        config: Configuration dictionary
+        logger: Logger instance
+
+    Returns:
+        ResponseCache instance, or None if the cache is disabled
+    """
+    settings = config.get('cache', {})
+    if not settings.get('enabled') and not settings.get('replay'):
+        return None
+
+    return ResponseCache(
+        settings.get('dir', 'api_cache'),
+        logger,
+        ttl_by_endpoint=settings.get('ttl', {}),
+        default_ttl=settings.get('default_ttl', 3600),
+        max_size_mb=settings.get('max_size_mb', 500),
+        replay=settings.get('replay', False)
+    )
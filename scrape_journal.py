@@ -0,0 +1,292 @@
+"""
+Scrape journal module for the scraper system.
+Append-only SQLite (WAL) journal of completed work, used to resume interrupted runs.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+class ScrapeJournal:
+    """
+    Durable local record of what a scraper run has already done.
+
+    Each scraper ('precios', 'unified') has at most one open run. Starting a
+    run resumes the open one if the previous process stopped before
+    finish_run; rows are only ever appended, so a crash can lose at most the
+    entry being written.
+    """
+
+    def __init__(self, path: str, logger: logging.Logger):
+        """
+        Open (or create) the journal.
+
+        Args:
+            path: SQLite file path
+            logger: Logger instance
+        """
+        self.path = path
+        self.logger = logger
+        self.run_id: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                scraper TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS eans (
+                run_id TEXT NOT NULL,
+                ean TEXT NOT NULL,
+                prices INTEGER NOT NULL,
+                recorded_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_eans_run ON eans (run_id);
+            CREATE TABLE IF NOT EXISTS pages (
+                run_id TEXT NOT NULL,
+                term TEXT NOT NULL,
+                page_offset INTEGER NOT NULL,
+                products INTEGER NOT NULL,
+                new_products INTEGER NOT NULL,
+                inserted INTEGER NOT NULL DEFAULT 0,
+                recorded_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_pages_run ON pages (run_id);
+            CREATE TABLE IF NOT EXISTS terms (
+                run_id TEXT NOT NULL,
+                term TEXT NOT NULL,
+                products_found INTEGER NOT NULL,
+                pages_searched INTEGER NOT NULL,
+                recorded_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_terms_run ON terms (run_id);
+        """)
+        # Journals created before pages.inserted existed
+        page_columns = {row[1] for row in self._connection.execute("PRAGMA table_info(pages)")}
+        if 'inserted' not in page_columns:
+            self._connection.execute("ALTER TABLE pages ADD COLUMN inserted INTEGER NOT NULL DEFAULT 0")
+        self._connection.commit()
+
+    def _write(self, sql: str, rows: List[Tuple]):
+        """
+        Append rows in one transaction.
+
+        Args:
+            sql: INSERT statement
+            rows: Parameter tuples
+        """
+        if not rows:
+            return
+        with self._lock:
+            try:
+                self._connection.executemany(sql, rows)
+                self._connection.commit()
+            except sqlite3.Error as e:
+                self._connection.rollback()
+                self.logger.error(f"Error writing scrape journal: {e}")
+
+    def start_run(self, scraper: str, fresh: bool = False) -> bool:
+        """
+        Resume the open run of a scraper, or start a new one.
+
+        Args:
+            scraper: Scraper name
+            fresh: Close any open run and start from scratch
+
+        Returns:
+            True if an interrupted run was resumed
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT run_id FROM runs WHERE scraper = ? AND finished_at IS NULL "
+                "ORDER BY started_at DESC LIMIT 1", (scraper,)
+            ).fetchone()
+
+            if row and not fresh:
+                self.run_id = row[0]
+                return True
+
+            now = time.time()
+            if row:
+                self._connection.execute(
+                    "UPDATE runs SET finished_at = ? WHERE scraper = ? AND finished_at IS NULL", (now, scraper)
+                )
+            self.run_id = f"{scraper}-{time.strftime('%Y%m%d_%H%M%S')}-{uuid.uuid4().hex[:6]}"
+            self._connection.execute(
+                "INSERT INTO runs (run_id, scraper, started_at) VALUES (?, ?, ?)", (self.run_id, scraper, now)
+            )
+            self._connection.commit()
+            return False
+
+    def finish_run(self):
+        """
+        Mark the current run as completed; the next start_run begins a new one.
+        """
+        if self.run_id is None:
+            return
+        with self._lock:
+            self._connection.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), self.run_id))
+            self._connection.commit()
+        self.run_id = None
+
+    def record_eans(self, results: Dict[str, int]):
+        """
+        Record EANs whose prices are safely stored.
+
+        Args:
+            results: Prices saved per EAN
+        """
+        now = time.time()
+        self._write("INSERT INTO eans (run_id, ean, prices, recorded_at) VALUES (?, ?, ?, ?)",
+                    [(self.run_id, ean, prices, now) for ean, prices in results.items()])
+
+    def completed_eans(self) -> Set[str]:
+        """
+        Get the EANs already completed in the current run.
+
+        Returns:
+            Set of EANs
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT ean FROM eans WHERE run_id = ?", (self.run_id,)).fetchall()
+        return {row[0] for row in rows}
+
+    def count_eans_since(self, scraper: str, since: float) -> int:
+        """
+        Count EANs completed by any run of a scraper since a point in time.
+        
+        Args:
+            scraper: Scraper name
+            since: Unix timestamp
+            
+        Returns:
+            Number of EANs recorded
+        """
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM eans JOIN runs ON runs.run_id = eans.run_id "
+                "WHERE runs.scraper = ? AND eans.recorded_at >= ?", (scraper, since)
+            ).fetchone()[0]
+    
+    def record_page(self, term: str, offset: int, products: int, new_products: int, inserted: int):
+        """
+        Record a processed search page.
+
+        Args:
+            term: Search term
+            offset: Page offset
+            products: Products on the page
+            new_products: Products added or updated from the page
+            inserted: Products from the page that were new to the database
+        """
+        self._write("INSERT INTO pages (run_id, term, page_offset, products, new_products, inserted, recorded_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(self.run_id, term, offset, products, new_products, inserted, time.time())])
+
+    def record_term(self, term: str, products_found: int, pages_searched: int):
+        """
+        Record a finished search term.
+
+        Args:
+            term: Search term
+            products_found: Products found with the term
+            pages_searched: Pages searched with the term
+        """
+        self._write("INSERT INTO terms (run_id, term, products_found, pages_searched, recorded_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(self.run_id, term, products_found, pages_searched, time.time())])
+
+    def completed_terms(self) -> List[Dict[str, Any]]:
+        """
+        Get the terms finished in the current run, in completion order.
+
+        Returns:
+            List of dictionaries with term, products_found and pages_searched
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT term, products_found, pages_searched FROM terms WHERE run_id = ? ORDER BY rowid",
+                (self.run_id,)
+            ).fetchall()
+        return [{'term': term, 'products_found': found, 'pages_searched': pages} for term, found, pages in rows]
+
+    def term_progress(self, term: str) -> Optional[Dict[str, int]]:
+        """
+        Get the progress of a term that was interrupted mid-pagination.
+
+        Args:
+            term: Search term
+
+        Returns:
+            Dictionary with last_offset (offset of the last recorded page),
+            last_page_products, products_found (added or updated),
+            new_products (inserted) and pages_searched,
+            or None if no page of the term was recorded
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT MAX(page_offset), SUM(new_products), COUNT(*), SUM(inserted) "
+                "FROM pages WHERE run_id = ? AND term = ?",
+                (self.run_id, term)
+            ).fetchone()
+            last_page = self._connection.execute(
+                "SELECT products FROM pages WHERE run_id = ? AND term = ? ORDER BY rowid DESC LIMIT 1",
+                (self.run_id, term)
+            ).fetchone()
+
+        if not row or row[2] == 0:
+            return None
+        return {
+            'last_offset': row[0],
+            'last_page_products': last_page[0],
+            'products_found': row[1],
+            'new_products': row[3],
+            'pages_searched': row[2]
+        }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get counts recorded for the current run.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._lock:
+            counts = {
+                table: self._connection.execute(
+                    f"SELECT COUNT(*) FROM {table} WHERE run_id = ?", (self.run_id,)
+                ).fetchone()[0]
+                for table in ('eans', 'pages', 'terms')
+            }
+        return {'run_id': self.run_id, **counts}
+
+    def close(self):
+        """
+        Close the journal.
+        """
+        with self._lock:
+            self._connection.close()
+
+def open_journal(config: Dict[str, Any], logger: logging.Logger) -> Optional[ScrapeJournal]:
+    """
+    Open the journal described by config['journal'].
+
+    Args:
+        config: Configuration dictionary
+        logger: Logger instance
+
+    Returns:
+        ScrapeJournal instance, or None if the journal is disabled
+    """
+    settings = config.get('journal', {})
+    if not settings.get('enabled', False):
+        return None
+    return ScrapeJournal(settings.get('path', 'scrape_journal.sqlite'), logger)
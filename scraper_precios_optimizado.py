@@ -2,26 +2,37 @@ import requests
 import pandas as pd
 import time
 import os
-from datetime import datetime
-from typing import Dict, List, Any
+import asyncio
+import itertools
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Tuple, Optional
 import logging
 
 # Import database components
 from config import get_config
-from price_manager import PriceManager
+from price_manager import PriceManager, PriceWriteBuffer
+from price_backup import PriceBackupSink
+from pipeline import PipelineStage
+from refresh_leases import RefreshLeaseManager
+from refresh_scheduler import RefreshScheduler
+from scrape_journal import open_journal
+from rate_limiter import get_shared_rate_limiter
 from utils import setup_logging, format_number
 
 # --- Configuración ---
 PRODUCTOS_FILE = "base_de_productos_rosario.xlsx"
-PRECIOS_FILE = "precios_obtenidos_rosario.xlsx"
-PRODUCTO_API_URL = "https://d3e6htiiul5ek9.cloudfront.net/prod/producto"
+# La URL de la API sale de config['api']['product_detail_url']
 
 # --- STRING DE SUCURSALES (MANTENER TODAS PARA MÁXIMA COBERTURA) ---
 ARRAY_SUCURSALES_ROSARIO = "2002-1-38,22-1-31,22-1-3,2002-1-67,22-1-17,22-1-20,12-1-97,22-1-18,12-1-99,22-1-6,23-1-6260,22-1-16,22-1-24,22-1-1,10-1-268,10-1-33,23-1-6262,10-1-32,2002-1-101,12-1-95,12-1-165,23-1-6256,22-1-26,2002-1-166,2002-1-6,9-3-5218,10-1-41,16-1-1202,23-1-6264,22-1-5"
 
 # --- Configuración optimizada ---
-SLEEP_TIME = 1.0
-BATCH_SAVE_SIZE = 50  # Guardar más frecuentemente
+# El ritmo de requests lo define el rate limiter compartido (ver config['api']['rate_limit'])
+BATCH_SAVE_SIZE = 50  # Precios acumulados antes de escribir un lote en BD
+MAX_BATCH_AGE = 30.0  # Segundos máximos que un precio espera en el buffer
 MAX_RETRIES = 3
 TIMEOUT = 15
 
@@ -63,28 +74,61 @@ class OptimizedPriceScraper:
     """
     
     def __init__(self):
+        # Initialize database components
+        self.config = get_config()
+        
+        # Máximo de requests simultáneos en modo async
+        self.max_concurrent_requests = max(1, self.config['search']['max_concurrent_requests'])
+        
         self.session = requests.Session()
         self.session.headers.update(HEADERS)
+        # El pool de conexiones debe alcanzar para todos los requests en vuelo
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.max_concurrent_requests,
+            pool_maxsize=self.max_concurrent_requests
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Rate limiter adaptativo compartido con el resto de los clientes de la API
+        self.rate_limiter = get_shared_rate_limiter(self.config)
         
-        # Initialize database components
-        self.config = get_config()
         self.logger = setup_logging({'level': 'INFO'})
         self.price_manager = PriceManager(self.config, self.logger)
         
+        # Buffer de escritura diferida y backup append-only (se crean al iniciar cada ejecución)
+        self.buffer_precios = None
+        self.backup_precios = None
+        
+        # Estadísticas por etapa de la última ejecución (descarga, parseo, escritura)
+        self.stats_etapas: List[Dict[str, Any]] = []
+        
+        # Plan de la última ejecución programada (--scheduled)
+        self.stats_planificador: Dict[str, Any] = {}
+        
+        # Journal local de EANs completados para reanudar una ejecución interrumpida
+        self.journal = open_journal(self.config, self.logger)
+        
         self.stats = {
             'productos_procesados': 0,
             'productos_con_precios': 0,
             'total_precios_encontrados': 0,
+            'productos_fallidos': 0,
             'errores': 0,
             'banderas_unicas': set(),
             'inicio': datetime.now()
         }
+        # Protege los contadores cuando los requests corren en varios hilos
+        self._stats_lock = threading.Lock()
         
         # Test database connection (no need to load caches since we use EAN directly)
         if not self.price_manager.test_database_connection():
             raise Exception("Cannot connect to database")
         
         self.logger.info("✅ Database connection established - ready to insert prices")
+        
+        # Particiones mensuales del historial de precios para este mes y los próximos
+        self.price_manager.ensure_history_partitions()
     
     def procesar_respuesta_optimizada(self, data: Dict[str, Any], ean: str) -> List[Dict[str, Any]]:
         """
@@ -142,11 +186,12 @@ class OptimizedPriceScraper:
             }
             
             precios_por_bandera[bandera] = precio_info
-            self.stats['banderas_unicas'].add(bandera)
+            with self._stats_lock:
+                self.stats['banderas_unicas'].add(bandera)
         
         return list(precios_por_bandera.values())
     
-    def obtener_precios_producto(self, ean: str) -> List[Dict[str, Any]]:
+    def obtener_precios_producto(self, ean: str) -> Optional[List[Dict[str, Any]]]:
         """
         Obtiene precios para un producto específico con reintentos y manejo de errores.
         
@@ -154,7 +199,42 @@ class OptimizedPriceScraper:
             ean: EAN del producto
             
         Returns:
-            Lista de precios del producto
+            Lista de precios del producto (vacía si la API no tiene precios),
+            o None si la descarga o el parseo fallaron
+        """
+        return self._parsear_respuesta(self._descargar_respuesta(ean), ean)
+    
+    def _parsear_respuesta(self, data: Optional[Dict[str, Any]], ean: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Parsea la respuesta de la API de un producto sin propagar errores.
+        
+        Args:
+            data: Respuesta JSON, o None si la descarga falló
+            ean: EAN del producto
+            
+        Returns:
+            Lista de precios del producto, o None si no hubo respuesta o no se pudo parsear
+        """
+        if data is None:
+            return None
+        
+        try:
+            return self.procesar_respuesta_optimizada(data, ean)
+        except Exception as e:
+            logger.error(f"Error procesando respuesta para EAN {ean}: {e}")
+            with self._stats_lock:
+                self.stats['errores'] += 1
+            return None
+    
+    def _descargar_respuesta(self, ean: str) -> Optional[Dict[str, Any]]:
+        """
+        Descarga la respuesta de la API para un producto, con reintentos.
+        
+        Args:
+            ean: EAN del producto
+            
+        Returns:
+            Respuesta JSON de la API, o None si falló
         """
         params = {
             'id_producto': ean,
@@ -163,15 +243,28 @@ class OptimizedPriceScraper:
         
         for intento in range(MAX_RETRIES):
             try:
+                self.rate_limiter.acquire()
                 response = self.session.get(
-                    PRODUCTO_API_URL, 
+                    self.config['api']['product_detail_url'], 
                     params=params, 
                     timeout=TIMEOUT
                 )
+                
+                # 429/5xx: bajar el ritmo de todos los clientes que comparten el limiter
+                # y reintentar; la pausa la impone el limiter en el próximo acquire
+                if response.status_code == 429 or response.status_code >= 500:
+                    if response.status_code == 429:
+                        self.rate_limiter.on_throttle(int(response.headers.get('Retry-After', 60)))
+                    else:
+                        self.rate_limiter.on_throttle()
+                    logger.warning(f"Intento {intento + 1}/{MAX_RETRIES}: HTTP {response.status_code} para EAN {ean}")
+                    continue
+                
                 response.raise_for_status()
                 data = response.json()
+                self.rate_limiter.on_success()
                 
-                return self.procesar_respuesta_optimizada(data, ean)
+                return data
                 
             except requests.exceptions.RequestException as e:
                 logger.warning(f"Intento {intento + 1}/{MAX_RETRIES} falló para EAN {ean}: {e}")
@@ -179,15 +272,21 @@ class OptimizedPriceScraper:
                     time.sleep(2 ** intento)  # Backoff exponencial
                 else:
                     logger.error(f"Error final para EAN {ean}: {e}")
-                    self.stats['errores'] += 1
-                    return []
+                    with self._stats_lock:
+                        self.stats['errores'] += 1
+                    return None
             
             except Exception as e:
                 logger.error(f"Error inesperado para EAN {ean}: {e}")
-                self.stats['errores'] += 1
-                return []
+                with self._stats_lock:
+                    self.stats['errores'] += 1
+                return None
         
-        return []
+        # Todos los intentos terminaron en 429/5xx
+        logger.error(f"Error final para EAN {ean}: la API siguió respondiendo con error")
+        with self._stats_lock:
+            self.stats['errores'] += 1
+        return None
     
     def cargar_productos_desde_bd(self) -> List[str]:
         """
@@ -227,21 +326,35 @@ class OptimizedPriceScraper:
             print(f"❌ Error cargando productos desde Excel: {e}")
             return []
     
-    def cargar_datos_existentes(self) -> tuple[int, set]:
+    def cargar_datos_existentes(self, horas_vigencia: float) -> tuple[int, set]:
         """
         Carga información de precios existentes desde la base de datos.
         
+        Args:
+            horas_vigencia: Antigüedad máxima (en horas) para considerar vigente un precio
+            
         Returns:
-            Tupla con (total_precios_existentes, set_eans_con_precios)
+            Tupla con (total_precios_existentes, set_eans_con_precios_vigentes)
         """
         try:
             # Get current price count from database
             total_precios = self.price_manager.get_price_count()
             print(f"💾 Base de datos contiene {format_number(total_precios)} precios existentes")
             
-            # For now, return empty set of processed EANs to allow reprocessing
-            # This maintains the current logic of updating existing prices
-            return total_precios, set()
+            # Última actualización por producto (una sola consulta)
+            ultimas_fechas = self.price_manager.get_latest_price_dates()
+            limite = datetime.now(timezone.utc) - timedelta(hours=horas_vigencia)
+            
+            eans_vigentes = set()
+            for ean, fecha in ultimas_fechas.items():
+                # Fechas sin zona horaria se interpretan como hora local
+                if fecha.tzinfo is None:
+                    fecha = fecha.astimezone()
+                if fecha >= limite:
+                    eans_vigentes.add(ean)
+            
+            print(f"🕒 {format_number(len(eans_vigentes))} productos con precios de menos de {horas_vigencia:g}h")
+            return total_precios, eans_vigentes
             
         except Exception as e:
             print(f"❌ Error cargando datos existentes desde base de datos: {e}")
@@ -258,43 +371,23 @@ class OptimizedPriceScraper:
             return
         
         try:
-            # Save prices to database using batch operation
-            inserted, updated, skipped = self.price_manager.batch_save_prices(lista_precios)
-            
-            self.logger.info(f"Precios guardados en BD: {inserted} insertados, {updated} actualizados, {skipped} omitidos")
+            if self.buffer_precios is not None:
+                # Escritura diferida: el hilo escritor guarda por lotes
+                self.buffer_precios.add(lista_precios)
+            else:
+                # Save prices to database using batch operation
+                inserted, updated, skipped = self.price_manager.batch_save_prices(lista_precios)
+                self.logger.info(f"Precios guardados en BD: {inserted} insertados, {updated} actualizados, {skipped} omitidos")
+                if skipped < len(lista_precios):
+                    self._registrar_en_journal(lista_precios)
             
-            # Also save to Excel for backup (optional)
-            self.guardar_progreso_excel(lista_precios)
+            # Backup local append-only (opcional)
+            if self.backup_precios is not None:
+                self.backup_precios.append(lista_precios)
             
         except Exception as e:
             self.logger.error(f"Error guardando precios en base de datos: {e}")
     
-    def guardar_progreso_excel(self, lista_precios: List[Dict]):
-        """
-        Guarda el progreso actual en el archivo Excel (backup).
-        
-        Args:
-            lista_precios: Lista completa de precios a guardar
-        """
-        if not lista_precios:
-            return
-        
-        try:
-            df = pd.DataFrame(lista_precios)
-            
-            # Eliminar duplicados completos
-            df.drop_duplicates(inplace=True)
-            
-            # Ordenar por EAN y bandera para mejor organización
-            df.sort_values(['ean', 'bandera'], inplace=True)
-            
-            # Guardar en Excel como backup
-            df.to_excel(PRECIOS_FILE, index=False, engine='openpyxl')
-            self.logger.debug(f"Backup Excel guardado: {len(df)} registros en {PRECIOS_FILE}")
-            
-        except Exception as e:
-            self.logger.error(f"Error guardando backup Excel: {e}")
-    
     def mostrar_estadisticas(self):
         """
         Muestra estadísticas del proceso de scraping.
@@ -308,9 +401,32 @@ class OptimizedPriceScraper:
         logger.info(f"Productos procesados: {self.stats['productos_procesados']}")
         logger.info(f"Productos con precios: {self.stats['productos_con_precios']}")
         logger.info(f"Total precios encontrados: {self.stats['total_precios_encontrados']}")
+        logger.info(f"Productos fallidos (se reintentan al retomar): {self.stats['productos_fallidos']}")
         logger.info(f"Errores: {self.stats['errores']}")
+        
+        limiter_stats = self.rate_limiter.get_statistics()
+        logger.info(f"Rate limit actual: {limiter_stats['current_rate']:.2f} req/s "
+                    f"(espera promedio {limiter_stats['avg_wait_time']:.2f}s, "
+                    f"{limiter_stats['throttle_events']} respuestas 429/5xx)")
         logger.info(f"Banderas únicas encontradas: {len(self.stats['banderas_unicas'])}")
         
+        if self.stats_etapas:
+            logger.info("Etapas:")
+            for etapa in self.stats_etapas:
+                logger.info(f"  - {etapa['name']}: {etapa['processed']} items ({etapa['items_per_second']:.1f}/s), "
+                            f"{etapa['workers']} hilos, utilización {etapa['utilization']:.0f}%, "
+                            f"cola {etapa['queue_depth']} (máx {etapa['max_queue_depth']}/{etapa['queue_size']})")
+        
+        if self.stats_planificador:
+            plan = self.stats_planificador
+            logger.info(f"Planificador: {plan['selected']}/{plan['candidates']} productos "
+                        f"(presupuesto {plan['budget']} de {plan['daily_budget']} diarios)")
+            logger.info(f"  - Precios desactualizados esperados: {plan['expected_stale_before']:.1f}% -> "
+                        f"{plan['expected_stale_after']:.1f}% "
+                        f"(más viejos primero: {plan['expected_stale_after_oldest_first']:.1f}%)")
+            for punto in plan['reduction_curve']:
+                logger.info(f"  - Con {punto['budget']} requests: {punto['expected_stale_after']:.1f}%")
+        
         if self.stats['banderas_unicas']:
             logger.info("Supermercados encontrados:")
             for bandera in sorted(self.stats['banderas_unicas']):
@@ -326,13 +442,213 @@ class OptimizedPriceScraper:
         
         logger.info("=" * 60)
     
-    def ejecutar_scraping_completo(self, limite_productos: int = None, forzar_actualizacion: bool = False):
+    def _registrar_resultado(self, posicion: int, total: int, ean: str,
+                             precios_producto: Optional[List[Dict[str, Any]]]):
+        """
+        Actualiza estadísticas, muestra el progreso y guarda los precios de un producto.
+        Compartido por los modos secuencial, async y pipeline.
+        
+        Args:
+            posicion: Número de productos procesados en la sesión (incluyendo este)
+            total: Total de productos a procesar en la sesión
+            ean: EAN del producto
+            precios_producto: Precios obtenidos para el producto, o None si la
+                              descarga falló (no se registra en el journal)
+        """
+        with self._stats_lock:
+            self.stats['productos_procesados'] += 1
+            if precios_producto is None:
+                self.stats['productos_fallidos'] += 1
+            elif precios_producto:
+                self.stats['productos_con_precios'] += 1
+                self.stats['total_precios_encontrados'] += len(precios_producto)
+        
+        if precios_producto is None:
+            # Sin respuesta: no se registra en el journal, así se reintenta al retomar
+            print(f"   ⚠️ EAN {ean}: Falló la descarga")
+        elif precios_producto:
+            # Mostrar supermercados encontrados
+            supermercados = [p['bandera'] for p in precios_producto]
+            print(f"   ✅ EAN {ean}: {len(precios_producto)} precios guardados ({', '.join(supermercados)})")
+            
+            # Encolar para guardar en base de datos
+            self.guardar_precios_en_bd(precios_producto)
+        else:
+            print(f"   ❌ EAN {ean}: Sin precios disponibles")
+            # La API respondió sin precios: no hay nada que esperar del buffer, ya está completo
+            if self._journal_activo():
+                self.journal.record_eans({ean: 0})
+        
+        # Mostrar progreso cada 10 productos
+        if posicion % 10 == 0:
+            db_stats = self.price_manager.get_operation_stats()
+            print(f"\n📊 Progreso: {posicion}/{total} productos | {db_stats['precios_insertados']} precios guardados")
+    
+    def _journal_activo(self) -> bool:
+        """
+        Indica si hay una ejecución abierta en el journal.
+        
+        Returns:
+            True si los EANs completados deben registrarse
+        """
+        return self.journal is not None and self.journal.run_id is not None
+    
+    def _registrar_en_journal(self, lote: List[Dict[str, Any]]):
+        """
+        Registra en el journal los EANs de un lote ya guardado en la base.
+        Se llama desde los hilos escritores del buffer.
+        
+        Args:
+            lote: Precios guardados
+        """
+        if not self._journal_activo():
+            return
+        
+        precios_por_ean: Dict[str, int] = {}
+        for precio in lote:
+            precios_por_ean[precio['ean']] = precios_por_ean.get(precio['ean'], 0) + 1
+        self.journal.record_eans(precios_por_ean)
+    
+    def _procesar_secuencial(self, eans_pendientes: List[str], detener: Optional[threading.Event] = None):
+        """
+        Procesa los productos de a uno.
+        
+        Args:
+            eans_pendientes: EANs a procesar
+            detener: Si se activa, se deja de tomar productos nuevos
+        """
+        for i, ean in enumerate(eans_pendientes):
+            if detener is not None and detener.is_set():
+                return
+            print(f"\n📦 Procesando {i+1}/{len(eans_pendientes)}: EAN {ean}")
+            
+            precios_producto = self.obtener_precios_producto(ean)
+            self._registrar_resultado(i + 1, len(eans_pendientes), ean, precios_producto)
+    
+    async def _procesar_async(self, eans_pendientes: List[str], detener: Optional[threading.Event] = None):
+        """
+        Procesa los productos manteniendo hasta `max_concurrent_requests` requests en vuelo.
+        Los requests corren en un pool de hilos que comparte la sesión HTTP y el
+        rate limiter; los resultados se registran y guardan de a uno en el event loop.
+        
+        Args:
+            eans_pendientes: EANs a procesar
+            detener: Si se activa, se cancelan los requests que no empezaron
+        """
+        loop = asyncio.get_running_loop()
+        semaforo = asyncio.Semaphore(self.max_concurrent_requests)
+        
+        async def obtener(ean: str) -> Optional[Tuple[str, Optional[List[Dict[str, Any]]]]]:
+            async with semaforo:
+                if detener is not None and detener.is_set():
+                    return None
+                precios = await loop.run_in_executor(executor, self.obtener_precios_producto, ean)
+                return ean, precios
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_requests,
+                                thread_name_prefix='precios') as executor:
+            tareas = [asyncio.ensure_future(obtener(ean)) for ean in eans_pendientes]
+            try:
+                for posicion, tarea in enumerate(asyncio.as_completed(tareas), 1):
+                    resultado = await tarea
+                    if resultado is None:
+                        # Descartado por `detener`: no se registra como procesado
+                        continue
+                    ean, precios_producto = resultado
+                    self._registrar_resultado(posicion, len(eans_pendientes), ean, precios_producto)
+            finally:
+                for tarea in tareas:
+                    tarea.cancel()
+    
+    def _procesar_pipeline(self, eans_pendientes: List[str], detener: Optional[threading.Event] = None):
+        """
+        Procesa los productos en etapas conectadas por colas acotadas:
+        descarga (max_concurrent_requests hilos) -> parseo (parse_workers hilos)
+        -> escritura (el buffer de precios, con write_workers escritores).
+        Si la base se atrasa, el buffer bloquea al parseo y la cola llena
+        del parseo frena la descarga.
+        
+        Args:
+            eans_pendientes: EANs a procesar
+            detener: Si se activa, se deja de encolar y se descarta lo pendiente
+        """
+        opciones = self.config['prices'].get('pipeline', {})
+        tamano_cola = opciones.get('queue_size', 100)
+        posiciones = itertools.count(1)
+        total = len(eans_pendientes)
+        
+        def parsear(item: Tuple[str, Optional[Dict[str, Any]]]):
+            ean, data = item
+            self._registrar_resultado(next(posiciones), total, ean, self._parsear_respuesta(data, ean))
+        
+        parseo = PipelineStage('parseo', parsear, self.logger,
+                               workers=opciones.get('parse_workers', 2), queue_size=tamano_cola)
+        descarga = PipelineStage('descarga', lambda ean: (ean, self._descargar_respuesta(ean)), self.logger,
+                                 workers=self.max_concurrent_requests, queue_size=tamano_cola,
+                                 output=parseo.put)
+        
+        completo = False
+        try:
+            for ean in eans_pendientes:
+                if detener is not None and detener.is_set():
+                    return
+                descarga.put(ean)
+            descarga.close()
+            parseo.close()
+            completo = True
+        finally:
+            if not completo:
+                # Interrumpido: descartar lo pendiente de descargar y parsear lo ya descargado
+                descarga.cancel()
+                parseo.close()
+            self.stats_etapas = [descarga.get_statistics(), parseo.get_statistics()]
+    
+    def cerrar(self):
+        """
+        Cierra el journal. Una ejecución sin finish_run queda para retomarse.
+        """
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+    
+    def _manejar_sigterm(self, signum, frame):
+        """
+        Convierte SIGTERM en KeyboardInterrupt para cerrar igual que con Ctrl+C.
+        
+        Args:
+            signum: Número de señal
+            frame: Frame actual
+        """
+        logger.info(f"Señal {signum} recibida, finalizando...")
+        raise KeyboardInterrupt
+    
+    def ejecutar_scraping_completo(self, limite_productos: int = None, forzar_actualizacion: bool = False,
+                                   usar_async: bool = False, horas_vigencia: float = None,
+                                   usar_pipeline: bool = False, empezar_de_cero: bool = False,
+                                   usar_planificador: bool = False, presupuesto: int = None):
         """
         Ejecuta el scraping completo de precios con todas las optimizaciones.
+        Si la ejecución anterior se interrumpió, la retoma salteando los EANs que
+        el journal registra como completados.
+        
+        En modo planificado, en lugar de la ventana de vigencia se actualizan los
+        productos con más probabilidad de tener un precio desactualizado (según
+        su frecuencia de cambio y su demanda en carritos) hasta agotar el
+        presupuesto diario de requests (ver refresh_scheduler.py).
         
         Args:
             limite_productos: Límite de productos a procesar (None = todos)
-            forzar_actualizacion: Si True, reprocesa productos ya existentes
+            forzar_actualizacion: Si True, reprocesa también productos con precios vigentes
+            usar_async: Si True, procesa varios productos en paralelo
+                        (hasta search.max_concurrent_requests)
+            horas_vigencia: Antigüedad máxima de un precio vigente
+                            (None = config['prices']['staleness_hours'])
+            usar_pipeline: Si True, descarga, parseo y escritura corren en etapas
+                           paralelas (ver config['prices']['pipeline'])
+            empezar_de_cero: Si True, ignora la ejecución interrumpida del journal
+            usar_planificador: Si True, elige los productos con el planificador
+            presupuesto: Requests a gastar en modo planificado
+                         (None = lo que queda del presupuesto diario)
         """
         print("🚀 Iniciando scraping optimizado de precios...")
         
@@ -343,66 +659,217 @@ class OptimizedPriceScraper:
             print("❌ No se pudieron cargar productos")
             return
         
+        # Retomar la ejecución interrumpida, si la hay
+        if self.journal is not None and self.journal.start_run('precios', fresh=empezar_de_cero):
+            completados = self.journal.completed_eans()
+            eans_a_procesar = [ean for ean in eans_a_procesar if ean not in completados]
+            logger.info(f"Reanudando ejecución {self.journal.run_id}: "
+                        f"{len(completados)} productos ya completados omitidos")
+        
+        if usar_planificador:
+            planificador = RefreshScheduler(self.config, self.logger, self.price_manager, self.journal)
+            planificador.load_signals()
+            eans_pendientes = planificador.plan(eans_a_procesar, presupuesto)
+            self.stats_planificador = planificador.get_statistics()
+            logger.info(f"Planificador: {len(eans_pendientes)} productos elegidos de {len(eans_a_procesar)}")
+        else:
+            eans_pendientes = self._filtrar_pendientes(eans_a_procesar, forzar_actualizacion, horas_vigencia)
+        
         # Aplicar límite si se especifica
         if limite_productos:
-            eans_a_procesar = eans_a_procesar[:limite_productos]
+            eans_pendientes = eans_pendientes[:limite_productos]
             logger.info(f"Limitando a {limite_productos} productos")
         
-        # Cargar datos existentes desde base de datos
-        total_precios_existentes, eans_procesados = self.cargar_datos_existentes()
-        
-        # Para mantener la lógica actual, procesamos todos los productos
-        # La base de datos se encarga de actualizar precios existentes
-        eans_pendientes = eans_a_procesar
-        logger.info(f"Procesando {len(eans_pendientes)} productos (actualizando precios existentes)")
-        
         if not eans_pendientes:
             logger.info("No hay productos para procesar.")
+            if self.journal is not None:
+                self.journal.finish_run()
             self.mostrar_estadisticas()
             return
         
-        # Procesar productos
-        productos_procesados_en_sesion = 0
-        precios_batch = []  # Batch para guardar en BD
+        if self._procesar_eans(eans_pendientes, usar_async, usar_pipeline) and self.journal is not None:
+            # Terminada: la próxima ejecución empieza de cero
+            self.journal.finish_run()
+    
+    def ejecutar_como_worker(self, run_id: str = None, forzar_actualizacion: bool = False,
+                             usar_async: bool = False, horas_vigencia: float = None,
+                             usar_pipeline: bool = False):
+        """
+        Ejecuta el scraping como uno de varios workers que comparten la base.
+        Los EANs se reparten en rangos (shards) mediante la tabla leases_precios:
+        cada worker toma un shard libre, lo procesa y toma el siguiente hasta que
+        no quedan. Si un worker muere, su shard vuelve a estar disponible cuando
+        vence el lease, y el filtro de vigencia evita reprocesar lo ya guardado.
         
-        try:
-            for i, ean in enumerate(eans_pendientes):
-                print(f"\n📦 Procesando {i+1}/{len(eans_pendientes)}: EAN {ean}")
-                
-                precios_producto = self.obtener_precios_producto(ean)
-                
-                self.stats['productos_procesados'] += 1
-                productos_procesados_en_sesion += 1
-                
-                if precios_producto:
-                    precios_batch.extend(precios_producto)
-                    self.stats['productos_con_precios'] += 1
-                    self.stats['total_precios_encontrados'] += len(precios_producto)
-                    
-                    # Mostrar supermercados encontrados
-                    supermercados = [p['bandera'] for p in precios_producto]
-                    print(f"   ✅ {len(precios_producto)} precios guardados ({', '.join(supermercados)})")
-                    
-                    # Guardar inmediatamente en base de datos
-                    self.guardar_precios_en_bd(precios_producto)
+        Args:
+            run_id: Identificador de la corrida compartido por los workers (None = fecha de hoy)
+            forzar_actualizacion: Si True, reprocesa también productos con precios vigentes
+            usar_async: Si True, procesa varios productos en paralelo
+            horas_vigencia: Antigüedad máxima de un precio vigente
+            usar_pipeline: Si True, usa el modo pipeline dentro de cada shard
+        """
+        leases = RefreshLeaseManager(self.config, self.logger, run_id=run_id)
+        print(f"👷 Worker {leases.worker_id} en la corrida {leases.run_id}")
+        
+        eans_a_procesar = sorted(set(self.cargar_productos_desde_bd()))
+        if not eans_a_procesar:
+            print("❌ No se pudieron cargar productos")
+            return
+        
+        leases.ensure_shards(eans_a_procesar)
+        shards_procesados = 0
+        
+        while True:
+            shard = leases.claim()
+            if shard is None:
+                break
+            
+            eans_shard = [ean for ean in eans_a_procesar if leases.in_shard(ean, shard)]
+            logger.info(f"Shard {shard['shard_id']}: {len(eans_shard)} productos "
+                        f"[{shard['ean_desde'] or '-'}, {shard['ean_hasta'] or '-'})")
+            eans_pendientes = self._filtrar_pendientes(eans_shard, forzar_actualizacion, horas_vigencia)
+            
+            procesados_inicio = self.stats['productos_procesados']
+            progreso = lambda: shard['procesados'] + self.stats['productos_procesados'] - procesados_inicio
+            leases.start_heartbeat(shard['shard_id'], progreso)
+            completado = False
+            lease_vigente = False
+            try:
+                completado = self._procesar_eans(eans_pendientes, usar_async, usar_pipeline,
+                                                 detener=leases.lease_lost) if eans_pendientes else True
+            finally:
+                leases.stop_heartbeat()
+                if completado:
+                    lease_vigente = leases.complete(shard['shard_id'], progreso())
                 else:
-                    print(f"   ❌ Sin precios disponibles")
-                
-                # Mostrar progreso cada 10 productos
-                if productos_procesados_en_sesion % 10 == 0:
-                    db_stats = self.price_manager.get_operation_stats()
-                    print(f"\n📊 Progreso: {productos_procesados_en_sesion}/{len(eans_pendientes)} productos | {db_stats['precios_insertados']} precios guardados")
-                
-                # Pausa entre requests
-                time.sleep(SLEEP_TIME)
+                    lease_vigente = leases.release(shard['shard_id'], progreso())
+            
+            if not lease_vigente:
+                # Otro worker tomó el shard: lo que falta lo termina él
+                logger.warning(f"Shard {shard['shard_id']}: el lease venció y lo tomó otro worker, "
+                               f"no se cuenta como procesado")
+                continue
+            if not completado:
+                logger.info(f"Shard {shard['shard_id']} liberado para que lo continúe otro worker")
+                break
+            shards_procesados += 1
+        
+        estado = leases.get_run_status()
+        logger.info(f"Worker {leases.worker_id}: {shards_procesados} shards procesados. Corrida {estado['run_id']}: "
+                    f"{estado['completado']} completados, {estado['en_proceso']} en proceso, "
+                    f"{estado['pendiente']} pendientes ({format_number(estado['procesados'])} productos)")
+    
+    def _filtrar_pendientes(self, eans_a_procesar: List[str], forzar_actualizacion: bool,
+                            horas_vigencia: float = None) -> List[str]:
+        """
+        Filtra los EANs que necesitan precio nuevo.
+        
+        Args:
+            eans_a_procesar: EANs candidatos
+            forzar_actualizacion: Si True, no se filtra nada
+            horas_vigencia: Antigüedad máxima de un precio vigente
+                            (None = config['prices']['staleness_hours'])
+            
+        Returns:
+            EANs sin precio o con precio vencido
+        """
+        if forzar_actualizacion:
+            # Reprocesar todo, sin mirar la antigüedad de los precios
+            eans_pendientes = eans_a_procesar
+            logger.info(f"Procesando {len(eans_pendientes)} productos (actualización forzada)")
+        else:
+            # Solo los productos sin precio o con precio más viejo que la ventana de vigencia
+            if horas_vigencia is None:
+                horas_vigencia = self.config['prices']['staleness_hours']
+            total_precios_existentes, eans_vigentes = self.cargar_datos_existentes(horas_vigencia)
+            # precios.producto_id es numérico: comparar sin ceros a la izquierda
+            eans_pendientes = [
+                ean for ean in eans_a_procesar
+                if (str(int(ean)) if ean.isdigit() else ean) not in eans_vigentes
+            ]
+            logger.info(f"Procesando {len(eans_pendientes)} productos "
+                        f"({len(eans_a_procesar) - len(eans_pendientes)} con precios vigentes omitidos)")
+        
+        return eans_pendientes
+    
+    def _procesar_eans(self, eans_pendientes: List[str], usar_async: bool = False,
+                       usar_pipeline: bool = False, detener: Optional[threading.Event] = None) -> bool:
+        """
+        Descarga y guarda los precios de una lista de EANs en el modo elegido,
+        vaciando el buffer de escritura y mostrando estadísticas al final.
+        
+        Args:
+            eans_pendientes: EANs a procesar
+            usar_async: Si True, procesa varios productos en paralelo
+            usar_pipeline: Si True, descarga, parseo y escritura corren en etapas paralelas
+            detener: Evento que corta el procesamiento (p. ej. el lease del shard se perdió)
+            
+        Returns:
+            True si se procesaron todos, False si el proceso fue interrumpido, detenido o falló
+        """
+        # Snapshot de últimos precios: solo se insertan los que cambiaron
+        # (se carga una vez por proceso; batch_save_prices lo mantiene al día)
+        if self.config['prices'].get('change_detection', False) and self.price_manager.price_snapshot is None:
+            self.price_manager.load_price_snapshot()
+        
+        # SIGTERM se trata igual que Ctrl+C para que el buffer se vacíe antes de salir
+        # (signal.signal solo puede llamarse desde el hilo principal)
+        en_hilo_principal = threading.current_thread() is threading.main_thread()
+        if en_hilo_principal:
+            handler_sigterm_anterior = signal.signal(signal.SIGTERM, self._manejar_sigterm)
+        self.stats_etapas = []
+        self.buffer_precios = PriceWriteBuffer(
+            self.price_manager, self.logger,
+            batch_size=BATCH_SAVE_SIZE, max_age=MAX_BATCH_AGE,
+            writers=self.config['prices'].get('pipeline', {}).get('write_workers', 1) if usar_pipeline else 1,
+            on_written=self._registrar_en_journal
+        )
+        self.backup_precios = PriceBackupSink(self.config['files']['prices_backup_dir'], self.logger)
+        completado = False
+        
+        try:
+            if usar_pipeline:
+                logger.info("Modo pipeline: descarga, parseo y escritura en paralelo")
+                self._procesar_pipeline(eans_pendientes, detener)
+            elif usar_async:
+                logger.info(f"Modo async: hasta {self.max_concurrent_requests} requests simultáneos")
+                asyncio.run(self._procesar_async(eans_pendientes, detener))
+            else:
+                self._procesar_secuencial(eans_pendientes, detener)
+            if detener is not None and detener.is_set():
+                logger.warning("Procesamiento detenido antes de terminar la lista de productos")
+            else:
+                completado = True
         
         except KeyboardInterrupt:
-            logger.info("Proceso interrumpido por el usuario. Los precios ya procesados están guardados en BD.")
+            logger.info("Proceso interrumpido por el usuario. Guardando los precios pendientes en BD...")
         
         except Exception as e:
             logger.error(f"Error durante el scraping: {e}")
         
         finally:
+            # Vaciar el buffer de escritura antes de reportar
+            self.buffer_precios.close()
+            stats_escritura = self.buffer_precios.get_statistics()
+            self.stats_etapas.append({
+                'name': 'escritura',
+                'workers': stats_escritura['writers'],
+                'processed': stats_escritura['rows_inserted'],
+                'items_per_second': stats_escritura['rows_per_second'],
+                'utilization': stats_escritura['utilization'],
+                'queue_depth': stats_escritura['pending'],
+                'max_queue_depth': stats_escritura['max_pending_seen'],
+                'queue_size': stats_escritura['max_pending']
+            })
+            self.buffer_precios = None
+            self.backup_precios.close()
+            backup_stats = self.backup_precios.get_statistics()
+            logger.info(f"Backup local: {backup_stats['rows_written']} precios en "
+                        f"{backup_stats['parts_written']} archivos (run {backup_stats['run_id']})")
+            self.backup_precios = None
+            if en_hilo_principal:
+                signal.signal(signal.SIGTERM, handler_sigterm_anterior)
+            
             # Mostrar estadísticas finales
             self.mostrar_estadisticas()
             
@@ -410,12 +877,15 @@ class OptimizedPriceScraper:
             db_stats = self.price_manager.get_operation_stats()
             logger.info("ESTADÍSTICAS DE BASE DE DATOS:")
             logger.info(f"  - Precios insertados: {db_stats['precios_insertados']}")
-            logger.info(f"  - Precios actualizados: {db_stats['precios_actualizados']}")
+            logger.info(f"  - Precios actualizados (valor distinto al anterior): {db_stats['precios_actualizados']}")
+            logger.info(f"  - Precios sin cambios (solo fecha actualizada): {db_stats['precios_sin_cambios']}")
             logger.info(f"  - Precios omitidos: {db_stats['precios_omitidos']}")
             logger.info(f"  - Productos no encontrados: {db_stats['productos_no_encontrados']}")
             logger.info(f"  - Supermercados no encontrados: {db_stats['supermercados_no_encontrados']}")
             
             logger.info("Scraping completado - Datos guardados en Supabase.")
+        
+        return completado
 
 
 def main():
@@ -427,26 +897,65 @@ def main():
     # Opciones de ejecución
     import sys
     
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--test":
-            # Modo test: solo 10 productos
-            scraper.ejecutar_scraping_completo(limite_productos=10)
-        elif sys.argv[1] == "--force":
-            # Forzar actualización completa
-            scraper.ejecutar_scraping_completo(forzar_actualizacion=True)
-        elif sys.argv[1].startswith("--limit="):
-            # Límite personalizado
-            limite = int(sys.argv[1].split("=")[1])
-            scraper.ejecutar_scraping_completo(limite_productos=limite)
+    argumentos = sys.argv[1:]
+    usar_async = '--async' in argumentos
+    usar_pipeline = '--pipeline' in argumentos
+    empezar_de_cero = '--fresh' in argumentos
+    usar_planificador = '--scheduled' in argumentos
+    horas_vigencia = None
+    run_id = None
+    presupuesto = None
+    for arg in argumentos:
+        if arg.startswith("--stale-hours="):
+            horas_vigencia = float(arg.split("=")[1])
+        elif arg.startswith("--run-id="):
+            run_id = arg.split("=", 1)[1]
+        elif arg.startswith("--budget="):
+            presupuesto = int(arg.split("=")[1])
+    argumentos = [arg for arg in argumentos
+                  if arg not in ('--async', '--pipeline', '--fresh', '--scheduled')
+                  and not arg.startswith("--stale-hours=") and not arg.startswith("--run-id=")
+                  and not arg.startswith("--budget=")]
+    opciones = {'usar_async': usar_async, 'usar_pipeline': usar_pipeline, 'horas_vigencia': horas_vigencia}
+    opciones_ejecucion = dict(opciones, empezar_de_cero=empezar_de_cero,
+                              usar_planificador=usar_planificador, presupuesto=presupuesto)
+    
+    try:
+        if argumentos:
+            if argumentos[0] == "--test":
+                # Modo test: solo 10 productos
+                scraper.ejecutar_scraping_completo(limite_productos=10, **opciones_ejecucion)
+            elif argumentos[0] == "--force":
+                # Forzar actualización completa
+                scraper.ejecutar_scraping_completo(forzar_actualizacion=True, **opciones_ejecucion)
+            elif argumentos[0] == "--worker":
+                # Uno de varios workers que se reparten los EANs por shards
+                scraper.ejecutar_como_worker(run_id=run_id, **opciones)
+            elif argumentos[0].startswith("--limit="):
+                # Límite personalizado
+                limite = int(argumentos[0].split("=")[1])
+                scraper.ejecutar_scraping_completo(limite_productos=limite, **opciones_ejecucion)
+            else:
+                print("Opciones disponibles:")
+                print("  --test          : Procesar solo 10 productos (modo prueba)")
+                print("  --force         : Forzar actualización completa")
+                print("  --limit=N       : Procesar solo N productos")
+                print("  --worker        : Procesar shards de EANs junto a otros workers (tabla leases_precios)")
+                print("  --run-id=ID     : Corrida compartida por los workers (default: fecha de hoy)")
+                print("  --async         : Procesar varios productos en paralelo (combinable)")
+                print("  --pipeline      : Descarga, parseo y escritura en etapas paralelas (combinable)")
+                print("  --stale-hours=H : Reprocesar precios con más de H horas (combinable)")
+                print("  --fresh         : No retomar la ejecución interrumpida (combinable)")
+                print("  --scheduled     : Gastar el presupuesto diario en los precios con más chance de")
+                print("                    estar desactualizados, según cambios y demanda (combinable)")
+                print("  --budget=N      : Requests a gastar con --scheduled (default: resto del día)")
+                print("  (sin parámetros): Procesar productos sin precio o con precio vencido")
         else:
-            print("Opciones disponibles:")
-            print("  --test          : Procesar solo 10 productos (modo prueba)")
-            print("  --force         : Forzar actualización completa")
-            print("  --limit=N       : Procesar solo N productos")
-            print("  (sin parámetros): Procesar productos pendientes")
-    else:
-        # Ejecución normal: solo productos pendientes
-        scraper.ejecutar_scraping_completo()
+            # Ejecución normal: solo productos sin precio o con precio vencido
+            scraper.ejecutar_scraping_completo(**opciones_ejecucion)
+    finally:
+        # Una ejecución sin finish_run queda en el journal para retomarse
+        scraper.cerrar()
 
 
 if __name__ == "__main__":
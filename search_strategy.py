@@ -4,12 +4,28 @@ Implements intelligent search algorithms and optimization.
 """
 
 import logging
+import math
+import re
 from typing import Dict, List, Any, Optional, Set, Tuple
 import random
 from collections import defaultdict, Counter
 
 from config import get_search_keywords, get_category_keywords, get_common_brands
-from utils import normalize_text, format_number
+from term_stats import open_term_stats
+from term_scheduler import TermScheduler
+from utils import normalize_text_cached, format_number
+
+# Expected new products per request assumed before any term has history
+DEFAULT_PRIOR_YIELD = 5.0
+
+# Floor of the observed yield: a mature catalog can have history with no new products at all
+MIN_PRIOR_YIELD = 0.01
+
+# Smallest Gamma shape sampled (gammavariate needs a positive shape)
+MIN_POSTERIOR_SHAPE = 1e-3
+
+# Relative growth of the UCB exploration factor sqrt(log(requests)) that triggers a re-score
+UCB_RESCORE_TOLERANCE = 0.05
 
 class SearchStrategy:
     """
@@ -31,6 +47,9 @@ class SearchStrategy:
         self.smart_keywords = get_search_keywords()
         self.category_keywords = get_category_keywords()
         self.common_brands = get_common_brands()
+        self._brand_pattern = re.compile(
+            '|'.join(re.escape(brand.lower()) for brand in self.common_brands)
+        ) if self.common_brands else None
         
         # Search effectiveness tracking
         self.search_stats: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
@@ -47,6 +66,65 @@ class SearchStrategy:
         # Character combinations for fallback
         self.base_chars = 'abcdefghijklmnopqrstuvwxyz0123456789'
         
+        # Term yield learned across runs (new products per request), used by the bandit policy
+        self.term_policy = config['search'].get('term_policy', 'heuristic')
+        self.prior_strength = config['search'].get('term_prior_requests', 2.0)
+        self.ucb_exploration = config['search'].get('ucb_exploration', 1.0)
+        self.term_stats_store = open_term_stats(config, logger)
+        self.term_history: Dict[str, Dict[str, float]] = self.term_stats_store.load() if self.term_stats_store else {}
+        self.prior_yield = self._observed_yield()
+        self.total_requests = sum(stats['requests'] for stats in self.term_history.values())
+        self._posteriors: Dict[str, Tuple[float, float]] = {}
+        self._rng = random.Random()
+        
+        # Pending terms of the run (see schedule_terms) and of get_next_search_term
+        self.term_scheduler: Optional[TermScheduler] = None
+        self._scored_requests = 0.0
+        self._effectiveness_queue: Optional[TermScheduler] = None
+        self._effectiveness_source: Optional[List[str]] = None
+        
+        # Terms mined from the stored catalog (see term_miner.py): term -> expected new products/request
+        self.catalog_terms: Dict[str, float] = {}
+        
+    def _observed_yield(self) -> float:
+        """
+        Average new products per request over every term with history.
+        
+        Returns:
+            Yield used to scale the prior of untested terms
+        """
+        requests = sum(stats['requests'] for stats in self.term_history.values())
+        new_products = sum(stats['new_products'] for stats in self.term_history.values())
+        if requests <= 0:
+            return DEFAULT_PRIOR_YIELD
+        return max(new_products / requests, MIN_PRIOR_YIELD)
+    
+    def set_catalog_terms(self, mined_terms: List[Dict[str, Any]]):
+        """
+        Use terms mined from the catalog, in their greedy set-cover order.
+        
+        Args:
+            mined_terms: Output of CatalogTermMiner.mine
+        """
+        self.catalog_terms = {entry['term']: entry['expected_new_per_request'] for entry in mined_terms}
+    
+    def start_run(self):
+        """
+        Discount the persisted term statistics at the start of a new run.
+        Not called when an interrupted run is resumed.
+        """
+        if not self.term_stats_store:
+            return
+        decay = self.config['search'].get('term_stats_decay', 0.7)
+        self.term_stats_store.decay(decay)
+        for stats in self.term_history.values():
+            stats['requests'] *= decay
+            stats['new_products'] *= decay
+        self.total_requests *= decay
+        self._posteriors.clear()
+        self.logger.info(f"Loaded yield history of {len(self.term_history)} search terms "
+                         f"({self.prior_yield:.2f} new products/request on average)")
+    
     def generate_search_terms(self) -> List[str]:
         """
         Generate optimized list of search terms based on strategy configuration.
@@ -56,6 +134,9 @@ class SearchStrategy:
         """
         search_terms = []
         
+        # 0. Terms mined from the stored catalog, in set-cover order
+        search_terms.extend(self.catalog_terms)
+        
         # 1. Smart keywords (highest priority)
         if self.config['search']['use_smart_keywords']:
             search_terms.extend(self._get_smart_keyword_terms())
@@ -68,15 +149,15 @@ class SearchStrategy:
         if self.config['search']['use_brands']:
             search_terms.extend(self._get_brand_based_terms())
         
-        # 4. Fallback to character combinations if enabled
-        if self.config['search']['use_fallback_combinations']:
+        # 4. Fallback to character combinations if enabled (mined terms replace them)
+        if self.config['search']['use_fallback_combinations'] and not self.catalog_terms:
             search_terms.extend(self._get_fallback_combinations())
         
         # Remove duplicates while preserving order
         unique_terms = []
         seen = set()
         for term in search_terms:
-            normalized_term = normalize_text(term)
+            normalized_term = normalize_text_cached(term)
             if normalized_term not in seen and normalized_term not in self.used_search_terms:
                 unique_terms.append(term)
                 seen.add(normalized_term)
@@ -192,7 +273,7 @@ class SearchStrategy:
         Returns:
             Effectiveness score (higher is better)
         """
-        normalized_term = normalize_text(term)
+        normalized_term = normalize_text_cached(term)
         stats = self.search_stats.get(normalized_term)
         
         if not stats or stats['attempts'] == 0:
@@ -211,7 +292,13 @@ class SearchStrategy:
         Returns:
             Estimated effectiveness score
         """
+        # Mined terms come with the yield they had over the known catalog
+        mined_yield = self.catalog_terms.get(term)
+        if mined_yield is not None:
+            return min(1.0, 0.5 + mined_yield / (2 * self.config['api']['page_limit']))
+        
         score = 0.5  # Base score
+        normalized_term = normalize_text_cached(term)
         
         # Longer terms are often more specific and effective
         if len(term) >= 4:
@@ -221,11 +308,11 @@ class SearchStrategy:
         
         # Common food/product terms are usually effective
         food_terms = ['leche', 'pan', 'aceite', 'agua', 'yogur', 'queso']
-        if any(food_term in normalize_text(term) for food_term in food_terms):
+        if any(food_term in normalized_term for food_term in food_terms):
             score += 0.3
         
         # Brand terms are often effective
-        if any(brand.lower() in normalize_text(term) for brand in self.common_brands):
+        if self._brand_pattern and self._brand_pattern.search(normalized_term):
             score += 0.2
         
         # Very generic terms might be less effective
@@ -235,7 +322,8 @@ class SearchStrategy:
         
         return max(0.0, min(1.0, score))
     
-    def record_search_result(self, search_term: str, products_found: int, pages_searched: int):
+    def record_search_result(self, search_term: str, products_found: int, pages_searched: int,
+                             restored: bool = False, new_products: Optional[int] = None):
         """
         Record the results of a search for effectiveness tracking.
         
@@ -243,10 +331,25 @@ class SearchStrategy:
             search_term: The search term used
             products_found: Number of products found
             pages_searched: Number of pages searched
+            restored: The result comes from the journal and is already in the term history
+            new_products: Products new to the database, the yield the bandit learns
+                          (None = products_found)
         """
-        normalized_term = normalize_text(search_term)
+        normalized_term = normalize_text_cached(search_term)
         stats = self.search_stats[normalized_term]
         
+        if not restored:
+            if new_products is None:
+                new_products = products_found
+            history = self.term_history.setdefault(normalized_term, {'requests': 0.0, 'new_products': 0.0, 'runs': 0})
+            history['requests'] += pages_searched
+            history['new_products'] += new_products
+            history['runs'] += 1
+            self.total_requests += pages_searched
+            self._posteriors.pop(normalized_term, None)
+            if self.term_stats_store:
+                self.term_stats_store.record(normalized_term, pages_searched, new_products)
+        
         stats['attempts'] += 1
         stats['products_found'] += products_found
         stats['pages_searched'] += pages_searched
@@ -257,6 +360,9 @@ class SearchStrategy:
         
         # Mark as used
         self.used_search_terms.add(normalized_term)
+        for queue in (self.term_scheduler, self._effectiveness_queue):
+            if queue:
+                queue.discard(search_term)
         
         self.logger.debug(f"Search '{search_term}': {products_found} products, {pages_searched} pages, effectiveness: {stats['effectiveness']:.2f}")
     
@@ -264,6 +370,9 @@ class SearchStrategy:
         """
         Get the next most promising search term.
         
+        The terms are queued by effectiveness the first time a list is
+        passed; later calls with the same list pop from the queue in O(log n).
+        
         Args:
             available_terms: List of available search terms
             
@@ -273,28 +382,143 @@ class SearchStrategy:
         if not available_terms:
             return None
         
-        # Filter out already used terms
-        unused_terms = [
-            term for term in available_terms 
-            if normalize_text(term) not in self.used_search_terms
-        ]
+        if self._effectiveness_source is not available_terms:
+            self._effectiveness_queue = TermScheduler(self._get_term_effectiveness, normalize_text_cached)
+            self._effectiveness_queue.extend(
+                term for term in available_terms if normalize_text_cached(term) not in self.used_search_terms
+            )
+            self._effectiveness_source = available_terms
         
-        if not unused_terms:
+        best_term = self._effectiveness_queue.pop()
+        if best_term is None:
             self.logger.info("All search terms have been used")
+        return best_term
+    
+    def _term_posterior(self, term: str) -> Tuple[float, float]:
+        """
+        Gamma posterior of a term's yield (new products per request).
+        
+        The prior is worth `term_prior_requests` requests at the heuristic
+        estimate scaled by the observed average yield, so untested terms start
+        from their heuristic rather than from zero or infinity.
+        
+        Args:
+            term: Search term
+            
+        Returns:
+            Tuple of (shape, rate)
+        """
+        normalized_term = normalize_text_cached(term)
+        posterior = self._posteriors.get(normalized_term)
+        if posterior is None:
+            history = self.term_history.get(normalized_term, {})
+            prior_mean = max(self._estimate_term_effectiveness(term), 0.05) * self.prior_yield
+            shape = self.prior_strength * prior_mean + history.get('new_products', 0.0)
+            rate = self.prior_strength + history.get('requests', 0.0)
+            posterior = self._posteriors[normalized_term] = (shape, rate)
+        return posterior
+    
+    def _bandit_score(self, term: str, total_requests: float) -> float:
+        """
+        Score of a term under the configured bandit policy.
+        
+        Args:
+            term: Search term
+            total_requests: Requests over every term (UCB exploration term)
+            
+        Returns:
+            Sampled yield (thompson) or upper confidence bound (ucb)
+        """
+        shape, rate = self._term_posterior(term)
+        if self.term_policy == 'thompson':
+            return self._rng.gammavariate(max(shape, MIN_POSTERIOR_SHAPE), 1.0 / rate)
+        
+        bonus = self.ucb_exploration * self.prior_yield * math.sqrt(math.log(total_requests + 1) / rate)
+        return shape / rate + bonus
+    
+    def _schedule_score(self, term: str) -> float:
+        """
+        Priority of a pending term under the configured policy.
+        
+        Args:
+            term: Search term
+            
+        Returns:
+            Bandit score, or 0.0 with 'heuristic' (terms keep the given order)
+        """
+        if self.term_policy not in ('thompson', 'ucb'):
+            return 0.0
+        return self._bandit_score(term, self._scored_requests)
+    
+    def schedule_terms(self, terms: List[str]) -> int:
+        """
+        Queue the terms of the run for select_next_term, skipping used ones.
+        
+        A pending term's posterior only changes once it is searched, so its
+        score is computed when queued. Thompson draws one sample per term;
+        UCB scores are recomputed together when the exploration factor has
+        grown by UCB_RESCORE_TOLERANCE (a few dozen times over a run).
+        
+        Args:
+            terms: Candidate search terms, in order of preference
+            
+        Returns:
+            Number of terms queued
+        """
+        self._scored_requests = self.total_requests
+        self.term_scheduler = TermScheduler(self._schedule_score, normalize_text_cached)
+        self.term_scheduler.extend(term for term in terms if normalize_text_cached(term) not in self.used_search_terms)
+        return len(self.term_scheduler)
+    
+    def _ucb_scores_stale(self) -> bool:
+        """
+        Check whether the UCB exploration factor moved enough to re-score.
+        
+        Returns:
+            True if queued scores should be recomputed
+        """
+        scored = math.log(self._scored_requests + 1)
+        current = math.log(self.total_requests + 1)
+        return current > scored * (1 + UCB_RESCORE_TOLERANCE) ** 2
+    
+    def select_next_term(self) -> Optional[str]:
+        """
+        Choose the next term to search among those queued by schedule_terms.
+        
+        With the 'thompson' or 'ucb' policy the choice balances terms with
+        little history (exploration) against terms known to bring many new
+        products per request (exploitation). With 'heuristic' the terms are
+        taken in the given order.
+        
+        Returns:
+            Next search term, or None when every term was used
+        """
+        if not self.term_scheduler:
             return None
         
-        # Return the most promising term
-        best_term = max(unused_terms, key=self._get_term_effectiveness)
-        return best_term
+        if self.term_policy == 'ucb' and self._ucb_scores_stale():
+            self._scored_requests = self.total_requests
+            self.term_scheduler.rescore_all()
+        
+        return self.term_scheduler.pop()
     
-    def should_continue_search(self, current_term: str, pages_searched: int, products_found: int) -> bool:
+    def close(self):
+        """
+        Close the term statistics store.
+        """
+        if self.term_stats_store:
+            self.term_stats_store.close()
+    
+    def should_continue_search(self, current_term: str, pages_searched: int, products_found: int,
+                               page_novelty: Optional[List[float]] = None) -> bool:
         """
         Determine if we should continue searching with the current term.
         
         Args:
             current_term: Current search term
             pages_searched: Pages searched so far for this term
-            products_found: Products found so far for this term
+            products_found: Products new to the database found so far for this term
+            page_novelty: Share of new products on each page searched in this session
             
         Returns:
             True if should continue searching
@@ -303,6 +527,13 @@ class SearchStrategy:
         if pages_searched == 0:
             return True
         
+        # Stop once the last pages only returned products we already have
+        window = self.config['search'].get('novelty_window_pages', 2)
+        if page_novelty and len(page_novelty) >= window:
+            min_novelty = self.config['search'].get('min_page_novelty', 0.02)
+            if all(novelty < min_novelty for novelty in page_novelty[-window:]):
+                return False
+        
         # Stop if we've searched too many pages without results
         if pages_searched >= 10 and products_found == 0:
             return False
@@ -332,7 +563,7 @@ class SearchStrategy:
         untested = []
         
         for term in terms:
-            normalized_term = normalize_text(term)
+            normalized_term = normalize_text_cached(term)
             if normalized_term in self.search_stats:
                 effectiveness = self.search_stats[normalized_term]['effectiveness']
                 if effectiveness >= 0.5:
@@ -395,7 +626,8 @@ class SearchStrategy:
             'max_effectiveness': round(max_effectiveness, 3),
             'min_effectiveness': round(min_effectiveness, 3),
             'top_performing_terms': [(term, round(stats['effectiveness'], 3)) for term, stats in top_terms],
-            'terms_used': len(self.used_search_terms)
+            'terms_used': len(self.used_search_terms),
+            'term_queue': self.term_scheduler.get_statistics() if self.term_scheduler else None
         }
     
     def reset_used_terms(self):
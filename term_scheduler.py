@@ -0,0 +1,132 @@
+"""
+Term scheduling module for the product scraper system.
+Indexed priority queue that hands out the best pending search term in O(log n).
+"""
+
+import heapq
+import itertools
+from typing import Callable, Dict, List, Iterable, Optional, Tuple
+
+class TermScheduler:
+    """
+    Max-priority queue of search terms keyed by normalized term.
+
+    Every term has at most one live heap entry. Re-scoring or removing a
+    term does not search the heap: the term gets a new version (or none),
+    and entries with an old version are discarded when they reach the top
+    (lazy deletion). Versions come from one counter that never goes back,
+    so a term removed and pushed again cannot revive its old entries. Ties
+    keep insertion order, so a constant score hands terms out in the order
+    they were added.
+    """
+
+    def __init__(self, score: Callable[[str], float], key: Callable[[str], str]):
+        """
+        Initialize an empty scheduler.
+
+        Args:
+            score: Priority of a term, higher is picked first
+            key: Normalized form identifying duplicate terms
+        """
+        self.score = score
+        self.key = key
+
+        self._heap: List[Tuple[float, int, int, str, str]] = []
+        self._versions: Dict[str, int] = {}
+        self._order = itertools.count()
+        self._version = itertools.count()
+
+        # Statistics
+        self.pushes = 0
+        self.stale_pops = 0
+        self.rebuilds = 0
+
+    def push(self, term: str):
+        """
+        Add a term, or re-score it if its normalized form is already queued.
+
+        Args:
+            term: Search term
+        """
+        key = self.key(term)
+        version = next(self._version)
+        self._versions[key] = version
+        heapq.heappush(self._heap, (-self.score(term), next(self._order), version, key, term))
+        self.pushes += 1
+
+    def extend(self, terms: Iterable[str]):
+        """
+        Add several terms at once (first occurrence of each normalized form wins).
+
+        Args:
+            terms: Search terms in priority order for ties
+        """
+        for term in terms:
+            key = self.key(term)
+            if key in self._versions:
+                continue
+            version = next(self._version)
+            self._versions[key] = version
+            self._heap.append((-self.score(term), next(self._order), version, key, term))
+            self.pushes += 1
+        heapq.heapify(self._heap)
+
+    def discard(self, term: str):
+        """
+        Remove a term if it is queued (its heap entry goes stale).
+
+        Args:
+            term: Search term or its normalized form
+        """
+        self._versions.pop(self.key(term), None)
+
+    def _is_live(self, entry: Tuple[float, int, int, str, str]) -> bool:
+        """
+        Check whether a heap entry is the current one of its term.
+        """
+        return self._versions.get(entry[3]) == entry[2]
+
+    def pop(self) -> Optional[str]:
+        """
+        Remove and return the highest scored term.
+
+        Returns:
+            Search term, or None if the queue is empty
+        """
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            if self._is_live(entry):
+                del self._versions[entry[3]]
+                return entry[4]
+            self.stale_pops += 1
+        return None
+
+    def rescore_all(self):
+        """
+        Recompute the score of every queued term and rebuild the heap in O(n),
+        for changes that move every score at once.
+        """
+        live = [entry for entry in self._heap if self._is_live(entry)]
+        self._heap = [(-self.score(term), order, version, key, term) for _, order, version, key, term in live]
+        heapq.heapify(self._heap)
+        self.rebuilds += 1
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def __contains__(self, term: str) -> bool:
+        return self.key(term) in self._versions
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Get scheduler statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        return {
+            'queued': len(self),
+            'pushes': self.pushes,
+            'stale_pops': self.stale_pops,
+            'rebuilds': self.rebuilds
+        }
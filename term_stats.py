@@ -0,0 +1,119 @@
+"""
+Term statistics module for the product scraper system.
+Persists search term yield (new products per request) across runs in a local SQLite file.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+
+class TermStatsStore:
+    """
+    Discounted request and new-product totals per normalized search term.
+
+    Totals are multiplied by a decay factor at the start of every run, so
+    terms whose products are already known (and now yield nothing new) lose
+    their reputation instead of living off old discoveries.
+    """
+
+    def __init__(self, path: str, logger: logging.Logger):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite file path
+            logger: Logger instance
+        """
+        self.path = path
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS term_stats (
+                term TEXT PRIMARY KEY,
+                requests REAL NOT NULL,
+                new_products REAL NOT NULL,
+                runs INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._connection.commit()
+
+    def load(self) -> Dict[str, Dict[str, float]]:
+        """
+        Load the statistics of every term.
+
+        Returns:
+            Dictionary mapping term -> {'requests', 'new_products', 'runs'}
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT term, requests, new_products, runs FROM term_stats"
+            ).fetchall()
+        return {
+            term: {'requests': requests, 'new_products': new_products, 'runs': runs}
+            for term, requests, new_products, runs in rows
+        }
+
+    def decay(self, factor: float):
+        """
+        Discount every total at the start of a run.
+
+        Args:
+            factor: Multiplier between 0 and 1
+        """
+        with self._lock:
+            self._connection.execute(
+                "UPDATE term_stats SET requests = requests * ?, new_products = new_products * ?", (factor, factor)
+            )
+            self._connection.commit()
+
+    def record(self, term: str, requests: int, new_products: int):
+        """
+        Add the outcome of searching a term.
+
+        Args:
+            term: Normalized search term
+            requests: Page requests made
+            new_products: Products new to the database
+        """
+        with self._lock:
+            try:
+                self._connection.execute(
+                    "INSERT INTO term_stats (term, requests, new_products, runs, last_used) VALUES (?, ?, ?, 1, ?) "
+                    "ON CONFLICT(term) DO UPDATE SET requests = requests + excluded.requests, "
+                    "new_products = new_products + excluded.new_products, runs = runs + 1, "
+                    "last_used = excluded.last_used",
+                    (term, requests, new_products, time.time())
+                )
+                self._connection.commit()
+            except sqlite3.Error as e:
+                self._connection.rollback()
+                self.logger.error(f"Error saving term statistics for '{term}': {e}")
+
+    def close(self):
+        """
+        Close the store.
+        """
+        with self._lock:
+            self._connection.close()
+
+def open_term_stats(config: Dict[str, Any], logger: logging.Logger) -> Optional[TermStatsStore]:
+    """
+    Open the term statistics store described by config['search'].
+
+    Args:
+        config: Configuration dictionary
+        logger: Logger instance
+
+    Returns:
+        TermStatsStore instance, or None if persistence is disabled
+    """
+    path = config['search'].get('term_stats_path')
+    if not path:
+        return None
+    return TermStatsStore(path, logger)
@@ -0,0 +1,54 @@
+"""
+Tests for the word-level product categorizer.
+"""
+
+import pytest
+
+from categorizer import ProductCategorizer, DEFAULT_CATEGORY
+from config import get_category_keywords
+
+@pytest.fixture(scope='module')
+def categorizer():
+    return ProductCategorizer(get_category_keywords())
+
+@pytest.mark.parametrize('name, category', [
+    # Category order wins over keyword length ('manzana', 'naranja' are fruits)
+    ('Agua Sab S Gas Manzana Villavicencio 1.5 L', 'Bebidas'),
+    ('Jugo De Naranja Cepita 1 L', 'Bebidas'),
+    ('Hamburguesa Congelada Swift x4', 'Carnes y Pescados'),
+    # Stem keywords match longer words
+    ('Yogurt Bebible Frutilla La Serenisima 900 g', 'Lácteos y Frescos'),
+    ('Yogurisimo Firme Vainilla', 'Lácteos y Frescos'),
+    ('Jamoncito Cocido Feteado', 'Lácteos y Frescos'),
+    # Plural endings
+    ('Galletitas Dulces Surtidas', 'Almacén'),
+    ('Huevos Blancos x 12', 'Lácteos y Frescos'),
+    # Whole words only for short keywords
+    ('Aceite De Girasol 1.5 L', 'Almacén'),
+    ('Papel Higienico Doble Hoja', 'Limpieza'),
+])
+def test_categorize(categorizer, name, category):
+    assert categorizer.categorize(name) == category
+
+def test_earlier_category_beats_longer_keyword():
+    categorizer = ProductCategorizer({'Lácteos': ['leche'], 'Almacén': ['leche en polvo']})
+    assert categorizer.categorize('Leche En Polvo Entera') == 'Lácteos'
+    assert categorizer.categorize('Polvo Para Leche En Polvo') == 'Lácteos'
+
+    categorizer = ProductCategorizer({'Almacén': ['leche en polvo'], 'Lácteos': ['leche']})
+    assert categorizer.categorize('Leche En Polvo Entera') == 'Almacén'
+    assert categorizer.categorize('Leche Entera') == 'Lácteos'
+
+def test_short_keywords_are_not_stems():
+    categorizer = ProductCategorizer({'Panificados': ['pan'], 'Verduras': ['papa']})
+    assert categorizer.categorize('Panal De Miel') == DEFAULT_CATEGORY
+    assert categorizer.categorize('Papel Manteca') == DEFAULT_CATEGORY
+    assert categorizer.categorize('Panes Saborizados') == 'Panificados'
+
+def test_empty_and_unmatched_names(categorizer):
+    assert categorizer.categorize('') == DEFAULT_CATEGORY
+    assert categorizer.categorize('Soga De Saltar 2mt') == DEFAULT_CATEGORY
+
+def test_categorize_many_keeps_order(categorizer):
+    names = ['Jugo De Naranja Cepita 1 L', 'Yogurisimo', 'Soga De Saltar']
+    assert categorizer.categorize_many(names) == [categorizer.categorize(name) for name in names]
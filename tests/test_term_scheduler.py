@@ -0,0 +1,32 @@
+"""
+Tests for the term priority queue.
+"""
+
+from term_scheduler import TermScheduler
+
+def make_scheduler(scores):
+    return TermScheduler(lambda term: scores[term], lambda term: term.lower())
+
+def test_pops_by_score_then_insertion_order():
+    scheduler = make_scheduler({'a': 1, 'b': 3, 'c': 3})
+    scheduler.extend(['a', 'b', 'c'])
+    assert [scheduler.pop(), scheduler.pop(), scheduler.pop(), scheduler.pop()] == ['b', 'c', 'a', None]
+
+def test_discarded_term_pushed_again_keeps_new_score():
+    scores = {'a': 10, 'b': 5}
+    scheduler = make_scheduler(scores)
+    scheduler.push('a')
+    scheduler.push('b')
+    scheduler.discard('a')
+    scores['a'] = 1
+    scheduler.push('a')
+    assert [scheduler.pop(), scheduler.pop(), scheduler.pop()] == ['b', 'a', None]
+
+def test_rescore_all_and_duplicates():
+    scores = {'a': 1, 'A': 1, 'b': 2}
+    scheduler = make_scheduler(scores)
+    scheduler.extend(['a', 'A', 'b'])
+    assert len(scheduler) == 2 and 'A' in scheduler
+    scores['a'] = 3
+    scheduler.rescore_all()
+    assert [scheduler.pop(), scheduler.pop()] == ['a', 'b']
@@ -6,23 +6,82 @@ Combines intelligent search strategies, robust error handling, and efficient dat
 import sys
 import signal
 import time
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
 from datetime import datetime, timedelta
 
 from config import get_config, LOGGING_CONFIG
-from utils import setup_logging, format_number, get_timestamp
+from utils import setup_logging, format_number, get_timestamp, clean_ean
 from data_manager import DataManager
 from api_client import APIClient
 from search_strategy import SearchStrategy
+from coverage_estimator import CoverageEstimator
+from geo_tiles import GeoTile, GeoTileScheduler
+from term_miner import CatalogTermMiner
+from scrape_journal import open_journal
+
+class TermSearch:
+    """
+    Progress of one search term: pages requested ahead and pages merged in order.
+    """
+    
+    def __init__(self, term: str, key: Optional[str] = None, tile: Optional[GeoTile] = None):
+        """
+        Initialize the state of a term searched from its first page.
+        
+        Args:
+            term: Search term
+            key: Journal key (defaults to the term)
+            tile: Geo tile searched (None = configured location)
+        """
+        self.term = term
+        self.key = key or term
+        self.tile = tile
+        self.next_offset = 0  # next page to request
+        self.merge_offset = 0  # next page to merge
+        self.page_number = 1
+        self.pending: Dict[int, Future] = {}
+        self.total: Optional[int] = None  # results reported by the API
+        
+        self.products_found = 0
+        self.new_products = 0
+        self.page_novelty: List[float] = []
+        self.pages_searched = 0
+        
+        # Products inserted by terms searched concurrently: the term found them
+        # too, so its stopping rules count them as new
+        self.shared_new: Set[str] = set()
+        self.novel_products = 0
+        
+        self.has_more_pages = True
+        self.request_failed = False
+        self.stopped = False
+    
+    @property
+    def location(self) -> Optional[Tuple[float, float]]:
+        """
+        (lat, lng) sent with the requests, None for the configured location.
+        """
+        return self.tile.location if self.tile else None
+    
+    @property
+    def finished(self) -> bool:
+        """
+        True once no page is left to request or merge.
+        """
+        return (self.stopped or not self.has_more_pages) and not self.pending
 
 class UnifiedProductScraper:
     """
     Main scraper class that orchestrates the entire product discovery process.
     """
     
-    def __init__(self):
+    def __init__(self, fresh_start: bool = False):
         """
         Initialize the unified scraper with all components.
+        
+        Args:
+            fresh_start: Ignore the interrupted run recorded in the journal
         """
         # Load configuration
         self.config = get_config()
@@ -38,11 +97,25 @@ class UnifiedProductScraper:
         self.api_client = APIClient(self.config, self.logger)
         self.search_strategy = SearchStrategy(self.config, self.logger)
         
+        # Journal of finished terms and pages, used to resume an interrupted run
+        self.journal = open_journal(self.config, self.logger)
+        self.fresh_start = fresh_start
+        self.completed_terms = set()
+        
         # Scraping state
         self.is_running = False
         self.start_time = None
         self.products_added_this_session = 0
         self.searches_performed = 0
+        self.prefetched_pages_discarded = 0
+        self.active_searches: List[TermSearch] = []
+        
+        # Geo-tiled discovery (config['location']['tiles'], --tiles)
+        self.tile_scheduler: Optional[GeoTileScheduler] = None
+        
+        # Catalog size estimate and recent discovery rate (run-level stopping rule)
+        self.coverage = CoverageEstimator(self.config['search'].get('run_stop_window', 200))
+        self.discovery_exhausted = False
         
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -80,6 +153,10 @@ class UnifiedProductScraper:
             existing_count = self.data_manager.load_existing_products()
             self.logger.info(f"Starting with {format_number(existing_count)} existing products")
             
+            # Mine search terms from the products already stored
+            if self.config['search'].get('catalog_terms', {}).get('enabled', False):
+                self._mine_catalog_terms()
+            
             # Generate search terms
             search_terms = self.search_strategy.generate_search_terms()
             if not search_terms:
@@ -91,8 +168,17 @@ class UnifiedProductScraper:
             # Optimize search order
             optimized_terms = self.search_strategy.optimize_search_order(search_terms)
             
+            # Resume an interrupted run; a new run discounts the term yield history
+            if not self._resume_from_journal():
+                self.search_strategy.start_run()
+            
             # Main scraping loop
-            self._scrape_products(optimized_terms)
+            if self.config['location'].get('tiles', {}).get('enabled', False):
+                completed = self._scrape_tiles(optimized_terms)
+            else:
+                completed = self._scrape_products(optimized_terms)
+            if completed and self.journal:
+                self.journal.finish_run()
             
             # Final save and cleanup
             self._finalize_scraping()
@@ -105,113 +191,377 @@ class UnifiedProductScraper:
         finally:
             self.is_running = False
             self.api_client.close()
+            self.search_strategy.close()
+            if self.journal:
+                self.journal.close()
+    
+    def _mine_catalog_terms(self):
+        """
+        Mine discriminative terms (brands, sizes, rare name words) from the
+        productos table and hand them to the search strategy.
+        """
+        try:
+            miner = CatalogTermMiner(self.config, self.logger)
+            mined_terms = miner.mine(self.data_manager.db_manager.iter_product_names())
+        except Exception as e:
+            self.logger.error(f"Error mining catalog terms, using the configured lists only: {e}")
+            return
+        
+        self.search_strategy.set_catalog_terms(mined_terms)
+        for entry in mined_terms[:10]:
+            self.logger.debug(f"  Mined term '{entry['term']}' ({entry['kind']}): {entry['products']} products, "
+                              f"{entry['expected_new_per_request']} new/request")
+    
+    def _resume_from_journal(self) -> bool:
+        """
+        Restore search statistics and finished terms of an interrupted run.
+        
+        Returns:
+            True if an interrupted run was resumed
+        """
+        if not self.journal:
+            return False
+        
+        if not self.journal.start_run('unified', fresh=self.fresh_start):
+            self.logger.info(f"Journal run {self.journal.run_id} started")
+            return False
+        
+        for entry in self.journal.completed_terms():
+            self.completed_terms.add(entry['term'])
+            # Tile searches are journaled as 'term @ lat,lng' and not learned by the strategy
+            if ' @ ' not in entry['term']:
+                self.search_strategy.record_search_result(
+                    entry['term'], entry['products_found'], entry['pages_searched'], restored=True
+                )
+        
+        self.logger.info(f"Resuming run {self.journal.run_id}: "
+                         f"{len(self.completed_terms)} search terms already completed")
+        return True
     
-    def _scrape_products(self, search_terms: List[str]):
+    def _scrape_products(self, search_terms: List[str]) -> bool:
         """
-        Main product scraping loop.
+        Main product scraping loop. The search strategy picks the next term
+        whenever a term finishes (see search.term_policy).
         
         Args:
             search_terms: List of search terms to process
+            
+        Returns:
+            True if every term was processed
         """
         total_terms = len(search_terms)
-        
-        for term_index, search_term in enumerate(search_terms, 1):
-            if not self.is_running:
-                self.logger.info("Scraping interrupted by user")
-                break
-            
+        pending_terms = self.search_strategy.schedule_terms(
+            [term for term in search_terms if term not in self.completed_terms]
+        )
+        term_index = total_terms - pending_terms
+        
+        def next_search() -> Optional[TermSearch]:
+            nonlocal term_index
+            search_term = self.search_strategy.select_next_term()
+            if search_term is None:
+                return None
+            term_index += 1
             self.logger.info(f"[{term_index}/{total_terms}] Searching for: '{search_term}'")
+            return self._start_term_search(search_term)
+        
+        return self._run_searches(next_search)
+    
+    def _scrape_tiles(self, search_terms: List[str]) -> bool:
+        """
+        Geo-tiled scraping loop: every term is searched from a grid of
+        locations covering config['location']['tiles']['polygon'], and the
+        next search goes to the tile with the best recent new-product yield
+        (see GeoTileScheduler). Products already returned by another tile
+        are not written again.
+        
+        Args:
+            search_terms: Search terms each tile goes through, in order
             
-            # Search with current term
-            products_found = self._search_with_term(search_term)
-            
-            # Log progress
-            if products_found > 0:
-                self.logger.info(f"Found {products_found} new products with '{search_term}'")
-            else:
-                self.logger.debug(f"No new products found with '{search_term}'")
+        Returns:
+            True if every tile was exhausted
+        """
+        self.tile_scheduler = GeoTileScheduler(self.config, self.logger, search_terms)
+        
+        def next_search() -> Optional[TermSearch]:
+            choice = self.tile_scheduler.next_search(self.completed_terms)
+            if choice is None:
+                return None
+            tile, search_term = choice
+            self.logger.info(f"[tile {tile.tile_id}, term {tile.next_term_index}/{len(search_terms)}] "
+                             f"Searching for: '{search_term}' at ({tile.lat:.4f}, {tile.lng:.4f})")
+            return self._start_term_search(search_term, tile)
+        
+        return self._run_searches(next_search)
+    
+    def _run_searches(self, next_search: Callable[[], Optional['TermSearch']]) -> bool:
+        """
+        Run term searches until `next_search` has nothing left.
+        
+        Up to search.parallel_terms searches run at once, each with up to
+        search.page_prefetch pages requested ahead. Requests run on a pool
+        of search.max_concurrent_requests threads sharing the API client's
+        rate limiter; pages are merged in offset order on this thread, so the
+        stopping rules see the same sequence of pages as a sequential search.
+        Products one term inserts also count as new for the terms running
+        beside it at the same location, so overlapping terms do not cut each
+        other short.
+        
+        Args:
+            next_search: Returns the next search to start, or None if none is available now
             
-            # Show progress update after each search term
-            self._log_progress_update()
+        Returns:
+            True if every search was processed
+        """
+        search_config = self.config['search']
+        parallel_terms = max(1, search_config.get('parallel_terms', 1))
+        page_prefetch = max(1, search_config.get('page_prefetch', 1))
+        active = self.active_searches
+        
+        executor = ThreadPoolExecutor(max_workers=self.api_client.max_workers, thread_name_prefix='term-search')
+        try:
+            while True:
+                if not self.is_running:
+                    self.logger.info("Scraping interrupted by user")
+                    return False
+                
+                # Start new searches in the free slots
+                while len(active) < parallel_terms:
+                    search = next_search()
+                    if search is None:
+                        break
+                    active.append(search)
+                
+                if not active:
+                    break
+                
+                # Keep pages in flight, wait for any of them and merge what is ready
+                for search in active:
+                    self._request_pages(search, executor, page_prefetch)
+                in_flight = [future for search in active for future in search.pending.values()]
+                if in_flight:
+                    wait(in_flight, return_when=FIRST_COMPLETED)
+                for search in active:
+                    self._merge_pages(search)
+                
+                for search in [search for search in active if search.finished]:
+                    active.remove(search)
+                    products_found = self._finish_term_search(search)
+                    
+                    # Log progress
+                    if products_found > 0:
+                        self.logger.info(f"Found {products_found} new products with '{search.term}'")
+                    else:
+                        self.logger.debug(f"No new products found with '{search.term}'")
+                    
+                    # Show progress update after each search term
+                    self._log_progress_update()
+                    
+                    # Check if we should continue
+                    if not self._should_continue_scraping():
+                        self.logger.info("Stopping criteria met")
+                        # Running out of new products is a normal end of the run
+                        return self.discovery_exhausted
             
-            # Check if we should continue
-            if not self._should_continue_scraping():
-                self.logger.info("Stopping criteria met")
-                break
+            return self.is_running
+        finally:
+            # Unfinished terms are resumed from their journaled pages
+            for search in active:
+                self._cancel_pages(search)
+            active.clear()
+            executor.shutdown(wait=True)
     
-    def _search_with_term(self, search_term: str) -> int:
+    def _start_term_search(self, search_term: str, tile: Optional[GeoTile] = None) -> 'TermSearch':
         """
-        Search for products using a specific term.
+        Create the search state of a term, continuing after the last page
+        recorded before an interruption.
         
         Args:
             search_term: Search term to use
+            tile: Geo tile to search from (None = configured location)
             
         Returns:
-            Number of new products found
+            TermSearch instance
+        """
+        page_limit = self.config['api']['page_limit']
+        key = GeoTileScheduler.search_key(search_term, tile) if tile else search_term
+        search = TermSearch(search_term, key, tile)
+        
+        progress = self.journal.term_progress(key) if self.journal else None
+        if progress:
+            search.next_offset = search.merge_offset = progress['last_offset'] + page_limit
+            search.page_number = progress['pages_searched'] + 1
+            search.products_found = progress['products_found']
+            search.new_products = progress['new_products']
+            search.novel_products = progress['new_products']
+            search.pages_searched = progress['pages_searched']
+            search.has_more_pages = progress['last_page_products'] >= page_limit
+            self.logger.info(f"Resuming '{search_term}' at page {search.page_number}")
+            search.stopped = not self.search_strategy.should_continue_search(
+                search_term, search.pages_searched, search.novel_products, search.page_novelty
+            )
+        
+        return search
+    
+    def _request_pages(self, search: 'TermSearch', executor: ThreadPoolExecutor, page_prefetch: int):
         """
-        offset = 0
-        page_number = 1
-        products_found_this_term = 0
-        pages_searched = 0
-        has_more_pages = True
+        Submit the next pages of a term, up to `page_prefetch` in flight.
         
-        while has_more_pages and self.is_running:
-            # Check if we should continue with this term
-            if not self.search_strategy.should_continue_search(
-                search_term, pages_searched, products_found_this_term
-            ):
+        Until a page reports the total number of results, pages are requested
+        one at a time; after that every remaining offset is known.
+        
+        Args:
+            search: Term search state
+            executor: Pool running the requests
+            page_prefetch: Pages of the term allowed in flight
+        """
+        page_limit = self.config['api']['page_limit']
+        
+        while not search.stopped and search.has_more_pages and len(search.pending) < page_prefetch:
+            if search.total is None:
+                if search.pending:
+                    break
+            elif search.next_offset >= search.total:
                 break
             
-            # Make API request
-            response_data = self.api_client.search_products(
-                search_term, 
-                offset=offset, 
-                limit=self.config['api']['page_limit']
+            search.pending[search.next_offset] = executor.submit(
+                self.api_client.search_products, search.term, offset=search.next_offset, limit=page_limit,
+                location=search.location
             )
-            
+            search.next_offset += page_limit
             self.searches_performed += 1
-            pages_searched += 1
-            
-            if not response_data:
-                self.logger.warning(f"No response for '{search_term}' page {page_number}")
-                break
-            
-            # Process products from response
-            products = response_data.get('productos', [])
-            if not products:
-                has_more_pages = False
-                break
-            
-            # Add products to database
-            new_products_this_page = 0
-            for i, product in enumerate(products, 1):
-                if self.data_manager.add_product(product):
-                    new_products_this_page += 1
-                    products_found_this_term += 1
-                    self.products_added_this_session += 1
-                
-                # Show progress every 10 products
-                if i % 10 == 0:
-                    self.logger.info(f"  Processing product {i}/{len(products)} on page {page_number}...")
-
-            self.logger.info(f"'{search_term}' page {page_number}: "
-                            f"{new_products_this_page} new products "
-                            f"({len(products)} total on page)")
+    
+    def _merge_pages(self, search: 'TermSearch'):
+        """
+        Merge the finished pages of a term that come next in offset order.
+        
+        Args:
+            search: Term search state
+        """
+        while not search.finished:
+            future = search.pending.get(search.merge_offset)
+            if future is None or not future.done():
+                return
+            del search.pending[search.merge_offset]
+            self._merge_page(search, future.result())
             
-            # Prepare for next page
-            offset += self.config['api']['page_limit']
-            page_number += 1
+            if search.stopped or not search.has_more_pages:
+                self._cancel_pages(search)
+                return
             
-            # Check if we've reached the end
-            if len(products) < self.config['api']['page_limit']:
-                has_more_pages = False
+            # Check if we should continue with this term
+            if not self.search_strategy.should_continue_search(
+                search.term, search.pages_searched, search.novel_products, search.page_novelty
+            ):
+                search.stopped = True
+                self._cancel_pages(search)
+    
+    def _merge_page(self, search: 'TermSearch', response_data: Optional[Dict[str, Any]]):
+        """
+        Store the products of one page and update the term's counters.
         
-        # Record search results for optimization
-        self.search_strategy.record_search_result(
-            search_term, products_found_this_term, pages_searched
-        )
+        Args:
+            search: Term search state
+            response_data: API response of the page at search.merge_offset (None if the request failed)
+        """
+        page_limit = self.config['api']['page_limit']
+        offset = search.merge_offset
+        search.pages_searched += 1
+        
+        if not response_data:
+            self.logger.warning(f"No response for '{search.term}' page {search.page_number}")
+            search.request_failed = True
+            search.has_more_pages = False
+            return
+        
+        if search.total is None and isinstance(response_data.get('total'), int):
+            search.total = response_data['total']
+        
+        # Process products from response
+        products = response_data.get('productos', [])
+        if not products:
+            search.has_more_pages = False
+            self.coverage.record_page([], 0)
+            if self.journal:
+                self.journal.record_page(search.key, offset, 0, 0, 0)
+            return
+        
+        page_eans = [clean_ean(str(product.get('id', ''))) for product in products]
+        
+        # Products another tile already returned are not written again
+        new_products = products
+        if search.tile is not None:
+            unseen = self.tile_scheduler.filter_unseen(page_eans)
+            new_products = [product for product, is_unseen in zip(products, unseen) if is_unseen]
+        
+        # Add products to database (one upsert per page)
+        inserted_eans: List[str] = []
+        inserted, updated = self.data_manager.add_products(new_products, inserted_eans) if new_products else (0, 0)
+        new_products_this_page = inserted + updated
+        search.products_found += new_products_this_page
+        search.new_products += inserted
+        self.products_added_this_session += new_products_this_page
+        
+        novel = inserted + sum(1 for ean in page_eans if ean in search.shared_new)
+        search.novel_products += novel
+        search.page_novelty.append(novel / len(products))
+        for other in self.active_searches:
+            if other is not search and other.location == search.location:
+                other.shared_new.update(inserted_eans)
+        self.coverage.record_page(page_eans, inserted)
+        
+        self.logger.info(f"'{search.term}' page {search.page_number}: "
+                        f"{inserted} new, {updated} improved products "
+                        f"({len(products)} total on page)")
+        
+        # Products are already in the database: the page is done
+        if self.journal:
+            self.journal.record_page(search.key, offset, len(products), new_products_this_page, inserted)
+        
+        # Prepare for next page
+        search.merge_offset += page_limit
+        search.page_number += 1
+        
+        # Check if we've reached the end
+        if len(products) < page_limit or (search.total is not None and search.merge_offset >= search.total):
+            search.has_more_pages = False
+    
+    def _cancel_pages(self, search: 'TermSearch'):
+        """
+        Drop the prefetched pages of a term that will not be merged.
+        
+        Args:
+            search: Term search state
+        """
+        for future in search.pending.values():
+            if future.cancel():
+                # Never sent
+                self.searches_performed -= 1
+            else:
+                self.prefetched_pages_discarded += 1
+        search.pending.clear()
+    
+    def _finish_term_search(self, search: 'TermSearch') -> int:
+        """
+        Record the results of a finished term.
+        
+        Args:
+            search: Term search state
+            
+        Returns:
+            Number of new products found
+        """
+        # Record search results for optimization (tile yield for tiled searches)
+        if search.tile is not None:
+            self.tile_scheduler.record(search.tile, search.pages_searched, search.new_products)
+        else:
+            self.search_strategy.record_search_result(
+                search.term, search.products_found, search.pages_searched, new_products=search.new_products
+            )
+        # A term cut short by a failed request is retried from its last page on resume
+        if self.journal and not search.request_failed:
+            self.journal.record_term(search.key, search.products_found, search.pages_searched)
         
-        return products_found_this_term
+        return search.products_found
     
     def _should_continue_scraping(self) -> bool:
         """
@@ -236,6 +586,16 @@ class UnifiedProductScraper:
             self.logger.warning(f"API success rate too low ({api_stats['success_rate']}%), stopping")
             return False
         
+        # Stop the run once recent requests hardly discover anything new
+        search_config = self.config['search']
+        if self.coverage.should_stop(search_config.get('run_stop_new_per_request', 0.05),
+                                     search_config.get('run_stop_min_requests', 500)):
+            coverage_stats = self.coverage.get_statistics()
+            self.logger.info(f"Discovery rate fell to {coverage_stats['recent_new_per_request']} new products/request "
+                             f"over the last {self.coverage.window} requests, stopping")
+            self.discovery_exhausted = True
+            return False
+        
         # Continue scraping
         return True
     
@@ -297,6 +657,11 @@ class UnifiedProductScraper:
         self.logger.info(f"  - New this session: {format_number(self.products_added_this_session)}")
         self.logger.info(f"  - Rate: {products_per_hour:.1f} products/hour")
         self.logger.info(f"  - Searches performed: {format_number(self.searches_performed)}")
+        coverage_stats = self.coverage.get_statistics()
+        if coverage_stats['estimated_catalog_size']:
+            self.logger.info(f"  - Estimated catalog: {format_number(coverage_stats['estimated_catalog_size'])} "
+                             f"({coverage_stats['coverage_pct']:.1f}% seen, "
+                             f"{coverage_stats['recent_new_per_request']} new/request recently)")
     
     def _log_final_statistics(self):
         """
@@ -329,6 +694,12 @@ class UnifiedProductScraper:
         self.logger.info(f"  - Average data completeness: {data_stats['avg_completeness']:.1%}")
         self.logger.info(f"  - Categories found: {len(data_stats['categories'])}")
         self.logger.info(f"  - Unique brands: {format_number(data_stats['unique_brands'])}")
+        known_index = self.data_manager.db_manager.known_index
+        if known_index is not None:
+            index_stats = known_index.get_statistics()
+            self.logger.info(f"  - Known product index: {format_number(index_stats['products'])} products "
+                             f"({index_stats['memory_mb']} MB), {format_number(index_stats['filtered'])} "
+                             f"unchanged products skipped ({index_stats['filter_rate']:.1f}%)")
         
         # API statistics
         self.logger.info(f"\nAPI STATISTICS:")
@@ -336,12 +707,40 @@ class UnifiedProductScraper:
         self.logger.info(f"  - Success rate: {api_stats['success_rate']:.1f}%")
         self.logger.info(f"  - Rate limited requests: {format_number(api_stats['rate_limited_requests'])}")
         self.logger.info(f"  - Failed requests: {format_number(api_stats['failed_requests'])}")
+        self.logger.info(f"  - Final request rate: {api_stats['rate_limiter']['current_rate']:.2f} req/s "
+                         f"(avg wait {api_stats['rate_limiter']['avg_wait_time']:.2f}s)")
+        if api_stats['cache']:
+            self.logger.info(f"  - Response cache: {api_stats['cache']['hit_rate']:.1f}% hit rate "
+                             f"({format_number(api_stats['cache']['hits'])} hits, "
+                             f"{api_stats['cache']['entries']} entries, {api_stats['cache']['size_mb']} MB"
+                             f"{', replay' if api_stats['cache']['replay'] else ''})")
         
         # Search statistics
         self.logger.info(f"\nSEARCH STATISTICS:")
         self.logger.info(f"  - Search terms tried: {format_number(search_stats['total_terms_tried'])}")
         self.logger.info(f"  - Total searches performed: {format_number(search_stats['total_attempts'])}")
         self.logger.info(f"  - Average effectiveness: {search_stats['avg_effectiveness']:.3f} products/page")
+        self.logger.info(f"  - Prefetched pages discarded: {format_number(self.prefetched_pages_discarded)} "
+                         f"(parallel terms: {self.config['search'].get('parallel_terms', 1)}, "
+                         f"page prefetch: {self.config['search'].get('page_prefetch', 1)})")
+        coverage_stats = self.coverage.get_statistics()
+        if coverage_stats['estimated_catalog_size']:
+            self.logger.info(f"  - Estimated catalog size: {format_number(coverage_stats['estimated_catalog_size'])} "
+                             f"({format_number(coverage_stats['distinct_seen'])} distinct products seen, "
+                             f"{coverage_stats['coverage_pct']:.1f}% coverage)")
+        if self.tile_scheduler:
+            tile_stats = self.tile_scheduler.get_statistics()
+            self.logger.info(f"  - Geo tiles: {tile_stats['tiles']} locations "
+                             f"({tile_stats['tiles_exhausted']} exhausted), "
+                             f"{tile_stats['new_per_request']} new products/request, "
+                             f"{format_number(tile_stats['duplicates_skipped'])} cross-tile duplicates skipped")
+            for tile_id, (lat, lng), new_products, requests in tile_stats['best_tiles']:
+                self.logger.info(f"    - Tile {tile_id} ({lat:.4f}, {lng:.4f}): "
+                                 f"{format_number(new_products)} new products in {requests} requests")
+        if api_stats['total_requests'] > 0:
+            self.logger.info(f"  - New products per request: "
+                             f"{self.products_added_this_session / api_stats['total_requests']:.2f} "
+                             f"(term policy: {self.search_strategy.term_policy})")
         
         # Performance metrics
         if elapsed.total_seconds() > 0:
@@ -368,8 +767,22 @@ class UnifiedProductScraper:
 def main():
     """
     Main entry point for the unified scraper.
+    
+    Options:
+        --cache  : Cache API responses on disk (see config['cache'])
+        --replay : Serve responses only from the cache, never call the API
+        --fresh  : Do not resume the interrupted run recorded in the journal
+        --tiles  : Search from a grid of locations covering config['location']['tiles']['polygon']
     """
-    scraper = UnifiedProductScraper()
+    config = get_config()
+    if '--tiles' in sys.argv[1:]:
+        config['location']['tiles']['enabled'] = True
+    if '--cache' in sys.argv[1:]:
+        config['cache']['enabled'] = True
+    if '--replay' in sys.argv[1:]:
+        config['cache']['replay'] = True
+    
+    scraper = UnifiedProductScraper(fresh_start='--fresh' in sys.argv[1:])
     
     try:
         success = scraper.run()
@@ -3,16 +3,44 @@ Utility functions for the product scraper system.
 Includes text normalization, data validation, and helper functions.
 """
 
+import functools
 import unicodedata
 import re
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterable, List, Union
 from datetime import datetime
 
+import pandas as pd
+
+# Entries kept by normalize_text_cached (search terms, brands, keywords)
+NORMALIZE_CACHE_SIZE = 65536
+
+def _strip_accents(text: str) -> str:
+    """
+    Remove accents and diacritics through NFKD decomposition.
+    """
+    nfkd_form = unicodedata.normalize('NFKD', text)
+    return ''.join([c for c in nfkd_form if not unicodedata.combining(c)])
+
+# Decomposition of every Latin-1 and Latin Extended character that changes, as a
+# str.translate table. Combining marks are dropped per character, so translating
+# gives the same result as decomposing the whole string.
+_LATIN_MAX_CHAR = '\u024f'
+_LATIN_TRANSLATION = {
+    code: _strip_accents(chr(code))
+    for code in range(0x80, ord(_LATIN_MAX_CHAR) + 1)
+    if _strip_accents(chr(code)) != chr(code)
+}
+
+_PUNCTUATION_PATTERN = re.compile(r'[^\w\s\-\.\,\(\)\%]')
+
 def normalize_text(text: str) -> str:
     """
     Normalize text by removing accents, converting to lowercase, and cleaning.
     
+    ASCII text skips accent removal and Latin text (every Spanish name) goes
+    through a translate table; only other scripts pay for full NFKD.
+    
     Args:
         text: Input text to normalize
         
@@ -23,16 +51,59 @@ def normalize_text(text: str) -> str:
         return ""
     
     # Remove accents and diacritics
-    nfkd_form = unicodedata.normalize('NFKD', text)
-    text_without_accents = ''.join([c for c in nfkd_form if not unicodedata.combining(c)])
+    if not text.isascii():
+        if max(text) <= _LATIN_MAX_CHAR:
+            text = text.translate(_LATIN_TRANSLATION)
+        else:
+            text = _strip_accents(text)
+    
+    # Convert to lowercase and collapse whitespace
+    return ' '.join(text.lower().split())
+
+@functools.lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_text_cached(text: str) -> str:
+    """
+    normalize_text with a bounded LRU cache, for short strings normalized
+    over and over (search terms, brands).
     
-    # Convert to lowercase and clean
-    normalized = text_without_accents.lower().strip()
+    Args:
+        text: Input text to normalize (must be hashable)
+        
+    Returns:
+        Normalized text string
+    """
+    return normalize_text(text)
+
+def normalize_texts(texts: Iterable[str]) -> List[str]:
+    """
+    Normalize a batch of texts.
+    
+    Args:
+        texts: Input texts
+        
+    Returns:
+        Normalized texts, in the same order
+    """
+    normalize = normalize_text
+    return [normalize(text) for text in texts]
+
+def normalize_series(series: pd.Series) -> pd.Series:
+    """
+    Normalize a pandas Series of texts.
     
-    # Remove extra whitespace
-    normalized = re.sub(r'\s+', ' ', normalized)
+    Each distinct value is normalized once, which pays off on columns with
+    repeated values such as brands or categories.
     
-    return normalized
+    Args:
+        series: Series of texts (missing values become "")
+        
+    Returns:
+        Series of normalized texts with the same index
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    normalized = pd.array(normalize_texts(uniques) + [""], dtype=object)
+    # Code -1 (missing value) picks the trailing ""
+    return pd.Series(normalized[codes], index=series.index, name=series.name, dtype=object)
 
 def clean_product_name(name: str) -> str:
     """
@@ -47,19 +118,52 @@ def clean_product_name(name: str) -> str:
     if not name:
         return ""
     
-    # Basic cleaning
-    cleaned = name.strip()
-    
     # Remove excessive punctuation
-    cleaned = re.sub(r'[^\w\s\-\.\,\(\)\%]', ' ', cleaned)
+    cleaned = _PUNCTUATION_PATTERN.sub(' ', name)
     
-    # Normalize whitespace
-    cleaned = re.sub(r'\s+', ' ', cleaned)
+    # Normalize whitespace and capitalize first letter of each word
+    return ' '.join([word.capitalize() for word in cleaned.split()])
+
+def clean_product_names(names: Iterable[str]) -> List[str]:
+    """
+    Clean a batch of product names.
+    
+    Args:
+        names: Raw product names
+        
+    Returns:
+        Cleaned product names, in the same order
+    """
+    clean = clean_product_name
+    return [clean(name) for name in names]
+
+def clean_ean(ean: str) -> str:
+    """
+    Remove hyphens and other separators that might be in web data.
     
-    # Capitalize first letter of each word
-    cleaned = ' '.join(word.capitalize() for word in cleaned.split())
+    Args:
+        ean: Raw EAN/ID
+        
+    Returns:
+        EAN as stored in the database
+    """
+    return ean.replace('-', '').replace('_', '').replace(' ', '')
+
+def ean_key(ean: str) -> Union[int, str]:
+    """
+    Compact set/dict key of an EAN: an int when it converts back to the
+    same string and fits in int64, otherwise the EAN itself.
+    Ints take far less memory than strings in large sets.
     
-    return cleaned
+    Args:
+        ean: EAN code
+        
+    Returns:
+        Integer or string key
+    """
+    if ean.isascii() and ean.isdigit() and ean[0] != '0' and len(ean) <= 18:
+        return int(ean)
+    return ean
 
 def validate_ean(ean: str) -> bool:
     """
@@ -76,7 +180,7 @@ def validate_ean(ean: str) -> bool:
         return False
     
     # Remove hyphens and other separators that might be in web data
-    cleaned_ean = ean.replace('-', '').replace('_', '').replace(' ', '')
+    cleaned_ean = clean_ean(ean)
     
     # Remove any non-digit characters for validation
     digits_only = re.sub(r'\D', '', cleaned_ean)